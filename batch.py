@@ -0,0 +1,117 @@
+# batch evaluation in a pool of worker processes
+#
+# closures can't be pickled, so work is sent to the workers as data, and
+# built into church values there:
+#
+#  - a string is church.py expression source, such as 'ADD(BARE_TEN)(NEG(BARE_TEN))',
+#    evaluated on the term machine.
+#  - a Term (of any program with church.py's names) is sent in the wire form
+#    of terms.to_wire(), and evaluated on the term machine.
+#  - a tuple (name, arg, ...) applies the church.py definition name to each
+#    arg, a python value passed through churchify, on the closure backend.
+#
+# whatever the form, the result is sent back through dechurchify. each worker
+# imports church.py and reads it into a term program once, when it starts,
+# and keeps both for every batch it is sent. a Pool keeps its workers between
+# calls of evaluate_many(); the evaluate_many() function makes a pool for one
+# batch only.
+#
+# steps, depth and seconds limit each evaluation on the term machine, as
+# Machine.limit() does. an evaluation which fails raises its exception from
+# evaluate_many(), as it would have in this process.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import terms
+from terms import Term
+
+# the worker's own program, loaded by _start()
+_program = None
+
+
+def _start():
+    global _program
+    import church
+    _program = terms.load()
+    _program.namespace()
+
+
+def _encode(expr):
+    # what a worker is sent for expr
+    if isinstance(expr, Term):
+        return ('term', terms.to_wire(expr))
+    if isinstance(expr, str):
+        return ('source', expr)
+    if isinstance(expr, tuple) and expr and isinstance(expr[0], str):
+        return ('call', expr)
+    raise TypeError('can not evaluate %r' % (expr,))
+
+
+def _evaluate(job, limits):
+    import church
+    from using_church import churchify, dechurchify
+    if _program is None:
+        _start()
+    kind, data = job
+    if kind == 'call':
+        fn = getattr(church, data[0])
+        for arg in data[1:]:
+            fn = fn(churchify(arg))
+        return dechurchify(fn)
+    if kind == 'source':
+        term = terms.parse_expr(data, _program)
+    else:
+        term = terms.from_wire(data, _program)
+    machine = terms.default_machine
+    with machine.limit(**limits):
+        return dechurchify(machine.evaluate(term))
+
+
+def _evaluate_chunk(jobs, limits):
+    return [_evaluate(job, limits) for job in jobs]
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class Pool(object):
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_start)
+
+    def evaluate_many(self, exprs, chunksize=None, steps=None, depth=None, seconds=None):
+        # the dechurchified values of exprs, in order
+        jobs = [_encode(expr) for expr in exprs]
+        if not jobs:
+            return []
+        if chunksize is None:
+            # a few chunks per worker, to even out their loads
+            chunksize = max(1, len(jobs) // (self.workers * 4))
+        limits = dict(steps=steps, depth=depth, seconds=seconds)
+        chunks = _chunks(jobs, chunksize)
+        results = []
+        for chunk in self._executor.map(_evaluate_chunk, chunks, [limits] * len(chunks)):
+            results.extend(chunk)
+        return results
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def evaluate_many(exprs, workers=None, **options):
+    # evaluate_many() on a pool of workers (by default, one per core) which
+    # lasts for this batch only. with workers=0 the batch is evaluated in
+    # this process, the same way
+    if workers == 0:
+        limits = dict((k, options.get(k)) for k in ('steps', 'depth', 'seconds'))
+        return [_evaluate(_encode(expr), limits) for expr in exprs]
+    with Pool(workers) as pool:
+        return pool.evaluate_many(exprs, **options)
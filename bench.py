@@ -0,0 +1,490 @@
+# benchmarks for church.py
+#
+# run as "python bench.py" to print a table of timings.
+#
+# "python bench.py scaling [FILE]" sweeps the input size of the main
+# operations, printing the seconds, applications and peak memory each takes
+# and the complexity that best fits them, and saves the results to FILE as a
+# JSON baseline. "python bench.py compare OLD NEW [THRESHOLD]" lists what got
+# worse by more than THRESHOLD (a fraction, by default 0.25) between two such
+# baselines, and fails if anything did. steps are exact and repeatable;
+# seconds are only as steady as the machine the baselines were taken on.
+#
+# "python bench.py batch" times batch.evaluate_many with 1, 2 and 4 worker
+# processes.
+#
+# "python bench.py memory" compares the memory churchified lists of small
+# values hold on to, with and without interning.
+
+import json
+import math
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+import terms
+import using_church
+
+from church import *
+from using_church import *
+
+
+def _timed(fn, *args):
+    start = time.time()
+    result = fn(*args)
+    return time.time() - start, result
+
+
+def build_string(n, rope=False):
+    # a string of n characters, built one STRCAT at a time
+    s = churchify(Rope('') if rope else '')
+    c = churchify('x')
+    for _ in range(n):
+        s = STRCAT(s)(c)
+    return dechurchify(s)
+
+
+def build_list(n, rope=False):
+    # a list of n elements, built one APPEND at a time
+    lst = churchify(Rope([]) if rope else [])
+    x = churchify(None)
+    for _ in range(n):
+        lst = APPEND(lst)(x)
+    return dechurchify(lst)
+
+
+def bench_appends(sizes=(50, 100, 200)):
+    # repeated appends onto plain strings and lists, which copy the whole
+    # left operand every time, against the same on ropes
+    rows = []
+    for name, build in (('STRCAT', build_string), ('APPEND', build_list)):
+        for n in sizes:
+            plain, _ = _timed(build, n)
+            rope, _ = _timed(build, n, True)
+            rows.append((name, n, plain, rope))
+    return rows
+
+
+def _repeat(op, a, b, times):
+    for _ in range(times):
+        op(a)(b)
+
+
+def bench_compiled(times=2000):
+    # typed ops as church.py defines them, against compiler.py's output
+    import compiler
+    compiled = compiler.namespace(compiler.emit(compiler.compile_program()))
+    a, b = churchify(12), churchify(-5)
+    rows = []
+    for name in ('ADD', 'MULT', 'EQUALP', 'NEG'):
+        if name == 'NEG':
+            args = (lambda x: lambda _: NEG(x), lambda x: lambda _: compiled['NEG'](x))
+        else:
+            args = (globals()[name], compiled[name])
+        plain, _ = _timed(_repeat, args[0], a, b, times)
+        fast, _ = _timed(_repeat, args[1], a, b, times)
+        rows.append((name, times, plain, fast))
+    return rows
+
+
+# ADD, MULT, NEG and EQUALP as they were before they dispatched through
+# _ON_INT: a chain of BARE_IF tests, each running type comparers of its own
+BRANCHY_OPS = '''
+_BIN_OPERANDS = lambda tn1: lambda tn2: \
+        BARE_AND(BARE_OR(BARE_IS_BIN_INT(tn1))(BARE_IS_BIN_INT(tn2))) \
+                (BARE_AND(BARE_IS_ANY_INT(tn1))(BARE_IS_ANY_INT(tn2)))
+
+_BRANCHY_ADD = lambda tn1: lambda tn2: \
+        BARE_IF(BARE_AND(BARE_IS_POS_INT(tn1))
+                        (BARE_IS_POS_INT(tn2))) \
+         (lambda _: MK_POS_INT(BARE_ADD(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2)))) \
+         (lambda _: BARE_IF(BARE_AND(BARE_IS_POS_INT(tn1))
+                                    (BARE_IS_NEG_INT(tn2)))
+                     (lambda _: _SIGNED_DIFF(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2)))
+                     (lambda _: BARE_IF(BARE_AND(BARE_IS_NEG_INT(tn1))
+                                                (BARE_IS_POS_INT(tn2)))
+                                 (lambda _: _SIGNED_DIFF(BARE_VALUEOF(tn2))(BARE_VALUEOF(tn1)))
+                                 (lambda _: BARE_IF(BARE_AND(BARE_IS_NEG_INT(tn1))
+                                                            (BARE_IS_NEG_INT(tn2)))
+                                             (lambda _: MK_NEG_INT(BARE_ADD(BARE_VALUEOF(tn1))
+                                                                           (BARE_VALUEOF(tn2))))
+                                             (lambda _: BARE_IF(_BIN_OPERANDS(tn1)(tn2))
+                                                         (lambda _: _BIN_INT_ADD(tn1)(tn2))
+                                                         (RETURN_TYPE_ERROR)))))
+
+_BRANCHY_MULT = lambda tn1: lambda tn2: \
+        BARE_IF(BARE_OR(BARE_AND(BARE_IS_POS_INT(tn1))
+                                (BARE_IS_POS_INT(tn2)))
+                       (BARE_AND(BARE_IS_NEG_INT(tn1))
+                                (BARE_IS_NEG_INT(tn2)))) \
+         (lambda _: MK_POS_INT(BARE_MULT(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2)))) \
+         (lambda _: BARE_IF(BARE_OR(BARE_AND(BARE_IS_POS_INT(tn1))
+                                            (BARE_IS_NEG_INT(tn2)))
+                                   (BARE_AND(BARE_IS_NEG_INT(tn1))
+                                            (BARE_IS_POS_INT(tn2))))
+                     (lambda _: MK_NEG_INT(BARE_MULT(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2))))
+                     (lambda _: BARE_IF(_BIN_OPERANDS(tn1)(tn2))
+                                 (lambda _: _BIN_INT_MULT(tn1)(tn2))
+                                 (RETURN_TYPE_ERROR)))
+
+_BRANCHY_NEG = lambda tn: BARE_IF(BARE_IS_POS_INT(tn)) \
+                        (lambda _: MK_NEG_INT(BARE_VALUEOF(tn))) \
+                        (lambda _: BARE_IF(BARE_IS_NEG_INT(tn))
+                                          (lambda _: MK_POS_INT(BARE_VALUEOF(tn)))
+                                          (lambda _: BARE_IF(BARE_IS_BIN_INT(tn))
+                                                      (lambda _: BARE_VALUEOF(tn)(lambda neg: lambda bits:
+                                                                   _MK_SIGNED_BIN(BARE_NOT(neg))(bits)))
+                                                      (RETURN_TYPE_ERROR)))
+
+_BRANCHY_EQUALP = lambda tn1: lambda tn2: \
+        BARE_IF(BARE_OR(BARE_AND(BARE_IS_POS_INT(tn1))
+                                (BARE_IS_POS_INT(tn2)))
+                       (BARE_AND(BARE_IS_NEG_INT(tn1))
+                                (BARE_IS_NEG_INT(tn2)))) \
+         (lambda _: MK_BOOL(BARE_EQUALP(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2)))) \
+         (lambda _: BARE_IF(BARE_AND(BARE_IS_INT(tn1))
+                                    (BARE_IS_INT(tn2)))
+                     (lambda _: MK_BOOL(BARE_AND(BARE_IS_ZERO(BARE_VALUEOF(tn1)))
+                                                (BARE_IS_ZERO(BARE_VALUEOF(tn2)))))
+                     (lambda _: BARE_IF(_BIN_OPERANDS(tn1)(tn2))
+                                 (lambda _: _BIN_INT_EQUALP(tn1)(tn2))
+                                 (RETURN_TYPE_ERROR)))
+'''
+
+
+def _steps(program, name, args):
+    # the applications it takes the term machine to apply name to args
+    term = program.ref(name)
+    for arg in args:
+        term = terms.App(term, terms.Const(arg))
+    machine = terms.Machine()
+    machine.evaluate(term)
+    return machine.steps
+
+
+def bench_reductions(operands=(12, -5, BinInt(7), BinInt(-3))):
+    # applications each typed op takes with the operands' tags and values
+    # shared through _ON_INT, against the BARE_IF chains it replaced
+    program = terms.parse(BRANCHY_OPS, terms.load())
+    with terms.backend(program.namespace(), [using_church]):
+        values = [churchify(x) for x in operands]
+    rows = []
+    for name in ('ADD', 'MULT', 'EQUALP', 'NEG'):
+        pairs = [(i,) for i in range(len(operands))] if name == 'NEG' else \
+                [(i, j) for i in range(len(operands)) for j in range(len(operands))]
+        for pair in pairs:
+            args = [values[i] for i in pair]
+            label = ', '.join(repr(operands[i]) for i in pair)
+            rows.append((name, label, _steps(program, '_BRANCHY_' + name, args),
+                         _steps(program, name, args)))
+    return rows
+
+
+# the operations swept by scaling(): each takes a size and sets up its
+# inputs, and returns what to measure. results are decoded as part of the
+# measurement, since much of church.py's work is only done on demand
+def _churchify(n):
+    items = [0] * n
+    return lambda: churchify(items)
+
+
+def _dechurchify(n):
+    lst = churchify([0] * n)
+    return lambda: dechurchify(lst)
+
+
+def _binary(name):
+    def case(n):
+        a, b = churchify(n), churchify(n // 2)
+        return lambda: dechurchify(globals()[name](a)(b))
+    return case
+
+
+def _index(name, make):
+    def case(n):
+        lst, i = churchify(make(n)), churchify(n - 1)
+        return lambda: dechurchify(globals()[name](lst)(i))
+    return case
+
+
+def _join(name, make):
+    def case(n):
+        a, b = churchify(make(n)), churchify(make(n))
+        return lambda: dechurchify(globals()[name](a)(b))
+    return case
+
+
+def _append(n):
+    lst, x = churchify([0] * n), churchify(0)
+    return lambda: dechurchify(APPEND(lst)(x))
+
+
+def _unary(name):
+    def case(n):
+        a = churchify(n)
+        return lambda: dechurchify(globals()[name](a))
+    return case
+
+
+def _pow(n):
+    a, b = churchify(n), churchify(2)
+    return lambda: dechurchify(POW(a)(b))
+
+
+# binary ints of about n bits
+def _bin_div(n):
+    a, b = churchify(BinInt(2 ** n - 1)), churchify(BinInt(2 ** (n // 2) + 1))
+    return lambda: dechurchify(DIV(a)(b))
+
+
+def _bin_pow(n):
+    a, b = churchify(BinInt(3)), churchify(BinInt(n // 2))
+    return lambda: dechurchify(POW(a)(b))
+
+
+def _len(n):
+    lst = churchify([0] * n)
+    return lambda: dechurchify(LEN(lst))
+
+
+SCALING = OrderedDict([
+    ('churchify', _churchify),
+    ('dechurchify', _dechurchify),
+    ('ADD', _binary('ADD')),
+    ('SUB', _binary('SUB')),
+    ('MULT', _binary('MULT')),
+    ('EQUALP', _binary('EQUALP')),
+    ('DIV', _binary('DIV')),
+    ('MOD', _binary('MOD')),
+    ('POW', _pow),
+    ('ISQRT', _unary('ISQRT')),
+    ('BIN_DIV', _bin_div),
+    ('BIN_POW', _bin_pow),
+    ('ELT', _index('ELT', lambda n: [0] * n)),
+    ('STRCHR', _index('STRCHR', lambda n: 'x' * n)),
+    ('APPEND', _append),
+    ('CONCAT', _join('CONCAT', lambda n: [0] * n)),
+    ('STRCAT', _join('STRCAT', lambda n: 'x' * n)),
+    ('LEN', _len),
+])
+
+# the curves complexity() chooses from
+COMPLEXITIES = OrderedDict([
+    ('1', lambda n: 1.0),
+    ('log n', lambda n: math.log(n)),
+    ('n', lambda n: float(n)),
+    ('n log n', lambda n: n * math.log(n)),
+    ('n^2', lambda n: float(n * n)),
+    ('n^3', lambda n: float(n * n * n)),
+])
+
+
+def _fit(xs, ys):
+    # a, c >= 0 for which a + c * x is closest to ys, by least squares
+    k = float(len(xs))
+    mx, my = sum(xs) / k, sum(ys) / k
+    sxx = sum((x - mx) ** 2 for x in xs)
+    c = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx if sxx else 0.0
+    a = my - c * mx
+    if c < 0:
+        a, c = my, 0.0
+    elif a < 0:
+        a, c = 0.0, sum(x * y for x, y in zip(xs, ys)) / sum(x * x for x in xs)
+    return a, c
+
+
+def complexity(sizes, values):
+    # the curve a + c * f(n) which fits values best, relative to each value.
+    # a simpler curve is kept unless a more complex one fits clearly better
+    ys = [max(float(y), 1e-12) for y in values]
+    best = None
+    for name, f in COMPLEXITIES.items():
+        xs = [f(n) for n in sizes]
+        a, c = _fit(xs, ys)
+        error = sum(((a + c * x - y) / y) ** 2 for x, y in zip(xs, ys))
+        if best is None or error < best[0] * 0.5:
+            best = (error, name)
+    return best[1]
+
+
+def _per_run(run, least=0.01):
+    # the average seconds run takes, over enough runs to take least seconds.
+    # the caches are cleared each time, or later runs would only look up the
+    # first one's result
+    runs = 0
+    start = time.time()
+    while True:
+        using_church.clear_caches()
+        run()
+        runs += 1
+        elapsed = time.time() - start
+        if elapsed >= least:
+            return elapsed / runs
+
+
+def _measure(case, n, program, repeat):
+    # seconds (the best of repeat runs) and peak bytes on the closure
+    # backend, and applications on the term machine
+    using_church.clear_caches()
+    run = case(n)
+    seconds = min(_per_run(run) for _ in range(repeat))
+    using_church.clear_caches()
+    run = case(n)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    with terms.backend(program.namespace(), [sys.modules[__name__], using_church]):
+        using_church.clear_caches()
+        run = case(n)
+        steps = terms.default_machine.steps
+        run()
+        steps = terms.default_machine.steps - steps
+    using_church.clear_caches()
+    return seconds, steps, peak
+
+
+def scaling(sizes=(16, 32, 64, 128), names=None, repeat=3):
+    # {name: {'sizes', 'seconds', 'steps', 'peak', 'fit'}} for each operation
+    program = terms.load()
+    results = OrderedDict()
+    for name in names or SCALING:
+        rows = [_measure(SCALING[name], n, program, repeat) for n in sizes]
+        seconds, steps, peak = [list(column) for column in zip(*rows)]
+        results[name] = OrderedDict([
+            ('sizes', list(sizes)), ('seconds', seconds), ('steps', steps), ('peak', peak),
+            ('fit', OrderedDict([('seconds', complexity(sizes, seconds)),
+                                 ('steps', complexity(sizes, steps))]))])
+    return results
+
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=1)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def compare(old, new, threshold=0.25):
+    # (name, size, measure, old, new) for each measurement which is more
+    # than threshold worse in new than in old
+    regressions = []
+    for name, before in old.items():
+        after = new.get(name)
+        if after is None:
+            continue
+        for i, n in enumerate(before['sizes']):
+            if n not in after['sizes']:
+                continue
+            j = after['sizes'].index(n)
+            for measure in ('seconds', 'steps', 'peak'):
+                a, b = before[measure][i], after[measure][j]
+                if b > a * (1 + threshold):
+                    regressions.append((name, n, measure, a, b))
+    return regressions
+
+
+def print_scaling(results):
+    print('%-12s %6s %10s %10s %10s' % ('op', 'n', 'seconds', 'steps', 'peak'))
+    for name, r in results.items():
+        for n, seconds, steps, peak in zip(r['sizes'], r['seconds'], r['steps'], r['peak']):
+            print('%-12s %6d %9.5fs %10d %10d' % (name, n, seconds, steps, peak))
+        print('%-12s %6s  time O(%s), steps O(%s)' % ('', '', r['fit']['seconds'], r['fit']['steps']))
+
+
+def bench_batch(size=400, workers=(1, 2, 4)):
+    # throughput of batch.evaluate_many, by number of worker processes
+    import batch
+    exprs = [('MULT', 20 + i % 10, 30) for i in range(size)]
+    rows = []
+    for n in workers:
+        with batch.Pool(n) as pool:
+            pool.evaluate_many(exprs[:n])
+            seconds, _ = _timed(pool.evaluate_many, exprs)
+        rows.append((n, size, seconds))
+    return rows
+
+
+def _held(make):
+    # the bytes which the value make() returns holds on to, and the seconds
+    # making it takes, from empty caches
+    using_church.clear_caches()
+    tracemalloc.start()
+    try:
+        seconds, value = _timed(make)
+        held = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    using_church.clear_caches()
+    return held, seconds
+
+
+MEMORY = OrderedDict([
+    ('zeros', lambda n: [0] * n),
+    ('digits', lambda n: [i % 10 for i in range(n)]),
+    ('pairs', lambda n: [[i % 3, 'ab'] for i in range(n)]),
+    ('string', lambda n: 'abc' * (n // 3)),
+])
+
+
+def bench_memory(n=20000, names=None):
+    # (name, n, bytes, interned bytes, seconds, interned seconds) for
+    # churchifying each of the MEMORY inputs of size n
+    rows = []
+    for name in names or MEMORY:
+        items = MEMORY[name](n)
+        held, seconds = _held(lambda: churchify(items))
+        with interning():
+            interned, interned_seconds = _held(lambda: churchify(items))
+        rows.append((name, n, held, interned, seconds, interned_seconds))
+    return rows
+
+
+def main(argv=None):
+    argv = list(argv or ())
+    if argv and argv[0] == 'scaling':
+        results = scaling()
+        print_scaling(results)
+        if len(argv) > 1:
+            save(results, argv[1])
+        return 0
+    if argv and argv[0] == 'batch':
+        print('%-8s %6s %10s %12s' % ('workers', 'exprs', 'seconds', 'exprs/s'))
+        for n, size, seconds in bench_batch():
+            print('%-8d %6d %9.4fs %12.0f' % (n, size, seconds, size / seconds))
+        return 0
+    if argv and argv[0] == 'memory':
+        print('%-8s %6s %12s %12s %8s %10s %10s' % ('input', 'n', 'bytes', 'interned', 'saved',
+                                                   'seconds', 'interned'))
+        for name, n, held, interned, seconds, interned_seconds in bench_memory():
+            print('%-8s %6d %12d %12d %7.0f%% %9.4fs %9.4fs' % (
+                name, n, held, interned, 100.0 * (held - interned) / held, seconds, interned_seconds))
+        return 0
+    if argv and argv[0] == 'compare':
+        threshold = float(argv[3]) if len(argv) > 3 else 0.25
+        regressions = compare(load(argv[1]), load(argv[2]), threshold)
+        for name, n, measure, old, new in regressions:
+            print('%-12s %6d %-8s %12.6g -> %12.6g (%+.0f%%)' % (
+                name, n, measure, old, new, 100.0 * (new - old) / old if old else float('inf')))
+        return 1 if regressions else 0
+    print('%-8s %6s %10s %10s %12s' % ('op', 'n', 'plain', 'rope', 'rope ops/s'))
+    for name, n, plain, rope in bench_appends():
+        print('%-8s %6d %9.4fs %9.4fs %12.0f' % (name, n, plain, rope, n / rope))
+    print('')
+    print('%-8s %6s %10s %10s %12s' % ('op', 'calls', 'church.py', 'compiled', 'speedup'))
+    for name, n, plain, fast in bench_compiled():
+        print('%-8s %6d %9.4fs %9.4fs %11.2fx' % (name, n, plain, fast, plain / fast))
+    print('')
+    print('%-8s %-24s %8s %8s %8s' % ('op', 'operands', 'branchy', 'shared', 'saved'))
+    for name, label, branchy, shared in bench_reductions():
+        print('%-8s %-24s %8d %8d %8d' % (name, label, branchy, shared, branchy - shared))
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -63,6 +63,7 @@ BARE_TEN   = BARE_SUCC(BARE_NINE)
 NO_ERROR_id = BARE_ZERO
 TYPE_ERROR_id = BARE_ONE
 INDEX_ERROR_id = BARE_TWO
+ZERO_DIVISION_ERROR_id = BARE_THREE
 
 BARE_ADD = lambda n: lambda m: lambda f: lambda z: n(f)(m(f)(z))
 BARE_MULT = lambda n: lambda m: lambda f: lambda z: n(m(f))(z)
@@ -76,13 +77,17 @@ BARE_NOT = lambda b: lambda ontrue: lambda onfalse: b(onfalse)(ontrue)
 BARE_AND = lambda b1: lambda b2: b1(lambda _: b2)(lambda _: BARE_FALSE)
 BARE_OR  = lambda b1: lambda b2: b1(lambda _: BARE_TRUE)(lambda _: b2)
 BARE_XOR = lambda b1: lambda b2: b1(lambda _: BARE_NOT(b2))(lambda _: b2)
-BARE_EQUALP = lambda n1: lambda n2: (BARE_AND(BARE_IS_ZERO(BARE_SUB(n1)(n2)))
-                                             (BARE_IS_ZERO(BARE_SUB(n2)(n1))))
 
-BARE_LEQ = lambda n1: lambda n2: BARE_IS_ZERO(BARE_SUB(n1)(n2))
-BARE_GEQ = lambda n1: lambda n2: BARE_IS_ZERO(BARE_SUB(n2)(n1))
-BARE_LT = lambda n1: lambda n2: BARE_NOT(BARE_GEQ(n1)(n2))
-BARE_GT = lambda n1: lambda n2: BARE_NOT(BARE_LEQ(n1)(n2))
+# comparisons by subtraction. BARE_SUB(n)(m) takes m predecessors, each of
+# which costs O(n), so these are O(n*m). the lockstep comparisons further down
+# replace them; they're kept as the reference those are checked against.
+_SUB_EQUALP = lambda n1: lambda n2: (BARE_AND(BARE_IS_ZERO(BARE_SUB(n1)(n2)))
+                                              (BARE_IS_ZERO(BARE_SUB(n2)(n1))))
+
+_SUB_LEQ = lambda n1: lambda n2: BARE_IS_ZERO(BARE_SUB(n1)(n2))
+_SUB_GEQ = lambda n1: lambda n2: BARE_IS_ZERO(BARE_SUB(n2)(n1))
+_SUB_LT = lambda n1: lambda n2: BARE_NOT(_SUB_GEQ(n1)(n2))
+_SUB_GT = lambda n1: lambda n2: BARE_NOT(_SUB_LEQ(n1)(n2))
 
 # recursion combinator
 Y = ((lambda f: lambda F: F(lambda x: f(f)(F)(x)))
@@ -119,6 +124,206 @@ BARE_LEN = Y(lambda LEN_r:
                      cons(lambda _: BARE_ZERO)
                          (lambda head: lambda tail: BARE_SUCC(LEN_r(tail))))
 
+# orderings: functions which take (onlt, oneq, ongt) and invoke the
+# appropriate one
+BARE_ORD_LT = lambda onlt: lambda oneq: lambda ongt: onlt(BARE_VOID)
+BARE_ORD_EQ = lambda onlt: lambda oneq: lambda ongt: oneq(BARE_VOID)
+BARE_ORD_GT = lambda onlt: lambda oneq: lambda ongt: ongt(BARE_VOID)
+
+# lockstep comparisons: n2 is unrolled into the list [n2, n2-1, ..., 1], and
+# n1 then steps through it one element per iteration, counting any steps it
+# takes past the end. that costs O(n1+n2) applications in all, where comparing
+# by subtraction costs O(n1*n2), and since it only iterates numerals it needs
+# no more stack than applying them does.
+_COUNTDOWN = lambda n: \
+        BARE_PAIRHEAD(n(lambda p: p(lambda lst: lambda k:
+                                      (lambda k1: BARE_PAIR(BARE_CONS(k1)(lst))(k1))(BARE_SUCC(k))))
+                       (BARE_PAIR(BARE_NIL)(BARE_ZERO)))
+_DIFF_STEP = lambda p: \
+        p(lambda rest: lambda extra:
+            rest(lambda _: BARE_PAIR(BARE_NIL)(BARE_SUCC(extra)))
+                (lambda head: lambda tail: BARE_PAIR(tail)(extra)))
+
+# a bare pair (n1 >= n2, |n1 - n2|), in one lockstep pass
+BARE_NUM_DIFF = lambda n1: lambda n2: \
+        n1(_DIFF_STEP)(BARE_PAIR(_COUNTDOWN(n2))(BARE_ZERO)) \
+          (lambda rest: lambda extra:
+             rest(lambda _: BARE_PAIR(BARE_TRUE)(extra))
+                 (lambda head: lambda tail: BARE_PAIR(BARE_FALSE)(head)))
+
+BARE_NUM_CMP = lambda n1: lambda n2: \
+        BARE_NUM_DIFF(n1)(n2)(lambda ge: lambda diff:
+                                ge(lambda _: BARE_IS_ZERO(diff)(lambda _: BARE_ORD_EQ)
+                                                               (lambda _: BARE_ORD_GT))
+                                  (lambda _: BARE_ORD_LT))
+
+BARE_EQUALP = lambda n1: lambda n2: \
+        BARE_NUM_CMP(n1)(n2)(lambda _: BARE_FALSE)(lambda _: BARE_TRUE)(lambda _: BARE_FALSE)
+BARE_LEQ = lambda n1: lambda n2: \
+        BARE_NUM_CMP(n1)(n2)(lambda _: BARE_TRUE)(lambda _: BARE_TRUE)(lambda _: BARE_FALSE)
+BARE_GEQ = lambda n1: lambda n2: \
+        BARE_NUM_CMP(n1)(n2)(lambda _: BARE_FALSE)(lambda _: BARE_TRUE)(lambda _: BARE_TRUE)
+BARE_LT = lambda n1: lambda n2: \
+        BARE_NUM_CMP(n1)(n2)(lambda _: BARE_TRUE)(lambda _: BARE_FALSE)(lambda _: BARE_FALSE)
+BARE_GT = lambda n1: lambda n2: \
+        BARE_NUM_CMP(n1)(n2)(lambda _: BARE_FALSE)(lambda _: BARE_FALSE)(lambda _: BARE_TRUE)
+
+# division, in one pass over n: a countdown of d's length is stepped through
+# once per unit of n, and every time it runs out the quotient goes up and it
+# starts over. that costs O(n+d) applications, where repeated subtraction
+# with BARE_SUB costs O(n*d) per subtraction. returns a bare pair (n / d,
+# n % d). d must not be zero.
+_TRIPLE = lambda a: lambda b: lambda c: lambda f: f(a)(b)(c)
+_DIVMOD_STEP = lambda full: lambda state: \
+        state(lambda q: lambda r: lambda rest:
+                rest(lambda _: state)
+                    (lambda head: lambda tail:
+                       BARE_IS_NIL(tail)(lambda _: _TRIPLE(BARE_SUCC(q))(BARE_ZERO)(full))
+                                        (lambda _: _TRIPLE(q)(BARE_SUCC(r))(tail))))
+BARE_DIVMOD = lambda n: lambda d: \
+        (lambda full: n(_DIVMOD_STEP(full))(_TRIPLE(BARE_ZERO)(BARE_ZERO)(full))
+                       (lambda q: lambda r: lambda rest: BARE_PAIR(q)(r))) \
+        (_COUNTDOWN(d))
+BARE_DIV = lambda n: lambda d: BARE_PAIRHEAD(BARE_DIVMOD(n)(d))
+BARE_MOD = lambda n: lambda d: BARE_PAIRTAIL(BARE_DIVMOD(n)(d))
+
+# b to the power e: applying the numeral e to b composes b with itself e times
+BARE_EXP = lambda b: lambda e: e(b)
+
+# the integer square root, in one pass over n like BARE_DIVMOD: between the
+# squares of r and r+1 lie 2r+1 numbers, so the countdown starts out one
+# long and grows by two every time it runs out and r goes up. O(n)
+_ISQRT_STEP = lambda state: \
+        state(lambda r: lambda rest: lambda full:
+                rest(lambda _: state)
+                    (lambda head: lambda tail:
+                       BARE_IS_NIL(tail)
+                         (lambda _: (lambda longer: _TRIPLE(BARE_SUCC(r))(longer)(longer))
+                                    (BARE_CONS(BARE_VOID)(BARE_CONS(BARE_VOID)(full))))
+                         (lambda _: _TRIPLE(r)(tail)(full))))
+BARE_ISQRT = lambda n: \
+        (lambda one: n(_ISQRT_STEP)(_TRIPLE(BARE_ZERO)(one)(one))(lambda r: lambda rest: lambda full: r)) \
+        (BARE_CONS(BARE_VOID)(BARE_NIL))
+
+# binary numbers: bare lists of bare booleans, least significant bit first,
+# with no trailing BARE_FALSE bits (so zero is the empty list). operations on
+# them take time proportional to the number of bits, not to the value.
+BARE_BIN_ZERO = BARE_NIL
+BARE_BIN_ONE = BARE_CONS(BARE_TRUE)(BARE_NIL)
+
+# prepends a bit without leaving a trailing zero
+_BIN_CONS = lambda bit: lambda rest: \
+        bit(lambda _: BARE_CONS(BARE_TRUE)(rest)) \
+           (lambda _: rest(lambda _: BARE_NIL)
+                          (lambda head: lambda tail: BARE_CONS(BARE_FALSE)(rest)))
+
+BARE_BIN_SUCC = Y(lambda SUCC_r:
+                    lambda bits:
+                      bits(lambda _: BARE_BIN_ONE)
+                          (lambda bit: lambda rest:
+                             bit(lambda _: BARE_CONS(BARE_FALSE)(SUCC_r(rest)))
+                                (lambda _: BARE_CONS(BARE_TRUE)(rest))))
+
+# only defined for nonzero numbers
+_BIN_PRED = Y(lambda PRED_r:
+                lambda bits:
+                  bits(lambda _: BARE_NIL)
+                      (lambda bit: lambda rest:
+                         bit(lambda _: _BIN_CONS(BARE_FALSE)(rest))
+                            (lambda _: BARE_CONS(BARE_TRUE)(PRED_r(rest)))))
+
+# carry and borrow out of one bit of an addition or subtraction
+_BIN_CARRY = lambda b1: lambda b2: lambda c: \
+        BARE_OR(BARE_AND(b1)(b2))(BARE_AND(c)(BARE_OR(b1)(b2)))
+_BIN_BORROW = lambda b1: lambda b2: lambda c: \
+        BARE_OR(BARE_AND(BARE_NOT(b1))(BARE_OR(b2)(c)))(BARE_AND(b2)(c))
+
+_BIN_ADDC = Y(lambda ADDC_r:
+                lambda carry: lambda bits1: lambda bits2:
+                  bits1(lambda _: carry(lambda _: BARE_BIN_SUCC(bits2))(lambda _: bits2))
+                       (lambda b1: lambda rest1:
+                          bits2(lambda _: carry(lambda _: BARE_BIN_SUCC(bits1))(lambda _: bits1))
+                               (lambda b2: lambda rest2:
+                                  BARE_CONS(BARE_XOR(BARE_XOR(b1)(b2))(carry))
+                                           (ADDC_r(_BIN_CARRY(b1)(b2)(carry))(rest1)(rest2)))))
+BARE_BIN_ADD = _BIN_ADDC(BARE_FALSE)
+
+# only defined when bits1 >= bits2
+_BIN_SUBB = Y(lambda SUBB_r:
+                lambda borrow: lambda bits1: lambda bits2:
+                  bits2(lambda _: borrow(lambda _: _BIN_PRED(bits1))(lambda _: bits1))
+                       (lambda b2: lambda rest2:
+                          bits1(lambda _: BARE_NIL)
+                               (lambda b1: lambda rest1:
+                                  _BIN_CONS(BARE_XOR(BARE_XOR(b1)(b2))(borrow))
+                                           (SUBB_r(_BIN_BORROW(b1)(b2)(borrow))(rest1)(rest2)))))
+
+# walks both numbers from the least significant bit up, so that the most
+# significant differing bit has the last word
+_BIN_CMP = Y(lambda CMP_r:
+               lambda acc: lambda bits1: lambda bits2:
+                 bits1(lambda _: bits2(lambda _: acc)
+                                      (lambda b2: lambda rest2: BARE_ORD_LT))
+                      (lambda b1: lambda rest1:
+                         bits2(lambda _: BARE_ORD_GT)
+                              (lambda b2: lambda rest2:
+                                 CMP_r(BARE_XOR(b1)(b2)
+                                               (lambda _: b1(lambda _: BARE_ORD_GT)
+                                                            (lambda _: BARE_ORD_LT))
+                                               (lambda _: acc))
+                                      (rest1)(rest2))))
+BARE_BIN_CMP = _BIN_CMP(BARE_ORD_EQ)
+
+BARE_BIN_EQUALP = lambda bits1: lambda bits2: \
+        BARE_BIN_CMP(bits1)(bits2)(lambda _: BARE_FALSE)(lambda _: BARE_TRUE)(lambda _: BARE_FALSE)
+BARE_BIN_LEQ = lambda bits1: lambda bits2: \
+        BARE_BIN_CMP(bits1)(bits2)(lambda _: BARE_TRUE)(lambda _: BARE_TRUE)(lambda _: BARE_FALSE)
+
+# like BARE_SUB, this bottoms out at zero
+BARE_BIN_SUB = lambda bits1: lambda bits2: \
+        BARE_BIN_LEQ(bits1)(bits2)(lambda _: BARE_NIL)(lambda _: _BIN_SUBB(BARE_FALSE)(bits1)(bits2))
+
+# shift and add
+BARE_BIN_MULT = Y(lambda MULT_r:
+                    lambda bits1: lambda bits2:
+                      bits1(lambda _: BARE_NIL)
+                           (lambda bit: lambda rest:
+                              (lambda shifted: bit(lambda _: BARE_BIN_ADD(bits2)(shifted))
+                                                  (lambda _: shifted))
+                              (_BIN_CONS(BARE_FALSE)(MULT_r(rest)(bits2)))))
+
+# long division, from the most significant bit down. returns a bare pair
+# (bits / d, bits % d). d must not be zero
+BARE_BIN_DIVMOD = Y(lambda DIVMOD_r:
+                      lambda bits: lambda d:
+                        bits(lambda _: BARE_PAIR(BARE_BIN_ZERO)(BARE_BIN_ZERO))
+                            (lambda bit: lambda rest:
+                               DIVMOD_r(rest)(d)(lambda q: lambda r:
+                                 (lambda r2: BARE_BIN_LEQ(d)(r2)
+                                               (lambda _: BARE_PAIR(_BIN_CONS(BARE_TRUE)(q))
+                                                                   (_BIN_SUBB(BARE_FALSE)(r2)(d)))
+                                               (lambda _: BARE_PAIR(_BIN_CONS(BARE_FALSE)(q))(r2)))
+                                 (_BIN_CONS(bit)(r)))))
+
+# square and multiply, one squaring per bit of the exponent
+BARE_BIN_EXP = Y(lambda EXP_r:
+                   lambda bits: lambda ebits:
+                     ebits(lambda _: BARE_BIN_ONE)
+                          (lambda bit: lambda rest:
+                             (lambda half:
+                                (lambda square: bit(lambda _: BARE_BIN_MULT(square)(bits))
+                                                   (lambda _: square))
+                                (BARE_BIN_MULT(half)(half)))
+                             (EXP_r(bits)(rest))))
+
+BARE_BIN_FROM_NUM = lambda n: n(BARE_BIN_SUCC)(BARE_BIN_ZERO)
+BARE_NUM_FROM_BIN = Y(lambda NUM_r:
+                        lambda bits:
+                          bits(lambda _: BARE_ZERO)
+                              (lambda bit: lambda rest:
+                                 (lambda twice: bit(lambda _: BARE_SUCC(twice))(lambda _: twice))
+                                 ((lambda half: BARE_ADD(half)(half))(NUM_r(rest)))))
+
 # resultpairs: these are bare pairs (something, errnum) indicating the result
 # of an operation where a successful result could be anything. errnum is
 # a bare number: NO_ERROR_id if no error occurred, or some other error ID
@@ -147,14 +352,206 @@ BARE_ELT = lambda lst: lambda n: \
            (lambda errnum: rpair)) \
           (BARE_NTHCONS(lst)(n))
 
-# typed objects are pairs where the head is a bare ordinal indicating type,
-# and the tail is the bare value.
-BARE_TYPEOF = BARE_PAIRHEAD
-BARE_VALUEOF = BARE_PAIRTAIL
+# random-access lists: okasaki's skew binary random-access lists. the value is
+# a bare list of bare pairs (weight, tree), smallest tree first, where each
+# tree is complete and holds its elements in preorder. weights are binary
+# numbers of the form 2**k - 1 (a run of BARE_TRUE bits), and only the first
+# two may be equal. prepending costs a constant number of trees, and finding
+# an element walks one path down the spine and one down a tree, so both are
+# logarithmic in the length (in steps on binary numbers of as many bits).
+_RA_LEAF = lambda x: lambda onleaf: lambda onnode: onleaf(x)
+_RA_NODE = lambda x: lambda t1: lambda t2: lambda onleaf: lambda onnode: onnode(x)(t1)(t2)
+_RA_ROOT = lambda tree: tree(lambda x: x)(lambda x: lambda t1: lambda t2: x)
 
-TYPE_OF = lambda tval: MK_POS_INT(BARE_TYPEOF(tval))
+BARE_RA_NIL = BARE_NIL
+BARE_RA_IS_NIL = BARE_IS_NIL
 
-# a VOID-typed object
+BARE_RA_PREPEND = lambda x: lambda ra: \
+        (lambda single:
+           ra(single)
+             (lambda first: lambda rest:
+                rest(single)
+                    (lambda second: lambda rest2:
+                       first(lambda w1: lambda t1:
+                         second(lambda w2: lambda t2:
+                           BARE_BIN_EQUALP(w1)(w2)
+                             (lambda _: BARE_CONS(BARE_PAIR(BARE_CONS(BARE_TRUE)(w1))
+                                                           (_RA_NODE(x)(t1)(t2)))
+                                                 (rest2))
+                             (single)))))) \
+        (lambda _: BARE_CONS(BARE_PAIR(BARE_BIN_ONE)(_RA_LEAF(x)))(ra))
+
+# a view of a random-access list as a cons: (onempty, onpair) with the head
+# and a random-access list of the rest
+BARE_RA_UNCONS = lambda ra: lambda onempty: lambda onpair: \
+        ra(onempty) \
+          (lambda first: lambda rest:
+             first(lambda w: lambda tree:
+               tree(lambda x: onpair(x)(rest))
+                   (lambda x: lambda t1: lambda t2:
+                      onpair(x)(BARE_CONS(BARE_PAIR(BARE_CONSTAIL(w))(t1))
+                                         (BARE_CONS(BARE_PAIR(BARE_CONSTAIL(w))(t2))(rest))))))
+BARE_RA_HEAD = lambda ra: BARE_RA_UNCONS(ra)(BARE_VOID)(lambda head: lambda tail: head)
+BARE_RA_TAIL = lambda ra: BARE_RA_UNCONS(ra)(BARE_VOID)(lambda head: lambda tail: tail)
+
+# the length, as a binary number
+BARE_RA_LEN = Y(lambda LEN_r:
+                  lambda ra:
+                    ra(lambda _: BARE_BIN_ZERO)
+                      (lambda first: lambda rest: BARE_BIN_ADD(BARE_PAIRHEAD(first))(LEN_r(rest))))
+
+# the element at binary index i of a tree of weight w, where i < w. the left
+# subtree holds indexes 1 to w/2, and the right one the rest
+_RA_TREE_ELT = Y(lambda ELT_r:
+                   lambda w: lambda tree: lambda i:
+                     BARE_IS_NIL(i)
+                       (lambda _: _RA_ROOT(tree))
+                       (lambda _: tree(lambda x: x)
+                                      (lambda x: lambda t1: lambda t2:
+                                         (lambda half: lambda j:
+                                            BARE_BIN_LEQ(half)(j)
+                                              (lambda _: ELT_r(half)(t2)(BARE_BIN_SUB(j)(half)))
+                                              (lambda _: ELT_r(half)(t1)(j)))
+                                         (BARE_CONSTAIL(w))(_BIN_PRED(i)))))
+
+# takes a binary index, and returns a resultpair
+BARE_RA_ELT = Y(lambda ELT_r:
+                  lambda ra: lambda i:
+                    ra(lambda _: BARE_RESULTPAIR(BARE_VOID)(INDEX_ERROR_id))
+                      (lambda first: lambda rest:
+                         first(lambda w: lambda tree:
+                           BARE_BIN_LEQ(w)(i)
+                             (lambda _: ELT_r(rest)(BARE_BIN_SUB(i)(w)))
+                             (lambda _: BARE_RESULTPAIR(_RA_TREE_ELT(w)(tree)(i))(NO_ERROR_id)))))
+
+# ropes: trees whose leaves are bare lists, and where concatenating two ropes
+# just makes a node of them. a rope is a function which takes (onleaf, onnode)
+# and invokes onleaf(lst) or onnode(left, right). building a list up piece by
+# piece as a rope costs one node per piece, and the pieces are only copied
+# once, when the rope is flattened.
+BARE_ROPE_LEAF = lambda lst: lambda onleaf: lambda onnode: onleaf(lst)
+BARE_ROPE_CAT = lambda r1: lambda r2: lambda onleaf: lambda onnode: onnode(r1)(r2)
+BARE_ROPE_NIL = BARE_ROPE_LEAF(BARE_NIL)
+BARE_ROPE_APPEND = lambda rope: lambda newval: \
+        BARE_ROPE_CAT(rope)(BARE_ROPE_LEAF(BARE_CONS(newval)(BARE_NIL)))
+
+# flattens rope in front of the bare list acc, working from the right so
+# that every leaf is copied once
+_ROPE_FLATTEN_ONTO = Y(lambda FLATTEN_r:
+                         lambda rope: lambda acc:
+                           rope(lambda lst: BARE_CONCAT(lst)(acc))
+                               (lambda left: lambda right: FLATTEN_r(left)(FLATTEN_r(right)(acc))))
+BARE_ROPE_FLATTEN = lambda rope: _ROPE_FLATTEN_ONTO(rope)(BARE_NIL)
+
+BARE_ROPE_LEN = Y(lambda LEN_r:
+                    lambda rope:
+                      rope(BARE_LEN)
+                          (lambda left: lambda right: BARE_ADD(LEN_r(left))(LEN_r(right))))
+
+# maps: persistent AVL trees of (key, value) entries, ordered by a bare
+# comparison function cmp(k1)(k2), which returns an ordering. a map is a
+# function which takes (onempty, onnode) and invokes onempty(VOID) or
+# onnode(height, left, key, value, right), where height is a bare number.
+# the heights of a node's subtrees differ by at most one, so a map of n
+# entries is O(log n) deep and a lookup takes O(log n) comparisons. keeping
+# that up costs a few comparisons of heights, which are O(log n) themselves,
+# at each node on the path.
+BARE_MAP_NIL = lambda onempty: lambda onnode: onempty(BARE_VOID)
+BARE_MAP_NODE = lambda h: lambda l: lambda k: lambda v: lambda r: \
+        lambda onempty: lambda onnode: onnode(h)(l)(k)(v)(r)
+BARE_MAP_IS_NIL = lambda m: \
+        m(lambda _: BARE_TRUE)(lambda h: lambda l: lambda k: lambda v: lambda r: BARE_FALSE)
+BARE_MAP_HEIGHT = lambda m: \
+        m(lambda _: BARE_ZERO)(lambda h: lambda l: lambda k: lambda v: lambda r: h)
+
+# a node of l and r, which must be balanced already
+_MAP_JOIN = lambda l: lambda k: lambda v: lambda r: \
+        (lambda hl: lambda hr:
+           BARE_MAP_NODE(BARE_SUCC(BARE_GEQ(hl)(hr)(lambda _: hl)(lambda _: hr)))(l)(k)(v)(r)) \
+        (BARE_MAP_HEIGHT(l))(BARE_MAP_HEIGHT(r))
+
+# a node of l and r where l is two levels taller than r, rotated into
+# balance; and the other way around
+_MAP_ROTATE_RIGHT = lambda l: lambda k: lambda v: lambda r: \
+        l(BARE_VOID) \
+         (lambda lh: lambda ll: lambda lk: lambda lv: lambda lr:
+            BARE_GEQ(BARE_MAP_HEIGHT(ll))(BARE_MAP_HEIGHT(lr))
+              (lambda _: _MAP_JOIN(ll)(lk)(lv)(_MAP_JOIN(lr)(k)(v)(r)))
+              (lambda _: lr(BARE_VOID)
+                           (lambda lrh: lambda lrl: lambda lrk: lambda lrv: lambda lrr:
+                              _MAP_JOIN(_MAP_JOIN(ll)(lk)(lv)(lrl))(lrk)(lrv)
+                                       (_MAP_JOIN(lrr)(k)(v)(r)))))
+_MAP_ROTATE_LEFT = lambda l: lambda k: lambda v: lambda r: \
+        r(BARE_VOID) \
+         (lambda rh: lambda rl: lambda rk: lambda rv: lambda rr:
+            BARE_GEQ(BARE_MAP_HEIGHT(rr))(BARE_MAP_HEIGHT(rl))
+              (lambda _: _MAP_JOIN(_MAP_JOIN(l)(k)(v)(rl))(rk)(rv)(rr))
+              (lambda _: rl(BARE_VOID)
+                           (lambda rlh: lambda rll: lambda rlk: lambda rlv: lambda rlr:
+                              _MAP_JOIN(_MAP_JOIN(l)(k)(v)(rll))(rlk)(rlv)
+                                       (_MAP_JOIN(rlr)(rk)(rv)(rr)))))
+
+# a node of l and r, whose heights differ by at most two
+_MAP_BALANCE = lambda l: lambda k: lambda v: lambda r: \
+        BARE_NUM_DIFF(BARE_MAP_HEIGHT(l))(BARE_MAP_HEIGHT(r))(lambda ge: lambda diff:
+          BARE_IS_ZERO(_PRED(diff))
+            (lambda _: _MAP_JOIN(l)(k)(v)(r))
+            (lambda _: ge(lambda _: _MAP_ROTATE_RIGHT(l)(k)(v)(r))
+                         (lambda _: _MAP_ROTATE_LEFT(l)(k)(v)(r))))
+
+# returns a resultpair
+BARE_MAP_GET = Y(lambda GET_r:
+                   lambda cmp: lambda m: lambda key:
+                     m(lambda _: BARE_RESULTPAIR(BARE_VOID)(INDEX_ERROR_id))
+                      (lambda h: lambda l: lambda k: lambda v: lambda r:
+                         cmp(key)(k)(lambda _: GET_r(cmp)(l)(key))
+                                    (lambda _: BARE_RESULTPAIR(v)(NO_ERROR_id))
+                                    (lambda _: GET_r(cmp)(r)(key))))
+
+# adds an entry, or replaces the one with an equal key
+BARE_MAP_PUT = Y(lambda PUT_r:
+                   lambda cmp: lambda m: lambda key: lambda val:
+                     m(lambda _: BARE_MAP_NODE(BARE_ONE)(BARE_MAP_NIL)(key)(val)(BARE_MAP_NIL))
+                      (lambda h: lambda l: lambda k: lambda v: lambda r:
+                         cmp(key)(k)(lambda _: _MAP_BALANCE(PUT_r(cmp)(l)(key)(val))(k)(v)(r))
+                                    (lambda _: BARE_MAP_NODE(h)(l)(key)(val)(r))
+                                    (lambda _: _MAP_BALANCE(l)(k)(v)(PUT_r(cmp)(r)(key)(val)))))
+
+# passes the first entry of a nonempty map, and the map without it, to
+# onmin(key)(value)(rest)
+_MAP_POP_MIN = Y(lambda POP_r:
+                   lambda m: lambda onmin:
+                     m(BARE_VOID)
+                      (lambda h: lambda l: lambda k: lambda v: lambda r:
+                         BARE_MAP_IS_NIL(l)
+                           (lambda _: onmin(k)(v)(r))
+                           (lambda _: POP_r(l)(lambda mk: lambda mv: lambda rest:
+                                                 onmin(mk)(mv)(_MAP_BALANCE(rest)(k)(v)(r))))))
+
+# removes the entry with an equal key, if there is one
+BARE_MAP_DEL = Y(lambda DEL_r:
+                   lambda cmp: lambda m: lambda key:
+                     m(lambda _: BARE_MAP_NIL)
+                      (lambda h: lambda l: lambda k: lambda v: lambda r:
+                         cmp(key)(k)(lambda _: _MAP_BALANCE(DEL_r(cmp)(l)(key))(k)(v)(r))
+                                    (lambda _: BARE_MAP_IS_NIL(r)
+                                                 (lambda _: l)
+                                                 (lambda _: _MAP_POP_MIN(r)(lambda mk: lambda mv: lambda rest:
+                                                                              _MAP_BALANCE(l)(mk)(mv)(rest))))
+                                    (lambda _: _MAP_BALANCE(l)(k)(v)(DEL_r(cmp)(r)(key)))))
+
+BARE_MAP_LEN = Y(lambda LEN_r:
+                   lambda m:
+                     m(lambda _: BARE_ZERO)
+                      (lambda h: lambda l: lambda k: lambda v: lambda r:
+                         BARE_SUCC(BARE_ADD(LEN_r(l))(LEN_r(r)))))
+
+# typed objects are pairs where the head is a type tag (see below) and the
+# tail is the bare value.
+BARE_TYPETAG = BARE_PAIRHEAD
+BARE_VALUEOF = BARE_PAIRTAIL
+
+# type ids are bare ordinals. a VOID-typed object
 VOID_id = BARE_ONE
 BOOL_id = BARE_TWO
 POS_INT_id = BARE_THREE
@@ -165,8 +562,56 @@ RESULTPAIR_id = BARE_SEVEN
 CHAR_id = BARE_EIGHT
 STRING_id = BARE_NINE
 ERROR_id = BARE_TEN
+# a binary integer: its value is a bare pair (negative, bits), where negative
+# is a bare boolean and bits a binary number
+BIN_INT_id = BARE_SUCC(BARE_TEN)
+# random-access lists and strings: their values are random-access lists (of
+# typed values, or of bare numbers for the characters)
+RA_LIST_id = BARE_SUCC(BIN_INT_id)
+RA_STRING_id = BARE_SUCC(RA_LIST_id)
+# ropes of typed values, and ropes of characters
+ROPE_id = BARE_SUCC(RA_STRING_id)
+ROPE_STRING_id = BARE_SUCC(ROPE_id)
+# maps from typed ints and strings to typed values: their values are bare
+# maps, ordered by _KEY_CMP
+MAP_id = BARE_SUCC(ROPE_STRING_id)
+# byte strings: their values are bare lists of bare numbers
+BYTES_id = BARE_SUCC(MAP_id)
 
-_TYPECOMPARER = lambda typenum: lambda typedx: BARE_EQUALP(BARE_TYPEOF(typedx))(typenum)
+# the highest type id
+_NUM_TYPES = BYTES_id
+
+# type tags are selectors: a tag takes one argument per type id, in order,
+# and returns the argument in the position of its own type. that way asking
+# for the type of a typed object costs a constant number of applications,
+# instead of a BARE_EQUALP between unary type ids.
+
+# rebuilds a numeral as a plain chain of BARE_SUCCs, so that computing it
+# once is enough
+_NORMALIZE = lambda n: n(BARE_SUCC)(BARE_ZERO)
+# ignores n arguments, then acts as x
+_SKIP = lambda n: lambda x: n(lambda f: lambda _: f)(x)
+# applies f to x, n times over
+_FEED = lambda n: lambda x: lambda f: n(lambda g: g(x))(f)
+
+_MAKE_TYPETAG = lambda typnum: \
+        (lambda after: _SKIP(_PRED(typnum))(lambda x: _SKIP(after)(x))) \
+        (_NORMALIZE(BARE_SUB(_NUM_TYPES)(typnum)))
+
+BARE_TYPEOF = lambda tval: \
+        BARE_TYPETAG(tval)(VOID_id)(BOOL_id)(POS_INT_id)(NEG_INT_id)(LIST_id) \
+                          (PAIR_id)(RESULTPAIR_id)(CHAR_id)(STRING_id)(ERROR_id) \
+                          (BIN_INT_id)(RA_LIST_id)(RA_STRING_id)(ROPE_id)(ROPE_STRING_id) \
+                          (MAP_id)(BYTES_id)
+
+TYPE_OF = lambda tval: MK_POS_INT(BARE_TYPEOF(tval))
+
+# feeds a tag BARE_FALSE for every type but typnum, and BARE_TRUE for typnum
+_TYPECOMPARER = lambda typnum: \
+        (lambda before: lambda after: lambda typedx:
+           _FEED(after)(BARE_FALSE)(_FEED(before)(BARE_FALSE)(BARE_TYPETAG(typedx))(BARE_TRUE))) \
+        (_NORMALIZE(_PRED(typnum))) \
+        (_NORMALIZE(BARE_SUB(_NUM_TYPES)(typnum)))
 
 BARE_IS_VOID = _TYPECOMPARER(VOID_id)
 BARE_IS_BOOL = _TYPECOMPARER(BOOL_id)
@@ -178,10 +623,20 @@ BARE_IS_RESULTPAIR = _TYPECOMPARER(RESULTPAIR_id)
 BARE_IS_CHAR = _TYPECOMPARER(CHAR_id)
 BARE_IS_STRING = _TYPECOMPARER(STRING_id)
 BARE_IS_ERROR = _TYPECOMPARER(ERROR_id)
+BARE_IS_BIN_INT = _TYPECOMPARER(BIN_INT_id)
+BARE_IS_RA_LIST = _TYPECOMPARER(RA_LIST_id)
+BARE_IS_RA_STRING = _TYPECOMPARER(RA_STRING_id)
+BARE_IS_ROPE = _TYPECOMPARER(ROPE_id)
+BARE_IS_ROPE_STRING = _TYPECOMPARER(ROPE_STRING_id)
+BARE_IS_MAP = _TYPECOMPARER(MAP_id)
+BARE_IS_BYTES = _TYPECOMPARER(BYTES_id)
 BARE_IS_INT = lambda typedx: (BARE_OR(BARE_IS_POS_INT(typedx))
                                      (BARE_IS_NEG_INT(typedx)))
+BARE_IS_ANY_INT = lambda typedx: (BARE_OR(BARE_IS_INT(typedx))
+                                         (BARE_IS_BIN_INT(typedx)))
 
-BARE_MAKE_TYPEDVAR_MAKER = lambda typnum: lambda val: BARE_PAIR(typnum)(val)
+BARE_MAKE_TYPEDVAR_MAKER = lambda typnum: \
+        (lambda tag: lambda val: BARE_PAIR(tag)(val))(_MAKE_TYPETAG(typnum))
 
 MK_VOID = BARE_MAKE_TYPEDVAR_MAKER(VOID_id)
 MK_BOOL = BARE_MAKE_TYPEDVAR_MAKER(BOOL_id)
@@ -193,6 +648,13 @@ MK_RESULTPAIR = BARE_MAKE_TYPEDVAR_MAKER(RESULTPAIR_id)
 MK_CHAR = BARE_MAKE_TYPEDVAR_MAKER(CHAR_id)
 MK_STRING = BARE_MAKE_TYPEDVAR_MAKER(STRING_id)
 MK_ERROR = BARE_MAKE_TYPEDVAR_MAKER(ERROR_id)
+MK_BIN_INT = BARE_MAKE_TYPEDVAR_MAKER(BIN_INT_id)
+MK_RA_LIST = BARE_MAKE_TYPEDVAR_MAKER(RA_LIST_id)
+MK_RA_STRING = BARE_MAKE_TYPEDVAR_MAKER(RA_STRING_id)
+MK_ROPE = BARE_MAKE_TYPEDVAR_MAKER(ROPE_id)
+MK_ROPE_STRING = BARE_MAKE_TYPEDVAR_MAKER(ROPE_STRING_id)
+MK_MAP = BARE_MAKE_TYPEDVAR_MAKER(MAP_id)
+MK_BYTES = BARE_MAKE_TYPEDVAR_MAKER(BYTES_id)
 
 MK_RESULTPAIR_FROM = lambda val: lambda errnum: MK_RESULTPAIR(BARE_RESULTPAIR(val)(errnum))
 
@@ -201,7 +663,12 @@ TRUE = MK_BOOL(BARE_TRUE)
 FALSE = MK_BOOL(BARE_FALSE)
 ZERO = MK_POS_INT(BARE_ZERO)
 
-_TYPED_TYPECOMPARER = lambda comparer: lambda tval: MK_BOOL(comparer(tval))
+# the typed ops hand out shared constants rather than building equal values
+# over and over: TRUE or FALSE themselves for a bare boolean, and the error
+# resultpairs further down
+_INTERN_BOOL = lambda b: b(lambda _: TRUE)(lambda _: FALSE)
+
+_TYPED_TYPECOMPARER = lambda comparer: lambda tval: _INTERN_BOOL(comparer(tval))
 
 IS_VOID = _TYPED_TYPECOMPARER(BARE_IS_VOID)
 IS_BOOL = _TYPED_TYPECOMPARER(BARE_IS_BOOL)
@@ -214,14 +681,27 @@ IS_RESULTPAIR = _TYPED_TYPECOMPARER(BARE_IS_RESULTPAIR)
 IS_CHAR = _TYPED_TYPECOMPARER(BARE_IS_CHAR)
 IS_STRING = _TYPED_TYPECOMPARER(BARE_IS_STRING)
 IS_ERROR = _TYPED_TYPECOMPARER(BARE_IS_ERROR)
+IS_BIN_INT = _TYPED_TYPECOMPARER(BARE_IS_BIN_INT)
+IS_RA_LIST = _TYPED_TYPECOMPARER(BARE_IS_RA_LIST)
+IS_RA_STRING = _TYPED_TYPECOMPARER(BARE_IS_RA_STRING)
+IS_ROPE = _TYPED_TYPECOMPARER(BARE_IS_ROPE)
+IS_ROPE_STRING = _TYPED_TYPECOMPARER(BARE_IS_ROPE_STRING)
+IS_MAP = _TYPED_TYPECOMPARER(BARE_IS_MAP)
+IS_BYTES = _TYPED_TYPECOMPARER(BARE_IS_BYTES)
 
 NO_ERROR    = MK_ERROR(NO_ERROR_id)
 TYPE_ERROR  = MK_ERROR(TYPE_ERROR_id)
 INDEX_ERROR = MK_ERROR(INDEX_ERROR_id)
+ZERO_DIVISION_ERROR = MK_ERROR(ZERO_DIVISION_ERROR_id)
 
 RETURN_TYPE_ERROR = lambda _: TYPE_ERROR
 RETURN_INDEX_ERROR = lambda _: INDEX_ERROR
 
+TYPE_ERROR_RESULT = MK_RESULTPAIR_FROM(VOID)(TYPE_ERROR_id)
+ZERO_DIVISION_ERROR_RESULT = MK_RESULTPAIR_FROM(VOID)(ZERO_DIVISION_ERROR_id)
+
+RETURN_TYPE_ERROR_RESULT = lambda _: TYPE_ERROR_RESULT
+
 ON_RESULT = lambda tval: lambda onsuccess: lambda onfail: \
         BARE_IF(BARE_IS_RESULTPAIR(tval)) \
                (lambda _: BARE_ON_RESULT(BARE_VALUEOF(tval))
@@ -231,11 +711,11 @@ ON_RESULT = lambda tval: lambda onsuccess: lambda onfail: \
 
 OR = lambda tb1: lambda tb2: \
         BARE_IF(BARE_AND(BARE_IS_BOOL(tb1))(BARE_IS_BOOL(tb2))) \
-               (lambda _: MK_BOOL(BARE_OR(BARE_VALUEOF(tb1))(BARE_VALUEOF(tb2)))) \
+               (lambda _: _INTERN_BOOL(BARE_OR(BARE_VALUEOF(tb1))(BARE_VALUEOF(tb2)))) \
                (RETURN_TYPE_ERROR)
 AND = lambda tb1: lambda tb2: \
         BARE_IF(BARE_AND(BARE_IS_BOOL(tb1))(BARE_IS_BOOL(tb2))) \
-               (lambda _: MK_BOOL(BARE_AND(BARE_VALUEOF(tb1))(BARE_VALUEOF(tb2)))) \
+               (lambda _: _INTERN_BOOL(BARE_AND(BARE_VALUEOF(tb1))(BARE_VALUEOF(tb2)))) \
                (RETURN_TYPE_ERROR)
 IF = lambda test: lambda ontrue: lambda onfalse: \
         BARE_IF(BARE_IS_BOOL(test)) \
@@ -243,113 +723,330 @@ IF = lambda test: lambda ontrue: lambda onfalse: \
                (RETURN_TYPE_ERROR)
 
 IS_ZERO = lambda tnum: BARE_IF(BARE_IS_INT(tnum)) \
-                              (lambda _: MK_BOOL(BARE_IS_ZERO(BARE_VALUEOF(tnum)))) \
+                              (lambda _: _INTERN_BOOL(BARE_IS_ZERO(BARE_VALUEOF(tnum)))) \
                               (RETURN_TYPE_ERROR)
 
+# binary integer arithmetic. when an operand of ADD, MULT or EQUALP is a
+# binary integer and the other is any integer, the unary one is converted and
+# the operation is done in binary.
+
+# the (negative, bits) pair for any typed integer
+_SIGNED_BIN = lambda tn: \
+        BARE_IF(BARE_IS_BIN_INT(tn)) \
+               (lambda _: BARE_VALUEOF(tn)) \
+               (lambda _: BARE_PAIR(BARE_IS_NEG_INT(tn))(BARE_BIN_FROM_NUM(BARE_VALUEOF(tn))))
+
+_MK_SIGNED_BIN = lambda neg: lambda bits: MK_BIN_INT(BARE_PAIR(neg)(bits))
+
+_BIN_INT_ADD = lambda tn1: lambda tn2: \
+        _SIGNED_BIN(tn1)(lambda neg1: lambda bits1:
+          _SIGNED_BIN(tn2)(lambda neg2: lambda bits2:
+            BARE_XOR(neg1)(neg2)
+              (lambda _: BARE_BIN_LEQ(bits2)(bits1)
+                          (lambda _: _MK_SIGNED_BIN(neg1)(BARE_BIN_SUB(bits1)(bits2)))
+                          (lambda _: _MK_SIGNED_BIN(neg2)(BARE_BIN_SUB(bits2)(bits1))))
+              (lambda _: _MK_SIGNED_BIN(neg1)(BARE_BIN_ADD(bits1)(bits2)))))
+
+_BIN_INT_MULT = lambda tn1: lambda tn2: \
+        _SIGNED_BIN(tn1)(lambda neg1: lambda bits1:
+          _SIGNED_BIN(tn2)(lambda neg2: lambda bits2:
+            _MK_SIGNED_BIN(BARE_XOR(neg1)(neg2))(BARE_BIN_MULT(bits1)(bits2))))
+
+_BIN_INT_EQUALP = lambda tn1: lambda tn2: \
+        _SIGNED_BIN(tn1)(lambda neg1: lambda bits1:
+          _SIGNED_BIN(tn2)(lambda neg2: lambda bits2:
+            _INTERN_BOOL(BARE_AND(BARE_BIN_EQUALP(bits1)(bits2))
+                            (BARE_OR(BARE_NOT(BARE_XOR(neg1)(neg2)))
+                                    (BARE_IS_NIL(bits1))))))
+
+# mixed signs: the magnitudes are compared and subtracted in one lockstep pass
+_SIGNED_DIFF = lambda n1: lambda n2: \
+        BARE_NUM_DIFF(n1)(n2)(lambda ge: lambda diff: ge(lambda _: MK_POS_INT(diff))
+                                                        (lambda _: MK_NEG_INT(diff)))
+
+# the integer ops look at each operand's type once: _ON_INT feeds the tag of
+# tn its four handlers in the positions of the integer types (and onother in
+# every other position), and passes the chosen one the value of tn. a BARE_IF
+# chain of BARE_IS_* tests would instead run the type comparers over and over,
+# once per branch.
+_BEFORE_POS_INT = _NORMALIZE(_PRED(POS_INT_id))
+_BETWEEN_NEG_BIN = _NORMALIZE(BARE_SUB(_PRED(BIN_INT_id))(NEG_INT_id))
+_AFTER_BIN_INT = _NORMALIZE(BARE_SUB(_NUM_TYPES)(BIN_INT_id))
+
+_ON_INT = lambda tn: lambda onpos: lambda onneg: lambda onbin: lambda onother: \
+        _FEED(_AFTER_BIN_INT)(onother) \
+             (_FEED(_BETWEEN_NEG_BIN)(onother)
+                   (_FEED(_BEFORE_POS_INT)(onother)(BARE_TYPETAG(tn))(onpos)(onneg))
+                   (onbin)) \
+             (BARE_VALUEOF(tn))
+
+# calls onint(tn2's value), or onother when tn2 is no integer at all
+_IF_ANY_INT = lambda tn: lambda onint: lambda onother: _ON_INT(tn)(onint)(onint)(onint)(onother)
+
 ADD = lambda tn1: lambda tn2: \
-        BARE_IF(BARE_AND(BARE_IS_POS_INT(tn1))
-                        (BARE_IS_POS_INT(tn2))) \
-         (lambda _: MK_POS_INT(BARE_ADD(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2)))) \
-         (lambda _: BARE_IF(BARE_AND(BARE_IS_POS_INT(tn1))
-                                    (BARE_IS_NEG_INT(tn2)))
-                     (lambda _: BARE_IF(BARE_LEQ(BARE_VALUEOF(tn2))(BARE_VALUEOF(tn1)))
-                                 (lambda _: MK_POS_INT(BARE_SUB(BARE_VALUEOF(tn1))
-                                                               (BARE_VALUEOF(tn2))))
-                                 (lambda _: MK_NEG_INT(BARE_SUB(BARE_VALUEOF(tn2))
-                                                               (BARE_VALUEOF(tn1)))))
-                     (lambda _: BARE_IF(BARE_AND(BARE_IS_NEG_INT(tn1))
-                                                (BARE_IS_POS_INT(tn2)))
-                                 (lambda _: BARE_IF(BARE_LEQ(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2)))
-                                             (lambda _: MK_POS_INT(BARE_SUB(BARE_VALUEOF(tn2))
-                                                                           (BARE_VALUEOF(tn1))))
-                                             (lambda _: MK_NEG_INT(BARE_SUB(BARE_VALUEOF(tn1))
-                                                                           (BARE_VALUEOF(tn2)))))
-                                 (lambda _: BARE_IF(BARE_AND(BARE_IS_NEG_INT(tn1))
-                                                            (BARE_IS_NEG_INT(tn2)))
-                                             (lambda _: MK_NEG_INT(BARE_ADD(BARE_VALUEOF(tn1))
-                                                                           (BARE_VALUEOF(tn2))))
-                                             (RETURN_TYPE_ERROR))))
+        _ON_INT(tn1) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: MK_POS_INT(BARE_ADD(v1)(v2)))
+                        (lambda v2: _SIGNED_DIFF(v1)(v2))
+                        (lambda v2: _BIN_INT_ADD(tn1)(tn2))
+                        (RETURN_TYPE_ERROR)) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: _SIGNED_DIFF(v2)(v1))
+                        (lambda v2: MK_NEG_INT(BARE_ADD(v1)(v2)))
+                        (lambda v2: _BIN_INT_ADD(tn1)(tn2))
+                        (RETURN_TYPE_ERROR)) \
+          (lambda v1: _IF_ANY_INT(tn2)(lambda v2: _BIN_INT_ADD(tn1)(tn2))(RETURN_TYPE_ERROR)) \
+          (RETURN_TYPE_ERROR)
 
 MULT = lambda tn1: lambda tn2: \
-        BARE_IF(BARE_OR(BARE_AND(BARE_IS_POS_INT(tn1))
-                                (BARE_IS_POS_INT(tn2)))
-                       (BARE_AND(BARE_IS_NEG_INT(tn1))
-                                (BARE_IS_NEG_INT(tn2)))) \
-         (lambda _: MK_POS_INT(BARE_MULT(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2)))) \
-         (lambda _: BARE_IF(BARE_OR(BARE_AND(BARE_IS_POS_INT(tn1))
-                                            (BARE_IS_NEG_INT(tn2)))
-                                   (BARE_AND(BARE_IS_NEG_INT(tn1))
-                                            (BARE_IS_POS_INT(tn2))))
-                     (lambda _: MK_NEG_INT(BARE_MULT(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2))))
-                     (RETURN_TYPE_ERROR))
-
-NEG = lambda tn: BARE_IF(BARE_IS_POS_INT(tn)) \
-                        (lambda _: MK_NEG_INT(BARE_VALUEOF(tn))) \
-                        (lambda _: BARE_IF(BARE_IS_NEG_INT(tn))
-                                          (lambda _: MK_POS_INT(BARE_VALUEOF(tn)))
-                                          (RETURN_TYPE_ERROR))
+        _ON_INT(tn1) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: MK_POS_INT(BARE_MULT(v1)(v2)))
+                        (lambda v2: MK_NEG_INT(BARE_MULT(v1)(v2)))
+                        (lambda v2: _BIN_INT_MULT(tn1)(tn2))
+                        (RETURN_TYPE_ERROR)) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: MK_NEG_INT(BARE_MULT(v1)(v2)))
+                        (lambda v2: MK_POS_INT(BARE_MULT(v1)(v2)))
+                        (lambda v2: _BIN_INT_MULT(tn1)(tn2))
+                        (RETURN_TYPE_ERROR)) \
+          (lambda v1: _IF_ANY_INT(tn2)(lambda v2: _BIN_INT_MULT(tn1)(tn2))(RETURN_TYPE_ERROR)) \
+          (RETURN_TYPE_ERROR)
+
+NEG = lambda tn: \
+        _ON_INT(tn) \
+          (lambda v: MK_NEG_INT(v)) \
+          (lambda v: MK_POS_INT(v)) \
+          (lambda v: v(lambda neg: lambda bits: _MK_SIGNED_BIN(BARE_NOT(neg))(bits))) \
+          (RETURN_TYPE_ERROR)
 
 SUB = lambda tn1: lambda tn2: ADD(tn1)(NEG(tn2))
 
+# a positive and a negative int are only equal when both are zero
+_BOTH_ZERO = lambda v1: lambda v2: _INTERN_BOOL(BARE_AND(BARE_IS_ZERO(v1))(BARE_IS_ZERO(v2)))
+
 EQUALP = lambda tn1: lambda tn2: \
-        BARE_IF(BARE_OR(BARE_AND(BARE_IS_POS_INT(tn1))
-                                (BARE_IS_POS_INT(tn2)))
-                       (BARE_AND(BARE_IS_NEG_INT(tn1))
-                                (BARE_IS_NEG_INT(tn2)))) \
-         (lambda _: MK_BOOL(BARE_EQUALP(BARE_VALUEOF(tn1))(BARE_VALUEOF(tn2)))) \
-         (lambda _: BARE_IF(BARE_AND(BARE_IS_INT(tn1))
-                                    (BARE_IS_INT(tn2)))
-                     (lambda _: MK_BOOL(BARE_AND(BARE_IS_ZERO(BARE_VALUEOF(tn1)))
-                                                (BARE_IS_ZERO(BARE_VALUEOF(tn2)))))
-                     (RETURN_TYPE_ERROR))
-
-IS_EMPTY = lambda tlst: BARE_IF(BARE_IS_LIST(tlst)) \
-                               (lambda _: MK_BOOL(BARE_IS_NIL(BARE_VALUEOF(tlst)))) \
+        _ON_INT(tn1) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: _INTERN_BOOL(BARE_EQUALP(v1)(v2)))
+                        (lambda v2: _BOTH_ZERO(v1)(v2))
+                        (lambda v2: _BIN_INT_EQUALP(tn1)(tn2))
+                        (RETURN_TYPE_ERROR)) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: _BOTH_ZERO(v1)(v2))
+                        (lambda v2: _INTERN_BOOL(BARE_EQUALP(v1)(v2)))
+                        (lambda v2: _BIN_INT_EQUALP(tn1)(tn2))
+                        (RETURN_TYPE_ERROR)) \
+          (lambda v1: _IF_ANY_INT(tn2)(lambda v2: _BIN_INT_EQUALP(tn1)(tn2))(RETURN_TYPE_ERROR)) \
+          (RETURN_TYPE_ERROR)
+
+# division rounds toward negative infinity, as python's does: when the signs
+# differ and there is a remainder, the quotient is one further from zero and
+# the remainder is the divisor less the remainder. the remainder takes the
+# divisor's sign.
+#
+# num(f) passes f the operations on magnitudes, unary or binary: a maker of
+# typed integers by sign, a zero test, the successor, and subtraction. qr is
+# the bare pair (q, r) of the magnitudes, and pick gets the typed q and r.
+_MK_SIGNED_NUM = lambda neg: lambda n: neg(lambda _: MK_NEG_INT(n))(lambda _: MK_POS_INT(n))
+_UNARY_NUM = lambda f: \
+        f(_MK_SIGNED_NUM)(BARE_IS_ZERO)(BARE_SUCC)(lambda n1: lambda n2: BARE_PAIRTAIL(BARE_NUM_DIFF(n1)(n2)))
+_BINARY_NUM = lambda f: f(_MK_SIGNED_BIN)(BARE_IS_NIL)(BARE_BIN_SUCC)(BARE_BIN_SUB)
+
+_FLOOR_DIVMOD = lambda num: lambda neg1: lambda neg2: lambda d: lambda qr: lambda pick: \
+        num(lambda mk: lambda iszero: lambda succ: lambda sub:
+              qr(lambda q: lambda r:
+                   BARE_AND(BARE_XOR(neg1)(neg2))(BARE_NOT(iszero(r)))
+                     (lambda _: pick(mk(BARE_TRUE)(succ(q)))(mk(neg2)(sub(d)(r))))
+                     (lambda _: pick(mk(BARE_XOR(neg1)(neg2))(q))(mk(neg2)(r)))))
+
+_NUM_DIVIDE = lambda neg1: lambda v1: lambda neg2: lambda v2: lambda pick: \
+        BARE_IS_ZERO(v2) \
+          (lambda _: ZERO_DIVISION_ERROR_RESULT) \
+          (lambda _: MK_RESULTPAIR_FROM(_FLOOR_DIVMOD(_UNARY_NUM)(neg1)(neg2)(v2)(BARE_DIVMOD(v1)(v2))(pick))
+                                       (NO_ERROR_id))
+
+_BIN_INT_DIVIDE = lambda tn1: lambda tn2: lambda pick: \
+        _SIGNED_BIN(tn1)(lambda neg1: lambda bits1:
+          _SIGNED_BIN(tn2)(lambda neg2: lambda bits2:
+            BARE_IS_NIL(bits2)
+              (lambda _: ZERO_DIVISION_ERROR_RESULT)
+              (lambda _: MK_RESULTPAIR_FROM(_FLOOR_DIVMOD(_BINARY_NUM)(neg1)(neg2)(bits2)
+                                                         (BARE_BIN_DIVMOD(bits1)(bits2))(pick))
+                                           (NO_ERROR_id))))
+
+_DIVIDE = lambda tn1: lambda tn2: lambda pick: \
+        _ON_INT(tn1) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: _NUM_DIVIDE(BARE_FALSE)(v1)(BARE_FALSE)(v2)(pick))
+                        (lambda v2: _NUM_DIVIDE(BARE_FALSE)(v1)(BARE_TRUE)(v2)(pick))
+                        (lambda v2: _BIN_INT_DIVIDE(tn1)(tn2)(pick))
+                        (RETURN_TYPE_ERROR_RESULT)) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: _NUM_DIVIDE(BARE_TRUE)(v1)(BARE_FALSE)(v2)(pick))
+                        (lambda v2: _NUM_DIVIDE(BARE_TRUE)(v1)(BARE_TRUE)(v2)(pick))
+                        (lambda v2: _BIN_INT_DIVIDE(tn1)(tn2)(pick))
+                        (RETURN_TYPE_ERROR_RESULT)) \
+          (lambda v1: _IF_ANY_INT(tn2)(lambda v2: _BIN_INT_DIVIDE(tn1)(tn2)(pick))(RETURN_TYPE_ERROR_RESULT)) \
+          (RETURN_TYPE_ERROR_RESULT)
+
+# DIV and MOD return resultpairs, with a zero division error for a zero divisor
+DIV = lambda tn1: lambda tn2: _DIVIDE(tn1)(tn2)(lambda q: lambda r: q)
+MOD = lambda tn1: lambda tn2: _DIVIDE(tn1)(tn2)(lambda q: lambda r: r)
+
+_IS_EVEN = lambda n: n(BARE_NOT)(BARE_TRUE)
+_BIN_IS_ODD = lambda bits: bits(lambda _: BARE_FALSE)(lambda bit: lambda rest: bit)
+
+_BIN_INT_POW = lambda tn: lambda ebits: \
+        _SIGNED_BIN(tn)(lambda neg: lambda bits:
+          MK_RESULTPAIR_FROM(_MK_SIGNED_BIN(BARE_AND(neg)(_BIN_IS_ODD(ebits)))(BARE_BIN_EXP(bits)(ebits)))
+                            (NO_ERROR_id))
+
+# POW returns a resultpair too. a negative exponent is a type error, since
+# the result would be no integer
+POW = lambda tn1: lambda tn2: \
+        _ON_INT(tn2) \
+          (lambda e: _ON_INT(tn1)
+                       (lambda b: MK_RESULTPAIR_FROM(MK_POS_INT(BARE_EXP(b)(e)))(NO_ERROR_id))
+                       (lambda b: MK_RESULTPAIR_FROM(_MK_SIGNED_NUM(BARE_NOT(_IS_EVEN(e)))(BARE_EXP(b)(e)))
+                                                    (NO_ERROR_id))
+                       (lambda b: _BIN_INT_POW(tn1)(BARE_BIN_FROM_NUM(e)))
+                       (RETURN_TYPE_ERROR_RESULT)) \
+          (lambda e: BARE_IS_ZERO(e)
+                       (lambda _: _IF_ANY_INT(tn1)
+                                    (lambda b: MK_RESULTPAIR_FROM(MK_POS_INT(BARE_ONE))(NO_ERROR_id))
+                                    (RETURN_TYPE_ERROR_RESULT))
+                       (RETURN_TYPE_ERROR_RESULT)) \
+          (lambda e: e(lambda neg: lambda ebits:
+                         BARE_AND(neg)(BARE_NOT(BARE_IS_NIL(ebits)))
+                           (RETURN_TYPE_ERROR_RESULT)
+                           (lambda _: _IF_ANY_INT(tn1)(lambda b: _BIN_INT_POW(tn1)(ebits))(RETURN_TYPE_ERROR_RESULT)))) \
+          (RETURN_TYPE_ERROR_RESULT)
+
+# the integer square root of a positive int
+ISQRT = lambda tn: BARE_IF(BARE_IS_POS_INT(tn)) \
+                          (lambda _: MK_POS_INT(BARE_ISQRT(BARE_VALUEOF(tn)))) \
+                          (RETURN_TYPE_ERROR)
+
+# the list ops also take byte strings, whose elements are positive ints
+IS_EMPTY = lambda tlst: BARE_IF(BARE_OR(BARE_OR(BARE_IS_LIST(tlst))(BARE_IS_RA_LIST(tlst)))
+                                       (BARE_IS_BYTES(tlst))) \
+                               (lambda _: _INTERN_BOOL(BARE_IS_NIL(BARE_VALUEOF(tlst)))) \
                                (RETURN_TYPE_ERROR)
 
 HEAD = lambda tlst: BARE_IF(BARE_IS_LIST(tlst)) \
                            (lambda _: BARE_VALUEOF(tlst)(RETURN_INDEX_ERROR)
                                                      (lambda head: lambda tail: head)) \
-                           (RETURN_TYPE_ERROR)
+                           (lambda _: BARE_IF(BARE_IS_RA_LIST(tlst))
+                                       (lambda _: BARE_RA_UNCONS(BARE_VALUEOF(tlst))(RETURN_INDEX_ERROR)
+                                                                (lambda head: lambda tail: head))
+                                       (lambda _: BARE_IF(BARE_IS_BYTES(tlst))
+                                                   (lambda _: BARE_VALUEOF(tlst)(RETURN_INDEX_ERROR)
+                                                                             (lambda head: lambda tail:
+                                                                                MK_POS_INT(head)))
+                                                   (RETURN_TYPE_ERROR)))
 TAIL = lambda tlst: BARE_IF(BARE_IS_LIST(tlst)) \
                            (lambda _: BARE_VALUEOF(tlst)(RETURN_INDEX_ERROR)
                                                      (lambda head: lambda tail: MK_LIST(tail))) \
-                           (RETURN_TYPE_ERROR)
+                           (lambda _: BARE_IF(BARE_IS_RA_LIST(tlst))
+                                       (lambda _: BARE_RA_UNCONS(BARE_VALUEOF(tlst))(RETURN_INDEX_ERROR)
+                                                                (lambda head: lambda tail: MK_RA_LIST(tail)))
+                                       (lambda _: BARE_IF(BARE_IS_BYTES(tlst))
+                                                   (lambda _: BARE_VALUEOF(tlst)(RETURN_INDEX_ERROR)
+                                                                             (lambda head: lambda tail:
+                                                                                MK_BYTES(tail)))
+                                                   (RETURN_TYPE_ERROR)))
 LEN = lambda tlst: BARE_IF(BARE_IS_LIST(tlst)) \
                           (lambda _: MK_POS_INT(BARE_LEN(BARE_VALUEOF(tlst)))) \
-                          (RETURN_TYPE_ERROR)
+                          (lambda _: BARE_IF(BARE_IS_RA_LIST(tlst))
+                                      (lambda _: MK_POS_INT(BARE_NUM_FROM_BIN(BARE_RA_LEN(BARE_VALUEOF(tlst)))))
+                                      (lambda _: BARE_IF(BARE_IS_ROPE(tlst))
+                                                  (lambda _: MK_POS_INT(BARE_ROPE_LEN(BARE_VALUEOF(tlst))))
+                                                  (lambda _: BARE_IF(BARE_IS_BYTES(tlst))
+                                                              (lambda _: MK_POS_INT(BARE_LEN(BARE_VALUEOF(tlst))))
+                                                              (RETURN_TYPE_ERROR))))
+
+# the binary index for a typed integer, passed to onindex; or an error id,
+# passed to onfail. positive ints are converted, and binary ints are used as
+# they are, so indexing with a binary int costs no more than the lookup
+_RA_INDEX = lambda n: lambda onindex: lambda onfail: \
+        BARE_IF(BARE_IS_POS_INT(n)) \
+               (lambda _: onindex(BARE_BIN_FROM_NUM(BARE_VALUEOF(n)))) \
+               (lambda _: BARE_IF(BARE_IS_BIN_INT(n))
+                           (lambda _: BARE_VALUEOF(n)(lambda neg: lambda bits:
+                                        BARE_IF(BARE_AND(neg)(BARE_NOT(BARE_IS_NIL(bits))))
+                                               (lambda _: onfail(INDEX_ERROR_id))
+                                               (lambda _: onindex(bits))))
+                           (lambda _: onfail(TYPE_ERROR_id)))
 
 ELT = lambda tlst: lambda n: \
         BARE_IF(BARE_AND(BARE_IS_LIST(tlst))
                         (BARE_IS_POS_INT(n))) \
                (lambda _: MK_RESULTPAIR(BARE_ELT(BARE_VALUEOF(tlst))(BARE_VALUEOF(n)))) \
-               (lambda _: MK_RESULTPAIR_FROM(VOID)(TYPE_ERROR_id))
+               (lambda _: BARE_IF(BARE_IS_RA_LIST(tlst))
+                           (lambda _: _RA_INDEX(n)
+                                        (lambda i: MK_RESULTPAIR(BARE_RA_ELT(BARE_VALUEOF(tlst))(i)))
+                                        (lambda errnum: MK_RESULTPAIR_FROM(VOID)(errnum)))
+                           (lambda _: BARE_IF(BARE_AND(BARE_IS_ROPE(tlst))
+                                                      (BARE_IS_POS_INT(n)))
+                                       (lambda _: MK_RESULTPAIR(BARE_ELT(BARE_ROPE_FLATTEN(BARE_VALUEOF(tlst)))
+                                                                        (BARE_VALUEOF(n))))
+                                       (lambda _: BARE_IF(BARE_AND(BARE_IS_BYTES(tlst))
+                                                                  (BARE_IS_POS_INT(n)))
+                                                   (lambda _: BARE_ON_RESULT(BARE_ELT(BARE_VALUEOF(tlst))
+                                                                                     (BARE_VALUEOF(n)))
+                                                                (lambda succ: MK_RESULTPAIR_FROM(MK_POS_INT(succ))
+                                                                                                (NO_ERROR_id))
+                                                                (lambda errnum: MK_RESULTPAIR_FROM(VOID)(errnum)))
+                                                   (RETURN_TYPE_ERROR_RESULT))))
 
 PREPEND = lambda tval: lambda tlst: \
         BARE_IF(BARE_IS_LIST(tlst)) \
                (lambda _: MK_LIST(BARE_PREPEND(tval)(BARE_VALUEOF(tlst)))) \
-               (RETURN_TYPE_ERROR)
+               (lambda _: BARE_IF(BARE_IS_RA_LIST(tlst))
+                           (lambda _: MK_RA_LIST(BARE_RA_PREPEND(tval)(BARE_VALUEOF(tlst))))
+                           (RETURN_TYPE_ERROR))
 
 APPEND = lambda tlst: lambda tval: \
         BARE_IF(BARE_IS_LIST(tlst)) \
                (lambda _: MK_LIST(BARE_APPEND(BARE_VALUEOF(tlst))(tval))) \
-               (RETURN_TYPE_ERROR)
+               (lambda _: BARE_IF(BARE_IS_ROPE(tlst))
+                           (lambda _: MK_ROPE(BARE_ROPE_APPEND(BARE_VALUEOF(tlst))(tval)))
+                           (RETURN_TYPE_ERROR))
+
+# the bare rope for a list or string, or for a rope of either
+_AS_ROPE = lambda tval: \
+        BARE_IF(BARE_OR(BARE_IS_ROPE(tval))(BARE_IS_ROPE_STRING(tval))) \
+               (lambda _: BARE_VALUEOF(tval)) \
+               (lambda _: BARE_ROPE_LEAF(BARE_VALUEOF(tval)))
 
+# concatenating a list and a rope makes a rope, in constant time. so does
+# concatenating two ropes
 CONCAT = lambda lst1: lambda lst2: \
         BARE_IF(BARE_AND(BARE_IS_LIST(lst1))
                         (BARE_IS_LIST(lst2))) \
                (lambda _: MK_LIST(BARE_CONCAT(BARE_VALUEOF(lst1))(BARE_VALUEOF(lst2)))) \
-               (RETURN_TYPE_ERROR)
+               (lambda _: BARE_IF(BARE_AND(BARE_OR(BARE_IS_LIST(lst1))(BARE_IS_ROPE(lst1)))
+                                          (BARE_OR(BARE_IS_LIST(lst2))(BARE_IS_ROPE(lst2))))
+                           (lambda _: MK_ROPE(BARE_ROPE_CAT(_AS_ROPE(lst1))(_AS_ROPE(lst2))))
+                           (RETURN_TYPE_ERROR))
 
 STRLEN = lambda tstr: BARE_IF(BARE_IS_STRING(tstr)) \
                              (lambda _: MK_POS_INT(BARE_LEN(BARE_VALUEOF(tstr)))) \
-                             (RETURN_TYPE_ERROR)
+                             (lambda _: BARE_IF(BARE_IS_RA_STRING(tstr))
+                                         (lambda _: MK_POS_INT(BARE_NUM_FROM_BIN(BARE_RA_LEN(BARE_VALUEOF(tstr)))))
+                                         (lambda _: BARE_IF(BARE_IS_ROPE_STRING(tstr))
+                                                     (lambda _: MK_POS_INT(BARE_ROPE_LEN(BARE_VALUEOF(tstr))))
+                                                     (RETURN_TYPE_ERROR)))
 
 STRCAT = lambda str1: lambda str2: \
         BARE_IF(BARE_AND(BARE_IS_STRING(str1))
                         (BARE_IS_STRING(str2))) \
                (lambda _: MK_STRING(BARE_CONCAT(BARE_VALUEOF(str1))(BARE_VALUEOF(str2)))) \
-               (RETURN_TYPE_ERROR)
+               (lambda _: BARE_IF(BARE_AND(BARE_OR(BARE_IS_STRING(str1))(BARE_IS_ROPE_STRING(str1)))
+                                          (BARE_OR(BARE_IS_STRING(str2))(BARE_IS_ROPE_STRING(str2))))
+                           (lambda _: MK_ROPE_STRING(BARE_ROPE_CAT(_AS_ROPE(str1))(_AS_ROPE(str2))))
+                           (RETURN_TYPE_ERROR))
 
 STRCHR = lambda tstr: lambda n: \
         BARE_IF(BARE_AND(BARE_IS_STRING(tstr))
@@ -357,4 +1054,101 @@ STRCHR = lambda tstr: lambda n: \
                (lambda _: BARE_ON_RESULT(BARE_ELT(BARE_VALUEOF(tstr))(BARE_VALUEOF(n)))
                             (lambda succ: MK_RESULTPAIR_FROM(MK_CHAR(succ))(NO_ERROR_id))
                             (lambda errnum: MK_RESULTPAIR_FROM(VOID)(errnum))) \
-               (lambda _: MK_RESULTPAIR_FROM(VOID)(TYPE_ERROR_id))
+               (lambda _: BARE_IF(BARE_IS_RA_STRING(tstr))
+                           (lambda _: _RA_INDEX(n)
+                                        (lambda i: BARE_ON_RESULT(BARE_RA_ELT(BARE_VALUEOF(tstr))(i))
+                                                     (lambda succ: MK_RESULTPAIR_FROM(MK_CHAR(succ))(NO_ERROR_id))
+                                                     (lambda errnum: MK_RESULTPAIR_FROM(VOID)(errnum)))
+                                        (lambda errnum: MK_RESULTPAIR_FROM(VOID)(errnum)))
+                           (lambda _: BARE_IF(BARE_AND(BARE_IS_ROPE_STRING(tstr))
+                                                      (BARE_IS_POS_INT(n)))
+                                       (lambda _: BARE_ON_RESULT(BARE_ELT(BARE_ROPE_FLATTEN(BARE_VALUEOF(tstr)))
+                                                                         (BARE_VALUEOF(n)))
+                                                    (lambda succ: MK_RESULTPAIR_FROM(MK_CHAR(succ))(NO_ERROR_id))
+                                                    (lambda errnum: MK_RESULTPAIR_FROM(VOID)(errnum)))
+                                       (RETURN_TYPE_ERROR_RESULT)))
+
+# a rope (or rope string) holding a list (or string), and back. ropes and
+# plain values are passed through
+ROPE = lambda tval: \
+        BARE_IF(BARE_IS_LIST(tval)) \
+               (lambda _: MK_ROPE(BARE_ROPE_LEAF(BARE_VALUEOF(tval)))) \
+               (lambda _: BARE_IF(BARE_IS_STRING(tval))
+                           (lambda _: MK_ROPE_STRING(BARE_ROPE_LEAF(BARE_VALUEOF(tval))))
+                           (lambda _: BARE_IF(BARE_OR(BARE_IS_ROPE(tval))(BARE_IS_ROPE_STRING(tval)))
+                                       (lambda _: tval)
+                                       (RETURN_TYPE_ERROR)))
+FLATTEN = lambda tval: \
+        BARE_IF(BARE_IS_ROPE(tval)) \
+               (lambda _: MK_LIST(BARE_ROPE_FLATTEN(BARE_VALUEOF(tval)))) \
+               (lambda _: BARE_IF(BARE_IS_ROPE_STRING(tval))
+                           (lambda _: MK_STRING(BARE_ROPE_FLATTEN(BARE_VALUEOF(tval))))
+                           (lambda _: BARE_IF(BARE_OR(BARE_IS_LIST(tval))(BARE_IS_STRING(tval)))
+                                       (lambda _: tval)
+                                       (RETURN_TYPE_ERROR)))
+
+# map keys are positive and negative ints, and strings. ints come before
+# strings, and are ordered by value; strings are ordered character by
+# character, as python orders them
+_IS_KEY = lambda tkey: BARE_OR(BARE_IS_INT(tkey))(BARE_IS_STRING(tkey))
+
+_STR_CMP = Y(lambda CMP_r:
+               lambda s1: lambda s2:
+                 s1(lambda _: s2(lambda _: BARE_ORD_EQ)(lambda head: lambda tail: BARE_ORD_LT))
+                   (lambda h1: lambda t1:
+                      s2(lambda _: BARE_ORD_GT)
+                        (lambda h2: lambda t2:
+                           BARE_NUM_CMP(h1)(h2)(lambda _: BARE_ORD_LT)
+                                               (lambda _: CMP_r(t1)(t2))
+                                               (lambda _: BARE_ORD_GT))))
+
+# order, unless v1 and v2 are both zero
+_UNLESS_BOTH_ZERO = lambda v1: lambda v2: lambda order: \
+        BARE_AND(BARE_IS_ZERO(v1))(BARE_IS_ZERO(v2))(lambda _: BARE_ORD_EQ)(lambda _: order)
+
+# binary ints are no keys, so they never get here
+_INT_CMP = lambda tn1: lambda tn2: \
+        _ON_INT(tn1) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: BARE_NUM_CMP(v1)(v2))
+                        (lambda v2: _UNLESS_BOTH_ZERO(v1)(v2)(BARE_ORD_GT))
+                        (lambda _: BARE_ORD_EQ)
+                        (lambda _: BARE_ORD_EQ)) \
+          (lambda v1: _ON_INT(tn2)
+                        (lambda v2: _UNLESS_BOTH_ZERO(v1)(v2)(BARE_ORD_LT))
+                        (lambda v2: BARE_NUM_CMP(v2)(v1))
+                        (lambda _: BARE_ORD_EQ)
+                        (lambda _: BARE_ORD_EQ)) \
+          (lambda _: BARE_ORD_EQ) \
+          (lambda _: BARE_ORD_EQ)
+
+_KEY_CMP = lambda tk1: lambda tk2: \
+        BARE_IS_STRING(tk1) \
+          (lambda _: BARE_IS_STRING(tk2)
+                       (lambda _: _STR_CMP(BARE_VALUEOF(tk1))(BARE_VALUEOF(tk2)))
+                       (lambda _: BARE_ORD_GT)) \
+          (lambda _: BARE_IS_STRING(tk2)
+                       (lambda _: BARE_ORD_LT)
+                       (lambda _: _INT_CMP(tk1)(tk2)))
+
+EMPTY_MAP = MK_MAP(BARE_MAP_NIL)
+
+# looking up a key which isn't there is an index error
+MAP_GET = lambda tmap: lambda tkey: \
+        BARE_IF(BARE_AND(BARE_IS_MAP(tmap))(_IS_KEY(tkey))) \
+               (lambda _: MK_RESULTPAIR(BARE_MAP_GET(_KEY_CMP)(BARE_VALUEOF(tmap))(tkey))) \
+               (RETURN_TYPE_ERROR_RESULT)
+
+MAP_PUT = lambda tmap: lambda tkey: lambda tval: \
+        BARE_IF(BARE_AND(BARE_IS_MAP(tmap))(_IS_KEY(tkey))) \
+               (lambda _: MK_MAP(BARE_MAP_PUT(_KEY_CMP)(BARE_VALUEOF(tmap))(tkey)(tval))) \
+               (RETURN_TYPE_ERROR)
+
+MAP_DEL = lambda tmap: lambda tkey: \
+        BARE_IF(BARE_AND(BARE_IS_MAP(tmap))(_IS_KEY(tkey))) \
+               (lambda _: MK_MAP(BARE_MAP_DEL(_KEY_CMP)(BARE_VALUEOF(tmap))(tkey))) \
+               (RETURN_TYPE_ERROR)
+
+MAP_LEN = lambda tmap: BARE_IF(BARE_IS_MAP(tmap)) \
+                              (lambda _: MK_POS_INT(BARE_MAP_LEN(BARE_VALUEOF(tmap)))) \
+                              (RETURN_TYPE_ERROR)
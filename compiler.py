@@ -0,0 +1,330 @@
+# compiling church.py into one optimized expression, emitted as python
+#
+# church.py's header describes the module as a single expression: a nest of
+# lambdas, one per toplevel name, each applied to that name's definition.
+# this module builds that expression from the term graph of terms.py, and
+# optimizes it on the way:
+#
+#  - inlining: a reference to a definition which is a small lambda is replaced
+#    by the lambda itself, so BARE_IF, BARE_VALUEOF, BARE_AND and friends stop
+#    being calls through a global.
+#  - beta reduction: an application of a lambda is reduced at compile time
+#    when that can't change what is computed or how often: when the argument
+#    is a variable or reference, when it is a lambda used at most once (or a
+#    tiny one), or when it is any expression which the body evaluates exactly
+#    once, in a position not under a lambda. Y's self-application never
+#    qualifies, so recursion is left alone. each definition gets a fixed
+#    amount of fuel, so compilation always ends.
+#  - hoisting: a lambda with no free variables, inside another lambda, would
+#    be built again as a new python function every time the outer one runs.
+#    each is made a binding of its own (or a reference to the definition it
+#    is equal to, which is how inlined constants such as BARE_FALSE go back
+#    to being a global).
+#  - dead bindings: definitions which none of the wanted names use, directly
+#    or through other definitions, are dropped.
+#
+# definitions which aren't lambdas (MK_POS_INT, BARE_LEN, Y itself, ...) are
+# computed once when the module is evaluated, and are never inlined: doing
+# that would repeat their computation on every use.
+#
+# emit() writes the bindings out as python source in church.py's own dialect,
+# one NAME = expr line per binding. that is the header's shorthand for the
+# nest; written out nested, python's parser would give up long before the few
+# hundred levels it would take. nest() builds the nested form as a term.
+
+import sys
+from collections import OrderedDict
+
+import terms
+from terms import Var, Lam, App, Ref, Const
+
+
+# python's parser refuses expressions nested much deeper than this
+MAX_DEPTH = 90
+
+
+def size(term):
+    cls = term.__class__
+    if cls is Lam:
+        return 1 + size(term.body)
+    if cls is App:
+        return 1 + size(term.fn) + size(term.arg)
+    return 1
+
+
+def depth(term):
+    cls = term.__class__
+    if cls is Lam:
+        return 1 + depth(term.body)
+    if cls is App:
+        return 1 + max(depth(term.fn), depth(term.arg))
+    return 1
+
+
+def shift(term, d, cutoff=0):
+    # adds d to the index of every variable bound outside of term
+    cls = term.__class__
+    if cls is Var:
+        if term.index >= cutoff:
+            return Var(term.name, term.index + d)
+        return term
+    if cls is Lam:
+        return Lam(term.param, shift(term.body, d, cutoff + 1))
+    if cls is App:
+        return App(shift(term.fn, d, cutoff), shift(term.arg, d, cutoff))
+    return term
+
+
+def subst(body, arg, level=0):
+    # the body of a lambda, with arg in place of the lambda's parameter
+    cls = body.__class__
+    if cls is Var:
+        if body.index == level:
+            return shift(arg, level)
+        if body.index > level:
+            return Var(body.name, body.index - 1)
+        return body
+    if cls is Lam:
+        return Lam(body.param, subst(body.body, arg, level + 1))
+    if cls is App:
+        return App(subst(body.fn, arg, level), subst(body.arg, arg, level))
+    return body
+
+
+def uses(term, level=0, under=False):
+    # how many times the variable bound level lambdas out is used in term,
+    # and whether any of those uses is under a lambda
+    cls = term.__class__
+    if cls is Var:
+        return (1, under) if term.index == level else (0, False)
+    if cls is Lam:
+        return uses(term.body, level + 1, True)
+    if cls is App:
+        n1, u1 = uses(term.fn, level, under)
+        n2, u2 = uses(term.arg, level, under)
+        return n1 + n2, u1 or u2
+    return 0, False
+
+
+def refs(term, found=None):
+    # the names of the definitions term refers to
+    if found is None:
+        found = set()
+    cls = term.__class__
+    if cls is Ref:
+        found.add(term.name)
+    elif cls is Lam:
+        refs(term.body, found)
+    elif cls is App:
+        refs(term.fn, found)
+        refs(term.arg, found)
+    return found
+
+
+def closed(term, level=0):
+    # whether term has no free variables
+    cls = term.__class__
+    if cls is Var:
+        return term.index < level
+    if cls is Lam:
+        return closed(term.body, level + 1)
+    if cls is App:
+        return closed(term.fn, level) and closed(term.arg, level)
+    return True
+
+
+_ATOMS = (Var, Ref, Const)
+
+
+class Compiler(object):
+    def __init__(self, program, inline_size=60, tiny_size=4, fuel=2000):
+        self.program = program
+        self.inline_size = inline_size
+        self.tiny_size = tiny_size
+        self.fuel = fuel
+        self._terms = {}
+        self._left = fuel
+
+    def term(self, name):
+        # the optimized definition of name
+        try:
+            return self._terms[name]
+        except KeyError:
+            pass
+        original = self.program.terms[name]
+        self._left = self.fuel
+        term = self.simplify(original)
+        if depth(term) > MAX_DEPTH:
+            term = original
+        self._terms[name] = term
+        return term
+
+    def simplify(self, term):
+        cls = term.__class__
+        if cls is Ref:
+            return self.inline(term)
+        if cls is Lam:
+            return Lam(term.param, self.simplify(term.body))
+        if cls is App:
+            fn = self.simplify(term.fn)
+            arg = self.simplify(term.arg)
+            if fn.__class__ is Lam and self._left > 0 and self.reducible(fn, arg):
+                self._left -= 1
+                return self.simplify(subst(fn.body, arg))
+            if fn.__class__ is App and fn.fn.__class__ is Lam and self._left > 0:
+                # (lambda x: body)(x0)(arg) is (lambda x: body(arg))(x0), which
+                # lets a curried function meet all of its arguments
+                self._left -= 1
+                inner = self.simplify(App(fn.fn.body, shift(arg, 1)))
+                outer = Lam(fn.fn.param, inner)
+                if self.reducible(outer, fn.arg):
+                    return self.simplify(subst(inner, fn.arg))
+                return App(outer, fn.arg)
+            return App(fn, arg)
+        return term
+
+    def inline(self, ref):
+        # saves self._left, since compiling the definition resets it
+        left = self._left
+        term = self.term(ref.name)
+        self._left = left
+        if term.__class__ is Lam and size(term) <= self.inline_size:
+            return term
+        return ref
+
+    def reducible(self, lam, arg):
+        if arg.__class__ in _ATOMS:
+            return True
+        count, under = uses(lam.body)
+        if arg.__class__ is Lam:
+            return count <= 1 or size(arg) <= self.tiny_size
+        return count == 1 and not under
+
+
+class _Hoister(object):
+    def __init__(self, bindings):
+        self.bindings = bindings
+        self.out = OrderedDict()
+        # lambdas already bound, by their source
+        self.known = {}
+
+    def run(self):
+        for name, term in self.bindings.items():
+            self.out[name] = self.lift(term, False)
+            if term.__class__ is Lam:
+                self.known.setdefault(_source(term, ()), name)
+        return self.out
+
+    def lift(self, term, under):
+        cls = term.__class__
+        if cls is Lam:
+            if under and closed(term):
+                return Ref(self.name_for(term), None)
+            return Lam(term.param, self.lift(term.body, True))
+        if cls is App:
+            return App(self.lift(term.fn, under), self.lift(term.arg, under))
+        return term
+
+    def name_for(self, lam):
+        key = _source(lam, ())
+        try:
+            return self.known[key]
+        except KeyError:
+            pass
+        name = '_K%d' % len(self.known)
+        while name in self.bindings:
+            name += '_'
+        self.known[key] = name
+        self.out[name] = Lam(lam.param, self.lift(lam.body, True))
+        return name
+
+
+def _needed(names, lookup):
+    needed = set()
+    todo = list(names)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(refs(lookup(name)))
+    return needed
+
+
+def compile_program(program=None, names=None, **options):
+    # the optimized bindings needed for names (by default, all of them), as
+    # an OrderedDict in evaluation order
+    if program is None:
+        program = terms.load()
+    if names is None:
+        names = program.names()
+    compiler = Compiler(program, **options)
+    needed = _needed(names, compiler.term)
+    bindings = _Hoister(OrderedDict((name, compiler.term(name)) for name in program.names()
+                                    if name in needed)).run()
+    needed = _needed(names, bindings.__getitem__)
+    return OrderedDict((name, term) for name, term in bindings.items() if name in needed)
+
+
+def _abstract(term, name, level=0):
+    # term with references to name turned into variables bound level lambdas out
+    cls = term.__class__
+    if cls is Ref:
+        return Var(name, level) if term.name == name else term
+    if cls is Lam:
+        return Lam(term.param, _abstract(term.body, name, level + 1))
+    if cls is App:
+        return App(_abstract(term.fn, name, level), _abstract(term.arg, name, level))
+    return term
+
+
+def nest(bindings, body):
+    # the single expression the header describes: body, under one lambda per
+    # binding, each applied to its definition
+    expr = body
+    for name in reversed(list(bindings)):
+        expr = App(Lam(name, _abstract(expr, name)), bindings[name])
+    return expr
+
+
+def _source(term, names):
+    cls = term.__class__
+    if cls is Var:
+        return names[term.index]
+    if cls is Lam:
+        param = term.param
+        if param in names:
+            param = '%s_%d' % (param, len(names))
+        return 'lambda %s: %s' % (param, _source(term.body, (param,) + names))
+    if cls is App:
+        fn = _source(term.fn, names)
+        if term.fn.__class__ is Lam:
+            fn = '(%s)' % fn
+        return '%s(%s)' % (fn, _source(term.arg, names))
+    if cls is Ref:
+        return term.name
+    raise ValueError('can not emit %r' % (term,))
+
+
+def emit(bindings):
+    lines = ['# generated by compiler.py from church.py; do not edit', '']
+    for name, term in bindings.items():
+        lines.append('%s = %s' % (name, _source(term, ())))
+    return '\n'.join(lines) + '\n'
+
+
+def namespace(source, filename='<compiled church>'):
+    # the values defined by emitted source
+    ns = {}
+    exec(compile(source, filename, 'exec'), ns)
+    ns.pop('__builtins__', None)
+    return ns
+
+
+def main(argv=None):
+    # print the compiled source for the names given, or for all of church.py
+    names = list(argv) if argv else None
+    sys.stdout.write(emit(compile_program(names=names)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,76 @@
+# cooperative evaluation: church.py under asyncio
+#
+# on either backend an evaluation is one long python call, which holds up an
+# event loop until it is done. the term machine of terms.py keeps its whole
+# continuation on the heap, though, so it can stop between any two
+# applications and carry on later: Machine.slices() evaluates a term a slice
+# at a time. evaluate_async() runs those slices, handing control back to the
+# event loop after each one, so many evaluations can share one thread, and
+# an evaluation can be cancelled like any other task.
+#
+# values must come from a term program (terms.load().namespace(), say): a
+# closure church.py built with python lambdas is just a python callable to
+# the machine, which it calls without a break. decoding, which dechurchify()
+# does by calling values from python, is done the same way by
+# dechurchify_async() for integers, lists and strings; other types are
+# decoded by dechurchify() in one go.
+
+import asyncio
+
+import terms
+from terms import App, Const
+from using_church import (extract_type_and_val, dechurchify, num_pos_int_id, num_neg_int_id,
+                          num_list_id, num_string_id)
+
+
+async def evaluate_async(term, machine=None, every=1000, env=None):
+    # term's value, evaluated every applications at a time
+    slices = (machine or terms.default_machine).slices(term, env, every)
+    try:
+        while True:
+            try:
+                next(slices)
+            except StopIteration as done:
+                return done.value
+            await asyncio.sleep(0)
+    finally:
+        slices.close()
+
+
+async def apply_async(fn, *args, **options):
+    # fn(args[0])(args[1])...
+    term = Const(fn)
+    for arg in args:
+        term = App(term, Const(arg))
+    return await evaluate_async(term, **options)
+
+
+_succ = lambda x: x + 1
+_empty = lambda _: None
+_pair = lambda head: lambda tail: (head, tail)
+
+
+async def numerify_async(n, **options):
+    return await apply_async(n, _succ, 0, **options)
+
+
+async def iter_list_async(lst, **options):
+    # the elements of a bare list, a cell at a time
+    cell = await apply_async(lst, _empty, _pair, **options)
+    while cell is not None:
+        yield cell[0]
+        cell = await apply_async(cell[1], _empty, _pair, **options)
+
+
+async def dechurchify_async(tval, **options):
+    t, val = extract_type_and_val(tval)
+    if t == num_pos_int_id:
+        return await numerify_async(val, **options)
+    if t == num_neg_int_id:
+        return -(await numerify_async(val, **options))
+    if t == num_list_id:
+        return [await dechurchify_async(x, **options) async for x in iter_list_async(val, **options)]
+    if t == num_string_id:
+        return ''.join([chr(await numerify_async(c, **options))
+                        async for c in iter_list_async(val, **options)])
+    return dechurchify(tval)
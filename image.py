@@ -0,0 +1,292 @@
+# images: term graphs and values of the term machine, saved in a compact
+# binary file and loaded back lazily
+#
+# a big numeral, a long string or a table churchified from reference data is
+# slow to build again in every process which needs it. save() writes such
+# values (and terms) to a file, and load() maps the file into memory and
+# builds each value only when it is first asked for, so that opening an
+# image costs next to nothing however much it holds.
+#
+# values must come from a term program (terms.load().namespace(), say): the
+# closures church.py builds with python lambdas can't be looked into. what is
+# saved is the graph behind a value: its closures, their environments and
+# their lambda terms. nodes are saved once each, however many times they are
+# shared, and equal nodes are stored once too. a value which is one of the
+# program's own definitions (BARE_TRUE, BARE_NIL, ...) is saved as its name,
+# and loads as the very same value of the program it is loaded into.
+#
+# the file holds a header, a table of strings (names and lambda parameters),
+# a table of roots (each saved name and its node), and then the nodes
+# themselves as fixed-size records, so that any one can be read directly.
+
+import mmap
+import struct
+
+from terms import Var, Lam, App, Ref, Const, Closure, Thunk
+
+MAGIC = b'CHIM'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sIIII')  # magic, version, strings, roots, nodes
+_LENGTH = struct.Struct('<I')
+_ROOT = struct.Struct('<II')        # name, node
+_NODE = struct.Struct('<Bii')       # kind, a, b
+
+# node kinds, and what a and b hold for each. a node number of -1 is None
+_VAR = 0      # index, name
+_LAM = 1      # param, body
+_APP = 2      # fn, arg
+_REF = 3      # name
+_CLOSURE = 4  # lam, environment
+_ENV = 5      # value, parent environment
+_THUNK = 6    # term, environment
+_DEF = 7      # name: the value of one of the program's definitions
+_CONST = 8    # value
+
+# which of a and b are node numbers, for each kind
+_CHILDREN = {
+    _VAR: (), _LAM: ('b',), _APP: ('a', 'b'), _REF: (), _CLOSURE: ('a', 'b'),
+    _ENV: ('a', 'b'), _THUNK: ('a', 'b'), _DEF: (), _CONST: ('a',),
+}
+
+
+class ImageError(ValueError):
+    pass
+
+
+class _Writer(object):
+    def __init__(self, program):
+        self.strings = []
+        self.nodes = []
+        self._string_ids = {}
+        # node numbers by the id of what they were made from, and by content
+        self._done = {}
+        self._keys = {}
+        # what _done's ids belong to, kept alive so that they stay unique
+        self._seen = []
+        self._definitions = dict((id(value), name) for name, value in program._values.items())
+
+    def string(self, s):
+        try:
+            return self._string_ids[s]
+        except KeyError:
+            i = self._string_ids[s] = len(self.strings)
+            self.strings.append(s)
+            return i
+
+    def _children(self, obj, role):
+        # what obj's node refers to, as (object, role) pairs
+        if role == 'env':
+            return [] if obj is None else [(obj[0], 'value'), (obj[1], 'env')]
+        cls = obj.__class__
+        if cls is Lam:
+            return [(obj.body, 'term')]
+        if cls is App:
+            return [(obj.fn, 'term'), (obj.arg, 'term')]
+        if cls is Const:
+            return [(obj.value, 'value')]
+        if cls is Closure:
+            if id(obj) in self._definitions:
+                return []
+            return [(obj.lam, 'term'), (obj.env, 'env')]
+        if cls is Thunk:
+            if obj.term is None:
+                return [(obj.value, 'value')]
+            return [(obj.term, 'term'), (obj.env, 'env')]
+        if cls in (Var, Ref):
+            return []
+        raise ImageError('can not save %r' % (obj,))
+
+    def _key(self, obj, role):
+        # the (kind, a, b) of obj's node, its children being done
+        done = self._done
+        if role == 'env':
+            return (_ENV, done[id(obj[0])], -1 if obj[1] is None else done[id(obj[1])])
+        cls = obj.__class__
+        if cls is Var:
+            return (_VAR, obj.index, self.string(obj.name))
+        if cls is Lam:
+            return (_LAM, self.string(obj.param), done[id(obj.body)])
+        if cls is App:
+            return (_APP, done[id(obj.fn)], done[id(obj.arg)])
+        if cls is Ref:
+            return (_REF, self.string(obj.name), 0)
+        if cls is Const:
+            return (_CONST, done[id(obj.value)], 0)
+        if cls is Closure:
+            name = self._definitions.get(id(obj))
+            if name is not None:
+                return (_DEF, self.string(name), 0)
+            return (_CLOSURE, done[id(obj.lam)], -1 if obj.env is None else done[id(obj.env)])
+        # a thunk
+        if obj.term is None:
+            return None
+        return (_THUNK, done[id(obj.term)], -1 if obj.env is None else done[id(obj.env)])
+
+    def add(self, obj, role):
+        # the node number of obj, adding nodes for it and everything it
+        # refers to which hasn't one yet. iterative, as graphs can be deep
+        done = self._done
+        todo = [(obj, role)]
+        while todo:
+            o, r = todo[-1]
+            if id(o) in done:
+                todo.pop()
+                continue
+            pending = [(c, cr) for c, cr in self._children(o, r)
+                       if c is not None and id(c) not in done]
+            if pending:
+                todo.extend(pending)
+                continue
+            todo.pop()
+            key = self._key(o, r)
+            if key is None:
+                # an evaluated thunk is saved as its value
+                n = done[id(o.value)]
+            else:
+                n = self._keys.get(key)
+                if n is None:
+                    n = self._keys[key] = len(self.nodes)
+                    self.nodes.append(key)
+            done[id(o)] = n
+            self._seen.append(o)
+        return done[id(obj)]
+
+
+def dumps(roots, program):
+    # the image of roots, a mapping of names to values or terms of program,
+    # as bytes
+    writer = _Writer(program)
+    table = [(writer.string(name), writer.add(value, 'term' if isinstance(value, (Var, Lam, App, Ref, Const))
+                                              else 'value'))
+             for name, value in roots.items()]
+    parts = [_HEADER.pack(MAGIC, VERSION, len(writer.strings), len(table), len(writer.nodes))]
+    for s in writer.strings:
+        data = s.encode('utf-8')
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+    parts.extend(_ROOT.pack(name, node) for name, node in table)
+    parts.extend(_NODE.pack(*node) for node in writer.nodes)
+    return b''.join(parts)
+
+
+def save(path, roots, program):
+    with open(path, 'wb') as f:
+        f.write(dumps(roots, program))
+
+
+class Image(object):
+    # the values saved in an image, built when first asked for, by name
+
+    def __init__(self, data, program, close=None):
+        self.program = program
+        self._data = data
+        self._close = close
+        magic, version, nstrings, nroots, nnodes = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ImageError('not an image')
+        if version != VERSION:
+            raise ImageError('image version %d, not %d' % (version, VERSION))
+        offset = _HEADER.size
+        self._strings = []
+        for _ in range(nstrings):
+            n, = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            self._strings.append(bytes(data[offset:offset + n]).decode('utf-8'))
+            offset += n
+        self._roots = {}
+        self._order = []
+        for _ in range(nroots):
+            name, node = _ROOT.unpack_from(data, offset)
+            offset += _ROOT.size
+            self._roots[self._strings[name]] = node
+            self._order.append(self._strings[name])
+        self._nodes = offset
+        self._count = nnodes
+        if len(data) < offset + nnodes * _NODE.size:
+            raise ImageError('image is truncated')
+        # built nodes, by number
+        self._built = {}
+
+    def names(self):
+        return list(self._order)
+
+    def __contains__(self, name):
+        return name in self._roots
+
+    def __len__(self):
+        return len(self._roots)
+
+    def __getitem__(self, name):
+        return self._build(self._roots[name])
+
+    def _node(self, n):
+        if not 0 <= n < self._count:
+            raise ImageError('no node %d' % n)
+        return _NODE.unpack_from(self._data, self._nodes + n * _NODE.size)
+
+    def _build(self, n):
+        built = self._built
+        todo = [n]
+        while todo:
+            i = todo[-1]
+            if i in built:
+                todo.pop()
+                continue
+            kind, a, b = node = self._node(i)
+            fields = {'a': a, 'b': b}
+            pending = [fields[f] for f in _CHILDREN[kind] if fields[f] != -1 and fields[f] not in built]
+            if pending:
+                todo.extend(pending)
+                continue
+            todo.pop()
+            built[i] = self._make(node)
+        return built[n]
+
+    def _make(self, node):
+        kind, a, b = node
+        built = self._built
+        strings = self._strings
+        program = self.program
+        if kind == _VAR:
+            return Var(strings[b], a)
+        if kind == _LAM:
+            return Lam(strings[a], built[b])
+        if kind == _APP:
+            return App(built[a], built[b])
+        if kind == _REF:
+            return program.ref(strings[a])
+        if kind == _CLOSURE:
+            return Closure(built[a], None if b == -1 else built[b], program.machine)
+        if kind == _ENV:
+            return (built[a], None if b == -1 else built[b])
+        if kind == _THUNK:
+            return Thunk(built[a], None if b == -1 else built[b])
+        if kind == _DEF:
+            return program.value(strings[a])
+        if kind == _CONST:
+            return Const(built[a])
+        raise ImageError('unknown node kind %d' % kind)
+
+    def close(self):
+        self._built.clear()
+        self._data = None
+        if self._close is not None:
+            self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def loads(data, program):
+    return Image(data, program)
+
+
+def load(path, program):
+    # the image in the file at path, memory-mapped
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return Image(data, program, data.close)
@@ -0,0 +1,263 @@
+# jets: native accelerators for church.py combinators
+#
+# as in nock, a jet is a native implementation of a function which the pure
+# encoding already defines, and which must compute exactly the same thing. a
+# jet only fires when it recognizes its arguments: tagged numerals (Nat),
+# tagged lists (Seq), or one of church.py's own constants such as BARE_TEN or
+# BARE_NIL. anything else falls through to the pure definition, so installing
+# the jets never changes a result, only how long it takes to get it.
+#
+# jets are opt-in. install() rebinds the jetted names in church.py (where the
+# typed layer looks them up when it runs) and in using_church.py;
+# uninstall() restores the pure definitions. churchify makes tagged numerals
+# either way, and the jets keep the tags on the results of their arithmetic. in check mode every jet hit also runs the pure
+# definition, and raises JetMismatch if the two disagree.
+
+import contextlib
+from collections import OrderedDict
+
+import church
+import using_church
+
+
+# tagged numerals are using_church's, since churchify makes them too
+Nat = using_church.Nat
+
+
+class Seq(object):
+    # a church cons list backed by a python list: the cell at items[start:]
+    __slots__ = ('items', 'start')
+
+    def __init__(self, items, start=0):
+        self.items = items
+        self.start = start
+
+    def __call__(self, onempty):
+        items, start = self.items, self.start
+        if start >= len(items):
+            return lambda onpair: onempty(church.BARE_VOID)
+        return lambda onpair: onpair(items[start])(Seq(items, start + 1))
+
+    def __repr__(self):
+        return '<Seq %r>' % (self.items[self.start:],)
+
+
+def nat(n):
+    return Nat(n)
+
+
+def seq(values):
+    return Seq(list(values))
+
+
+class JetMismatch(AssertionError):
+    pass
+
+
+# church.py constants which are recognized by identity. these are the pure
+# definitions, captured before any jet is installed
+_PURE = dict(vars(church))
+_KNOWN_NATS = dict((id(_PURE[name]), i) for i, name in enumerate(
+    ['BARE_ZERO', 'BARE_ONE', 'BARE_TWO', 'BARE_THREE', 'BARE_FOUR', 'BARE_FIVE',
+     'BARE_SIX', 'BARE_SEVEN', 'BARE_EIGHT', 'BARE_NINE', 'BARE_TEN']))
+
+
+def as_int(x):
+    # the python int a numeral stands for, or None if it isn't recognized
+    if x.__class__ is Nat:
+        return x.n
+    return _KNOWN_NATS.get(id(x))
+
+
+def as_list(x):
+    # the python list of church values a list stands for, or None
+    if x.__class__ is Seq:
+        return x.items[x.start:]
+    if x is _PURE['BARE_NIL']:
+        return []
+    return None
+
+
+def _bool(b):
+    return church.BARE_TRUE if b else church.BARE_FALSE
+
+
+# decoders used by check mode to compare the native and pure results
+def _decode_nat(n):
+    return using_church.bare_numerify(n)
+
+
+def _decode_bool(b):
+    return using_church.bare_boolify(b)
+
+
+def _decode_list(lst):
+    return [id(x) for x in using_church.bare_listify(lst)]
+
+
+def _decode_ord(o):
+    return o(lambda _: -1)(lambda _: 0)(lambda _: 1)
+
+
+def _decode_diff(p):
+    ge, diff = using_church.bare_unpairify(p)
+    return _decode_bool(ge), _decode_nat(diff)
+
+
+class Jet(object):
+    def __init__(self, name, arity, native, decode):
+        self.name = name
+        self.arity = arity
+        self.native = native
+        self.decode = decode
+        self.hits = 0
+        self.fallbacks = 0
+
+
+registry = OrderedDict()
+
+
+def jet(name, arity, decode):
+    # register fn as the native equivalent of church.py's name. fn gets the
+    # arguments uncurried, and returns NotImplemented to fall back
+    def register(fn):
+        registry[name] = Jet(name, arity, fn, decode)
+        return fn
+    return register
+
+
+def _ints(*args):
+    ns = [as_int(a) for a in args]
+    return None if None in ns else ns
+
+
+@jet('BARE_SUCC', 1, _decode_nat)
+def _succ(n):
+    i = as_int(n)
+    return NotImplemented if i is None else Nat(i + 1)
+
+
+@jet('_PRED', 1, _decode_nat)
+def _pred(n):
+    i = as_int(n)
+    return NotImplemented if i is None else Nat(max(i - 1, 0))
+
+
+@jet('BARE_IS_ZERO', 1, _decode_bool)
+def _is_zero(n):
+    i = as_int(n)
+    return NotImplemented if i is None else _bool(i == 0)
+
+
+def _arith(name, op, decode=_decode_nat):
+    @jet(name, 2, decode)
+    def native(a, b):
+        ns = _ints(a, b)
+        return NotImplemented if ns is None else op(ns[0], ns[1])
+    return native
+
+_arith('BARE_ADD', lambda a, b: Nat(a + b))
+_arith('BARE_MULT', lambda a, b: Nat(a * b))
+_arith('BARE_SUB', lambda a, b: Nat(max(a - b, 0)))
+_arith('BARE_EQUALP', lambda a, b: _bool(a == b), _decode_bool)
+_arith('BARE_LEQ', lambda a, b: _bool(a <= b), _decode_bool)
+_arith('BARE_GEQ', lambda a, b: _bool(a >= b), _decode_bool)
+_arith('BARE_LT', lambda a, b: _bool(a < b), _decode_bool)
+_arith('BARE_GT', lambda a, b: _bool(a > b), _decode_bool)
+_arith('BARE_NUM_CMP', lambda a, b: _PURE['BARE_ORD_LT'] if a < b else
+                                    _PURE['BARE_ORD_EQ'] if a == b else _PURE['BARE_ORD_GT'],
+       _decode_ord)
+_arith('BARE_NUM_DIFF', lambda a, b: church.BARE_PAIR(_bool(a >= b))(Nat(abs(a - b))),
+       _decode_diff)
+
+
+@jet('BARE_LEN', 1, _decode_nat)
+def _len(lst):
+    items = as_list(lst)
+    return NotImplemented if items is None else Nat(len(items))
+
+
+@jet('BARE_APPEND', 2, _decode_list)
+def _append(lst, newval):
+    items = as_list(lst)
+    return NotImplemented if items is None else Seq(items + [newval])
+
+
+@jet('BARE_CONCAT', 2, _decode_list)
+def _concat(lst1, lst2):
+    items1, items2 = as_list(lst1), as_list(lst2)
+    if items1 is None or items2 is None:
+        return NotImplemented
+    return Seq(items1 + items2)
+
+
+def _wrap(j, pure, check):
+    native = j.native
+
+    def call(args):
+        result = native(*args)
+        if result is NotImplemented:
+            j.fallbacks += 1
+            result = pure
+            for a in args:
+                result = result(a)
+            return result
+        j.hits += 1
+        if check:
+            expected = pure
+            for a in args:
+                expected = expected(a)
+            if j.decode(result) != j.decode(expected):
+                raise JetMismatch('%s%r: jet gave %r, pure definition gave %r' % (
+                    j.name, args, j.decode(result), j.decode(expected)))
+        return result
+
+    if j.arity == 1:
+        wrapped = lambda a: call((a,))
+    else:
+        wrapped = lambda a: lambda b: call((a, b))
+    # the definition this stands in for
+    wrapped.jet_of = pure
+    return wrapped
+
+
+_installed = []
+
+
+def install(check=False, modules=(church, using_church)):
+    uninstall()
+    for name, j in registry.items():
+        wrapped = _wrap(j, _PURE[name], check)
+        for module in modules:
+            d = vars(module)
+            if name in d:
+                _installed.append((d, name, d[name]))
+                d[name] = wrapped
+
+
+def uninstall():
+    while _installed:
+        d, name, value = _installed.pop()
+        d[name] = value
+
+
+def is_installed():
+    return bool(_installed)
+
+
+@contextlib.contextmanager
+def enabled(check=False):
+    install(check)
+    try:
+        yield registry
+    finally:
+        uninstall()
+
+
+def stats():
+    return dict((name, (j.hits, j.fallbacks)) for name, j in registry.items())
+
+
+def reset_stats():
+    for j in registry.values():
+        j.hits = j.fallbacks = 0
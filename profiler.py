@@ -0,0 +1,214 @@
+# profiling: which of church.py's definitions the work is done in
+#
+# on the closure backend a typed ADD is hundreds of calls of anonymous python
+# lambdas, which is all cProfile can see. this profiler runs on the term
+# machine of terms.py instead, where every lambda still knows which toplevel
+# definition it came from.
+#
+# a definition is counted as called when its innermost leading lambda is
+# entered, so that ADD(tn1)(tn2) is one call of ADD rather than two. a
+# definition which is not a lambda (MK_POS_INT, which is
+# BARE_MAKE_TYPEDVAR_MAKER(POS_INT_id), or BARE_LEN = Y(...)) is never called
+# itself: its calls are counted for the definition whose lambda it is.
+#
+# each call is charged the steps (applications) and seconds it takes,
+# inclusive of every call it makes in turn. for a recursive definition only
+# the outermost call is charged, so its totals are not counted twice. a call
+# only returns once its body has a value, so the work of a continuation it
+# calls last (a cons cell calling onpair, say) is charged to it too.
+#
+# profiling() rebinds the names of church.py in the given modules to the
+# values of a profiled program, as terms.backend() does, and yields the
+# Profile; report() prints it as a table, and stats() gives the numbers.
+#
+# tracing() does the same with a Trace, which also keeps the nesting of the
+# calls: STRCHR calling BARE_ELT calling BARE_NTHCONS, and so on. to keep its
+# output bounded it samples: every interval steps the stack of calls in
+# progress is counted once, and only calls taking at least min_steps (and at
+# most max_events of them) are kept as events. collapsed() gives the samples
+# in the folded-stack format of flamegraph.pl and speedscope, and chrome()
+# the events in the trace event format of chrome://tracing and perfetto.
+
+import contextlib
+import json
+import sys
+import time
+from collections import OrderedDict
+
+import church
+import terms
+import using_church
+
+
+class Counter(object):
+    __slots__ = ('name', 'calls', 'steps', 'seconds', 'active')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.steps = 0
+        self.seconds = 0.0
+        # calls which have been entered and not yet returned
+        self.active = 0
+
+    def __repr__(self):
+        return '<Counter %s: %d calls, %d steps, %.6fs>' % (
+            self.name, self.calls, self.steps, self.seconds)
+
+
+class Profile(object):
+    def __init__(self, program):
+        self.program = program
+        self.counters = OrderedDict()
+        # the innermost leading lambda of each definition, to its counter
+        self.entries = {}
+        for name, term in program.terms.items():
+            if term.__class__ is terms.Lam:
+                while term.body.__class__ is terms.Lam:
+                    term = term.body
+                self.entries[term] = self.counters[name] = Counter(name)
+
+    def reset(self):
+        for counter in self.counters.values():
+            counter.calls = counter.steps = 0
+            counter.seconds = 0.0
+
+    def enter(self, counter, steps):
+        # called by the machine as counter's definition is entered, with the
+        # machine's step count. returns what exit() gets as start
+        counter.calls += 1
+        counter.active += 1
+        # only the outermost of recursive calls is timed, so that no work is
+        # charged twice
+        if counter.active == 1:
+            return steps, time.time()
+        return None
+
+    def exit(self, counter, start, steps):
+        # called by the machine as the call returns, or with steps None if an
+        # exception unwound it
+        counter.active -= 1
+        if start is not None and steps is not None:
+            counter.steps += steps - start[0]
+            counter.seconds += time.time() - start[1]
+
+    def stats(self):
+        # (calls, steps, seconds) for each definition which was called
+        return dict((name, (c.calls, c.steps, c.seconds))
+                    for name, c in self.counters.items() if c.calls)
+
+    def report(self, limit=None, sort='steps'):
+        # a table of the definitions which were called, costliest first
+        counters = [c for c in self.counters.values() if c.calls]
+        counters.sort(key=lambda c: getattr(c, sort), reverse=True)
+        lines = ['%-24s %10s %12s %10s %10s' % ('name', 'calls', 'steps', 'steps/call', 'seconds')]
+        for c in counters[:limit]:
+            lines.append('%-24s %10d %12d %10.1f %9.4fs' % (
+                c.name, c.calls, c.steps, float(c.steps) / c.calls, c.seconds))
+        return '\n'.join(lines) + '\n'
+
+
+class Trace(Profile):
+    def __init__(self, program, interval=100, min_steps=1000, max_events=100000):
+        Profile.__init__(self, program)
+        self.interval = interval
+        self.min_steps = min_steps
+        self.max_events = max_events
+        self.reset()
+
+    def reset(self):
+        Profile.reset(self)
+        # the names of the calls in progress, outermost first
+        self.names = []
+        # samples by stack of names
+        self.samples = {}
+        # (name, depth, start seconds, end seconds, steps) of finished calls
+        self.events = []
+        self._start = time.time()
+        self._next = None
+
+    def _sample(self, steps):
+        # credit the stack in progress with each sample due by steps
+        if self._next is None:
+            self._next = steps + self.interval
+        elif steps >= self._next:
+            n = (steps - self._next) // self.interval + 1
+            self._next += n * self.interval
+            if self.names:
+                key = tuple(self.names)
+                self.samples[key] = self.samples.get(key, 0) + n
+
+    def enter(self, counter, steps):
+        self._sample(steps)
+        self.names.append(counter.name)
+        return Profile.enter(self, counter, steps), steps, time.time()
+
+    def exit(self, counter, start, steps):
+        start, entered, seconds = start
+        Profile.exit(self, counter, start, steps)
+        if steps is not None:
+            self._sample(steps)
+            if steps - entered >= self.min_steps and len(self.events) < self.max_events:
+                self.events.append((counter.name, len(self.names), seconds - self._start,
+                                    time.time() - self._start, steps - entered))
+        self.names.pop()
+
+    def collapsed(self):
+        # one "outer;...;inner samples" line per stack
+        lines = ['%s %d' % (';'.join(key), n) for key, n in sorted(self.samples.items())]
+        return ''.join(line + '\n' for line in lines)
+
+    def chrome(self):
+        # the events as a chrome trace, in microseconds
+        events = []
+        for name, depth, start, end, steps in self.events:
+            events.append({'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                           'ts': start * 1e6, 'dur': (end - start) * 1e6,
+                           'args': {'steps': steps, 'depth': depth}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+@contextlib.contextmanager
+def _profiled(make, modules, lazy):
+    machine = terms.Machine(lazy=lazy)
+    program = terms.load(machine=machine)
+    namespace = program.namespace()
+    machine.profile = profile = make(program)
+    try:
+        with terms.backend(namespace, modules):
+            yield profile
+    finally:
+        machine.profile = None
+
+
+def profiling(modules=(church, using_church), lazy=False):
+    return _profiled(Profile, modules, lazy)
+
+
+def tracing(modules=(church, using_church), lazy=False, **options):
+    return _profiled(lambda program: Trace(program, **options), modules, lazy)
+
+
+def main(argv=None):
+    # profile test_church.py and print the costliest definitions. given a
+    # file name prefix, also write a trace: prefix.folded for flamegraphs,
+    # and prefix.json for chrome
+    import unittest
+    import test_church
+
+    argv = list(argv or ())
+    limit = int(argv.pop(0)) if argv and argv[0].isdigit() else 30
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(test_church.TestChurch)
+    run = tracing if argv else profiling
+    with run([church, using_church, test_church]) as profile:
+        unittest.TextTestRunner(stream=sys.stderr).run(suite)
+    sys.stdout.write(profile.report(limit))
+    if argv:
+        with open(argv[0] + '.folded', 'w') as f:
+            f.write(profile.collapsed())
+        with open(argv[0] + '.json', 'w') as f:
+            json.dump(profile.chrome(), f)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,584 @@
+# reified lambda terms, and a graph-reduction engine to evaluate them
+#
+# church.py builds everything out of python lambdas, which makes its terms
+# opaque: they can be called, but not inspected, shared, rewritten or saved.
+# this module reads the very same definitions into an explicit term graph
+# (variables, abstractions, applications, and references to other toplevel
+# definitions) and evaluates that graph with an abstract machine which keeps
+# its continuation on the heap rather than on the python stack.
+#
+# every toplevel definition is a single shared node in the graph. it is
+# reduced at most once, the first time it is needed, and every reference to it
+# sees the reduced value from then on.
+#
+# values produced by the machine are callable from python exactly like the
+# closures church.py builds, so they can be handed to the helpers in
+# using_church.py. in the other direction, python callables (such as the
+# lambda x: x+1 used by bare_numerify) can be applied by the machine; they are
+# simply called.
+#
+# untrusted expressions should be evaluated here, inside Machine.limit(),
+# which bounds the steps, continuation depth and wall time they may take.
+#
+# the machine is call-by-value, like python, unless it is made with
+# lazy=True: then it is call-by-need, passing arguments as memoized thunks
+# which are evaluated the first time their value is used, if ever. church.py
+# means the same either way, since all it does is apply functions.
+
+import ast
+import contextlib
+import os
+import sys
+import time
+from collections import OrderedDict
+
+from using_church import ChurchResourceError
+
+CHURCH_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'church.py')
+
+
+class Term(object):
+    __slots__ = ()
+
+
+class Var(Term):
+    # index is the de Bruijn index of the binding lambda: 0 for the innermost
+    __slots__ = ('name', 'index')
+
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def __repr__(self):
+        return self.name
+
+
+class Lam(Term):
+    __slots__ = ('param', 'body')
+
+    def __init__(self, param, body):
+        self.param = param
+        self.body = body
+
+    def __repr__(self):
+        return '(lambda %s: %r)' % (self.param, self.body)
+
+
+class App(Term):
+    __slots__ = ('fn', 'arg')
+
+    def __init__(self, fn, arg):
+        self.fn = fn
+        self.arg = arg
+
+    def __repr__(self):
+        return '%r(%r)' % (self.fn, self.arg)
+
+
+class Ref(Term):
+    # a reference to a toplevel definition of a program. there is only one Ref
+    # per name, shared by every term which uses it
+    __slots__ = ('name', 'program')
+
+    def __init__(self, name, program):
+        self.name = name
+        self.program = program
+
+    def __repr__(self):
+        return self.name
+
+
+class Const(Term):
+    # an already-evaluated value, usually one which came from python
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return '<Const %r>' % (self.value,)
+
+
+class Closure(object):
+    # the value of a Lam: its term plus the environment it was evaluated in.
+    # environments are linked (value, parent) tuples, indexed by Var.index.
+    # a closure applied from python runs on the machine which built it
+    __slots__ = ('lam', 'env', 'machine', '__weakref__')
+
+    def __init__(self, lam, env, machine=None):
+        self.lam = lam
+        self.env = env
+        self.machine = machine
+
+    def __call__(self, arg):
+        return (self.machine or default_machine).apply(self, arg)
+
+    def __repr__(self):
+        return '<Closure %r>' % (self.lam,)
+
+
+class Thunk(object):
+    # an argument a lazy machine has not evaluated yet: its term plus the
+    # environment to evaluate it in. once forced, term and env are dropped
+    # and value holds the result, which every later use shares
+    __slots__ = ('term', 'env', 'value')
+
+    def __init__(self, term, env):
+        self.term = term
+        self.env = env
+        self.value = None
+
+    def __repr__(self):
+        if self.term is None:
+            return '<Thunk = %r>' % (self.value,)
+        return '<Thunk %r>' % (self.term,)
+
+
+# continuation frames
+_ARG = 0     # the function is evaluated; evaluate the argument term next
+_CALL = 1    # the argument is evaluated; apply the saved function to it
+_LAZY = 2    # the function is evaluated; apply it to the saved argument,
+             # which may be a thunk
+_UPDATE = 3  # the saved thunk's term is evaluated; remember the value
+_EXIT = 4    # a profiled definition has returned; charge it for its work
+
+# how many steps a limited machine takes between looking at the clock
+_POLL = 1024
+
+
+class _Paused(Exception):
+    # a sliced run stopped before applying fn to arg
+    def __init__(self, fn, arg):
+        self.fn = fn
+        self.arg = arg
+
+
+class Machine(object):
+    # an environment machine, counting in steps its applications (beta
+    # reductions and calls of python callables).
+    #
+    # by default it is call-by-value, matching python's own evaluation order
+    # so that church.py's definitions mean the same thing on both backends.
+    # with lazy=True it is call-by-need instead: an argument which is not
+    # already a value (a variable, lambda, reference or constant) is passed
+    # as a Thunk, evaluated only when something needs its value, and then
+    # never again. python callables are always passed values. thunks counts
+    # the thunks made, forced those which were evaluated, and shared the uses
+    # which found a thunk already evaluated: work call-by-name would have
+    # repeated. thunks - forced were never needed at all, which is work
+    # call-by-value would have done.
+    #
+    # profile, if given, is a profiler.Profile: the machine tells it when a
+    # definition it knows is entered and when that call returns.
+    #
+    # within limit(), the machine raises ChurchResourceError when it has
+    # taken too many steps, kept too many continuation frames, or run past a
+    # deadline. only the step count is compared on every application; the
+    # rest is looked at every _POLL steps.
+
+    def __init__(self, lazy=False, profile=None):
+        self.lazy = lazy
+        self.profile = profile
+        self._limits = None
+        self.steps = 0
+        self.thunks = 0
+        self.forced = 0
+        self.shared = 0
+
+    def evaluate(self, term, env=None):
+        return self._run(term, env, [])
+
+    def apply(self, fn, arg):
+        return self._run(Const(arg), None, [(_CALL, fn, None)])
+
+    @contextlib.contextmanager
+    def limit(self, steps=None, depth=None, seconds=None):
+        # run the body with at most steps more applications, depth frames of
+        # continuation and seconds of wall time; a None is no limit
+        saved = self._limits
+        self._limits = (sys.maxsize if steps is None else self.steps + steps,
+                        depth, None if seconds is None else time.time() + seconds)
+        try:
+            yield self
+        except RecursionError:
+            # machine runs nested through python callables, too deeply
+            raise ChurchResourceError('depth', 'python recursion limit exceeded')
+        finally:
+            self._limits = saved
+
+    def slices(self, term, env=None, every=1000):
+        # a generator evaluating term about every applications at a time,
+        # yielding between slices; its return value is term's value. only
+        # the applications of this run count: a python callable which calls
+        # back into the machine does so without a break
+        stack = []
+        while True:
+            try:
+                return self._run(term, env, stack, every)
+            except _Paused as paused:
+                stack.append((_CALL, paused.fn, None))
+                term, env = Const(paused.arg), None
+            yield
+
+    def _checkpoint(self, stack, steps, pause, fn, arg):
+        # called before the application of fn to arg when steps reaches the
+        # last checkpoint's result. raises if the run should stop there, or
+        # returns the step count of the next checkpoint
+        if pause is not None and steps >= pause:
+            raise _Paused(fn, arg)
+        check = sys.maxsize if self._limits is None else self._check(stack, steps)
+        return check if pause is None else min(check, pause)
+
+    def _check(self, stack, steps):
+        # raise if the limits are exceeded; otherwise the local step count at
+        # which to check again
+        max_steps, depth, deadline = self._limits
+        total = self.steps + steps
+        if total >= max_steps:
+            raise ChurchResourceError('steps', 'step budget exhausted')
+        if depth is not None and len(stack) > depth:
+            raise ChurchResourceError('depth', 'more than %d frames of continuation' % depth)
+        if deadline is not None and time.time() > deadline:
+            raise ChurchResourceError('seconds', 'deadline passed')
+        return steps + min(_POLL, max_steps - total)
+
+    def _run(self, term, env, stack, pause=None):
+        # evaluate term, with stack as the continuation. given pause, raise
+        # _Paused instead of taking the application after the first pause
+        # steps, leaving the rest of the continuation on stack
+        lazy = self.lazy
+        profile = self.profile
+        steps = 0
+        limited = self._limits is not None
+        if limited or pause is not None:
+            check = self._checkpoint(stack, 0, pause, None, None)
+        else:
+            check = sys.maxsize
+        unwind = profile is not None
+        try:
+            while True:
+                cls = term.__class__
+                if cls is App:
+                    if lazy:
+                        stack.append((_LAZY, self._delay(term.arg, env), None))
+                    else:
+                        stack.append((_ARG, term.arg, env))
+                    term = term.fn
+                    continue
+                if cls is Var:
+                    frame = env
+                    for _ in range(term.index):
+                        frame = frame[1]
+                    value = frame[0]
+                    if value.__class__ is Thunk:
+                        if value.term is not None:
+                            self.forced += 1
+                            stack.append((_UPDATE, value, None))
+                            term, env = value.term, value.env
+                            continue
+                        self.shared += 1
+                        value = value.value
+                elif cls is Lam:
+                    value = Closure(term, env, self)
+                elif cls is Ref:
+                    value = term.program.value(term.name)
+                else:
+                    value = term.value
+                while stack:
+                    kind, x, y = stack.pop()
+                    if kind is _ARG:
+                        stack.append((_CALL, value, None))
+                        term, env = x, y
+                        break
+                    if kind is _UPDATE:
+                        x.value = value
+                        x.term = x.env = None
+                        continue
+                    if kind is _EXIT:
+                        profile.exit(x, y, self.steps + steps)
+                        continue
+                    if kind is _LAZY:
+                        fn, value = value, x
+                        if value.__class__ is Thunk and fn.__class__ is not Closure:
+                            # python callables get values, not thunks
+                            if value.term is not None:
+                                self.forced += 1
+                                stack.append((_CALL, fn, None))
+                                stack.append((_UPDATE, value, None))
+                                term, env = value.term, value.env
+                                break
+                            self.shared += 1
+                            value = value.value
+                    else:
+                        fn = x
+                    if steps >= check:
+                        check = self._checkpoint(stack, steps, pause, fn, value)
+                    steps += 1
+                    if fn.__class__ is Closure:
+                        if profile is not None:
+                            self._enter(profile, fn.lam, stack, steps)
+                        term, env = fn.lam.body, (value, fn.env)
+                        break
+                    if profile is not None or limited:
+                        # keep self.steps current for any machine run fn
+                        # starts, so that the profile sees steps in order and
+                        # the limits are kept across both runs
+                        self.steps += steps
+                        check -= steps
+                        if pause is not None:
+                            pause -= steps
+                        steps = 0
+                    value = fn(value)
+                else:
+                    return value
+        except _Paused:
+            unwind = False
+            raise
+        finally:
+            self.steps += steps
+            if unwind:
+                # an exception left these calls unfinished
+                for kind, x, y in reversed(stack):
+                    if kind is _EXIT:
+                        profile.exit(x, y, None)
+
+    def _enter(self, profile, lam, stack, steps):
+        counter = profile.entries.get(lam)
+        if counter is not None:
+            stack.append((_EXIT, counter, profile.enter(counter, self.steps + steps - 1)))
+
+    def _delay(self, arg, env):
+        # the argument term arg, as a value if that takes no work, or else
+        # as a thunk
+        cls = arg.__class__
+        if cls is Var:
+            for _ in range(arg.index):
+                env = env[1]
+            return env[0]
+        if cls is Lam:
+            return Closure(arg, env, self)
+        if cls is Ref:
+            return arg.program.value(arg.name)
+        if cls is Const:
+            return arg.value
+        self.thunks += 1
+        return Thunk(arg, env)
+
+
+default_machine = Machine()
+
+
+def evaluate(term, env=None):
+    return default_machine.evaluate(term, env)
+
+
+class Program(object):
+    # an ordered set of toplevel definitions, like the module church.py
+    # describes in its header. they are evaluated on machine, by default the
+    # shared call-by-value one
+
+    def __init__(self, machine=None):
+        self.machine = machine
+        self.terms = OrderedDict()
+        self._refs = {}
+        self._values = {}
+
+    def ref(self, name):
+        try:
+            return self._refs[name]
+        except KeyError:
+            r = self._refs[name] = Ref(name, self)
+            return r
+
+    def define(self, name, term):
+        self.terms[name] = term
+        self._values.pop(name, None)
+
+    def value(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        v = self._values[name] = (self.machine or default_machine).evaluate(self.terms[name])
+        return v
+
+    __getitem__ = value
+
+    def __contains__(self, name):
+        return name in self.terms
+
+    def names(self):
+        return list(self.terms)
+
+    def namespace(self):
+        return dict((name, self.value(name)) for name in self.terms)
+
+
+class _Converter(object):
+    def __init__(self, program, toplevel, filename):
+        self.program = program
+        self.toplevel = toplevel
+        self.filename = filename
+
+    def error(self, node, msg):
+        return SyntaxError(msg, (self.filename, getattr(node, 'lineno', None),
+                                 getattr(node, 'col_offset', None), None))
+
+    def convert(self, node, scope=()):
+        # scope holds the names bound by the enclosing lambdas, innermost first
+        if isinstance(node, ast.Lambda):
+            args = node.args
+            if len(args.args) != 1 or args.vararg or args.kwarg or args.defaults \
+                    or getattr(args, 'kwonlyargs', None) or getattr(args, 'posonlyargs', None):
+                raise self.error(node, 'lambdas must take exactly one argument')
+            param = args.args[0].arg
+            return Lam(param, self.convert(node.body, (param,) + scope))
+        if isinstance(node, ast.Call):
+            if len(node.args) != 1 or node.keywords:
+                raise self.error(node, 'calls must pass exactly one argument')
+            return App(self.convert(node.func, scope), self.convert(node.args[0], scope))
+        if isinstance(node, ast.Name):
+            if node.id in scope:
+                return Var(node.id, scope.index(node.id))
+            if node.id in self.toplevel:
+                return self.program.ref(node.id)
+            raise self.error(node, 'undefined name %r' % node.id)
+        raise self.error(node, 'unsupported syntax: %s' % node.__class__.__name__)
+
+
+# read the toplevel NAME = expr definitions in source into a Program
+def parse(source, program=None, filename='<church>'):
+    if program is None:
+        program = Program()
+    module = ast.parse(source, filename)
+    defs = []
+    for stmt in module.body:
+        if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant) \
+                and isinstance(stmt.value.value, str):
+            continue
+        if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name)):
+            raise SyntaxError('only NAME = expr definitions are allowed',
+                              (filename, stmt.lineno, stmt.col_offset, None))
+        defs.append((stmt.targets[0].id, stmt.value))
+    toplevel = set(program.terms) | set(name for name, _ in defs)
+    converter = _Converter(program, toplevel, filename)
+    for name, node in defs:
+        program.define(name, converter.convert(node))
+    return program
+
+
+# read a single expression over the definitions of program into a Term
+def parse_expr(source, program, filename='<expr>'):
+    node = ast.parse(source.strip(), filename, 'eval').body
+    return _Converter(program, set(program.terms), filename).convert(node)
+
+
+# terms as plain, picklable data, for sending them to another process: a
+# flat postfix list of tuples, ('var', name, index), ('lam', param), ('app',)
+# and ('ref', name), which a stack rebuilds. being flat, neither direction
+# recurses, however deep the term. Consts hold values from the process
+# they were made in, so they can't be sent
+def to_wire(term):
+    wire = []
+    todo = [term]
+    while todo:
+        t = todo.pop()
+        cls = t.__class__
+        if cls is Var:
+            wire.append(('var', t.name, t.index))
+        elif cls is Lam:
+            todo.append(('lam', t.param))
+            todo.append(t.body)
+        elif cls is App:
+            todo.append(('app',))
+            todo.append(t.arg)
+            todo.append(t.fn)
+        elif cls is Ref:
+            wire.append(('ref', t.name))
+        elif cls is tuple:
+            wire.append(t)
+        else:
+            raise ValueError('can not send %r' % (t,))
+    return wire
+
+
+def from_wire(wire, program):
+    stack = []
+    for op in wire:
+        kind = op[0]
+        if kind == 'var':
+            stack.append(Var(op[1], op[2]))
+        elif kind == 'ref':
+            if op[1] not in program:
+                raise ValueError('undefined name %r' % (op[1],))
+            stack.append(program.ref(op[1]))
+        elif kind == 'lam':
+            stack.append(Lam(op[1], stack.pop()))
+        elif kind == 'app':
+            arg = stack.pop()
+            stack.append(App(stack.pop(), arg))
+        else:
+            raise ValueError('bad term operation %r' % (op,))
+    if len(stack) != 1:
+        raise ValueError('wire form holds %d terms, not one' % len(stack))
+    return stack[0]
+
+
+def load(path=CHURCH_SOURCE, machine=None):
+    with open(path) as f:
+        return parse(f.read(), Program(machine), filename=path)
+
+
+@contextlib.contextmanager
+def backend(namespace, modules):
+    # temporarily rebind every name from namespace in each of the given
+    # modules, so that code which did 'from church import *' sees the values
+    # of another backend
+    saved = []
+    for module in modules:
+        d = vars(module)
+        for name, value in namespace.items():
+            if name in d:
+                saved.append((d, name, d[name]))
+                d[name] = value
+    try:
+        yield
+    finally:
+        for d, name, value in reversed(saved):
+            d[name] = value
+
+
+def main(argv=None):
+    # run test_church.py against the closure backend and the term backend,
+    # both call-by-value and call-by-need, timing each
+    import unittest
+    import test_church
+    import using_church
+
+    lazy = Machine(lazy=True)
+    backends = (('closures', None, default_machine),
+                ('terms', load().namespace(), default_machine),
+                ('lazy', load(machine=lazy).namespace(), lazy))
+    results = []
+    for label, namespace, machine in backends:
+        suite = unittest.defaultTestLoader.loadTestsFromTestCase(test_church.TestChurch)
+        runner = unittest.TextTestRunner(stream=open(os.devnull, 'w'))
+        steps = machine.steps
+        start = time.time()
+        if namespace is None:
+            result = runner.run(suite)
+        else:
+            with backend(namespace, [test_church, using_church]):
+                result = runner.run(suite)
+        elapsed = time.time() - start
+        results.append((label, elapsed, machine.steps - steps, result))
+    for label, elapsed, steps, result in results:
+        print('%-8s %8.3fs %10d steps  %d run, %d failed, %d errors' % (
+            label, elapsed, steps, result.testsRun, len(result.failures), len(result.errors)))
+    print('lazy: %d thunks, %d forced, %d never needed, %d re-evaluations avoided' % (
+        lazy.thunks, lazy.forced, lazy.thunks - lazy.forced, lazy.shared))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
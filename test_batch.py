@@ -0,0 +1,34 @@
+import unittest
+import terms
+import batch
+from using_church import ChurchTypeError, ChurchResourceError
+
+PROGRAM = terms.load()
+
+
+class TestBatch(unittest.TestCase):
+    EXPRS = [
+        'ADD(MK_POS_INT(BARE_TEN))(NEG(MK_POS_INT(BARE_THREE)))',
+        terms.parse_expr('MULT(MK_POS_INT(BARE_TWO))(MK_POS_INT(BARE_FIVE))', PROGRAM),
+        ('ADD', 40, 2),
+        ('CONCAT', [1, 2], [3]),
+        ('STRCAT', 'ab', 'cd'),
+        ('ADD', 'x', 1),
+    ]
+    RESULTS = [7, 10, 42, [1, 2, 3], 'abcd', ChurchTypeError]
+
+    def test_in_process(self):
+        self.assertEqual(batch.evaluate_many(self.EXPRS, workers=0), self.RESULTS)
+
+    def test_pool(self):
+        with batch.Pool(2) as pool:
+            self.assertEqual(pool.evaluate_many(self.EXPRS), self.RESULTS)
+            exprs = [('MULT', i, i) for i in range(40)]
+            self.assertEqual(pool.evaluate_many(exprs, chunksize=3), [i * i for i in range(40)])
+            self.assertEqual(pool.evaluate_many([]), [])
+            loop = 'Y(lambda f: lambda x: f(x))(BARE_VOID)'
+            self.assertRaises(ChurchResourceError, pool.evaluate_many, [loop], steps=10000)
+
+    def test_bad_exprs(self):
+        self.assertRaises(TypeError, batch.evaluate_many, [42], workers=0)
+        self.assertRaises(SyntaxError, batch.evaluate_many, ['NOT_DEFINED'], workers=0)
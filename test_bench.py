@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+import bench
+
+
+class TestScaling(unittest.TestCase):
+    def test_complexity(self):
+        sizes = (10, 20, 40, 80)
+        self.assertEqual(bench.complexity(sizes, [5, 5, 5, 5]), '1')
+        self.assertEqual(bench.complexity(sizes, [100 + 3 * n for n in sizes]), 'n')
+        self.assertEqual(bench.complexity(sizes, [n * n for n in sizes]), 'n^2')
+        self.assertEqual(bench.complexity(sizes, [7 + n * n * n for n in sizes]), 'n^3')
+
+    def test_scaling(self):
+        results = bench.scaling(sizes=(4, 8, 16), names=['LEN', 'MULT'], repeat=1)
+        self.assertEqual(list(results), ['LEN', 'MULT'])
+        for r in results.values():
+            self.assertEqual(r['sizes'], [4, 8, 16])
+            for measure in ('seconds', 'steps', 'peak'):
+                self.assertEqual(len(r[measure]), 3)
+        self.assertEqual(results['LEN']['fit']['steps'], 'n')
+        self.assertEqual(results['MULT']['fit']['steps'], 'n^2')
+        self.assertLess(results['LEN']['steps'][0], results['LEN']['steps'][2])
+
+    def test_compare(self):
+        results = bench.scaling(sizes=(4, 8), names=['ADD'], repeat=1)
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            bench.save(results, path)
+            baseline = bench.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(baseline, results)
+        self.assertEqual(bench.compare(baseline, results), [])
+        worse = dict((name, dict(r, steps=[s * 2 for s in r['steps']])) for name, r in results.items())
+        regressions = bench.compare(baseline, worse)
+        self.assertEqual([(name, n, measure) for name, n, measure, _, _ in regressions],
+                         [('ADD', 4, 'steps'), ('ADD', 8, 'steps')])
+        self.assertEqual(bench.compare(baseline, worse, threshold=1.5), [])
+
+    def test_memory(self):
+        rows = bench.bench_memory(300, ['pairs'])
+        self.assertEqual([row[:2] for row in rows], [('pairs', 300)])
+        name, n, held, interned, seconds, interned_seconds = rows[0]
+        self.assertLess(interned, held)
@@ -1,4 +1,5 @@
 import unittest
+import church
 from church import *
 from using_church import *
 
@@ -116,7 +117,7 @@ class TestChurch(unittest.TestCase):
     def test_bare_lists(self):
         self.assertEqual(bare_listify(BARE_NIL), [])
         barelist = BARE_PREPEND(BARE_ONE)(BARE_PREPEND(BARE_TWO)(BARE_NIL))
-        self.assertListEqual(map(bare_numerify, bare_listify(barelist)), [1, 2])
+        self.assertListEqual([bare_numerify(x) for x in bare_listify(barelist)], [1, 2])
         self.assertBareNum(BARE_LEN(barelist), 2)
         self.assertBareNum(BARE_LEN(bare_churchify([6] * 200)), 200)
         self.assertBareNum(BARE_CONSHEAD(BARE_CONSTAIL(barelist)), 2)
@@ -124,7 +125,7 @@ class TestChurch(unittest.TestCase):
         self.assertBareBool(BARE_IS_NIL(BARE_NIL))
         self.assertBareBool(BARE_IS_NIL(BARE_CONSTAIL(BARE_CONSTAIL(barelist))))
         barelist2 = BARE_APPEND(barelist)(BARE_EIGHT)
-        self.assertListEqual(map(bare_numerify, bare_listify(barelist2)), [1, 2, 8])
+        self.assertListEqual([bare_numerify(x) for x in bare_listify(barelist2)], [1, 2, 8])
         one_element = BARE_APPEND(BARE_NIL)(BARE_NIL)
         self.assertBareNum(BARE_LEN(one_element), 1)
         respair = BARE_ELT(barelist2)(BARE_TWO)
@@ -143,6 +144,22 @@ class TestChurch(unittest.TestCase):
         self.assertChurch(IS_LIST(typedlist))
         self.assertChurch(IS_LIST(MK_LIST(BARE_NIL)))
 
+    def test_type_tags(self):
+        makers = [MK_VOID, MK_BOOL, MK_POS_INT, MK_NEG_INT, MK_LIST, MK_PAIR, MK_RESULTPAIR,
+                  MK_CHAR, MK_STRING, MK_ERROR, MK_BIN_INT, MK_RA_LIST, MK_RA_STRING,
+                  MK_ROPE, MK_ROPE_STRING, MK_MAP, MK_BYTES]
+        tests = [BARE_IS_VOID, BARE_IS_BOOL, BARE_IS_POS_INT, BARE_IS_NEG_INT, BARE_IS_LIST,
+                 BARE_IS_PAIR, BARE_IS_RESULTPAIR, BARE_IS_CHAR, BARE_IS_STRING, BARE_IS_ERROR,
+                 BARE_IS_BIN_INT, BARE_IS_RA_LIST, BARE_IS_RA_STRING,
+                 BARE_IS_ROPE, BARE_IS_ROPE_STRING, BARE_IS_MAP, BARE_IS_BYTES]
+        for i, maker in enumerate(makers):
+            tval = maker(BARE_VOID)
+            self.assertBareNum(BARE_TYPEOF(tval), i + 1)
+            self.assertChurch(TYPE_OF(tval), i + 1)
+            for j, test in enumerate(tests):
+                self.assertBareBool(test(tval), i == j)
+        self.assertChurch(IS_CHAR(BARE_MAKE_TYPEDVAR_MAKER(BARE_EIGHT)(BARE_ZERO)))
+
     def test_list_len(self):
         typedlist = MK_LIST(BARE_PREPEND(BARE_TEN)(BARE_NIL))
         self.assertChurch(LEN(typedlist), 1)
@@ -239,3 +256,370 @@ class TestChurch(unittest.TestCase):
         self.assertChurch(STRCHR(churchify("Mal Reynolds"))(churchify(0)), 'M')
         self.assertChurch(STRCHR(churchify("Mal Reynolds"))(churchify(3)), ' ')
         self.assertChurch(STRCHR(churchify("Mal Reynolds"))(churchify(33)), ChurchIndexError)
+
+    def test_bare_bin(self):
+        values = [0, 1, 2, 3, 7, 8, 12, 255, 256, 1000]
+        for a in values:
+            self.assertEqual(bare_binify(bare_binary(a)), a)
+            self.assertEqual(bare_binify(BARE_BIN_SUCC(bare_binary(a))), a + 1)
+            self.assertBareNum(BARE_NUM_FROM_BIN(bare_binary(a)), a)
+            for b in values:
+                x, y = bare_binary(a), bare_binary(b)
+                self.assertEqual(bare_binify(BARE_BIN_ADD(x)(y)), a + b)
+                self.assertEqual(bare_binify(BARE_BIN_SUB(x)(y)), max(a - b, 0))
+                self.assertEqual(bare_binify(BARE_BIN_MULT(x)(y)), a * b)
+                self.assertBareBool(BARE_BIN_EQUALP(x)(y), a == b)
+                self.assertBareBool(BARE_BIN_LEQ(x)(y), a <= b)
+        self.assertEqual(bare_binify(BARE_BIN_FROM_NUM(BARE_TEN)), 10)
+        # no trailing zero bits, so equal numbers are equal lists
+        self.assertEqual(len(bare_listify(BARE_BIN_SUB(bare_binary(256))(bare_binary(255)))), 1)
+
+    def test_bin_ints(self):
+        big = 3 ** 40
+        self.assertChurch(churchify(BinInt(big)), big)
+        self.assertChurch(churchify(BinInt(-big)), -big)
+        self.assertChurch(IS_BIN_INT(churchify(BinInt(5))))
+        self.assertChurch(ADD(churchify(BinInt(big)))(churchify(BinInt(-big - 12))), -12)
+        self.assertChurch(ADD(churchify(BinInt(-20)))(churchify(BinInt(-22))), -42)
+        self.assertChurch(ADD(churchify(BinInt(big)))(churchify(3)), big + 3)
+        self.assertChurch(SUB(churchify(7))(churchify(BinInt(big))), 7 - big)
+        self.assertChurch(MULT(churchify(BinInt(big)))(churchify(BinInt(-big))), -big * big)
+        self.assertChurch(MULT(churchify(-4))(churchify(BinInt(-6))), 24)
+        self.assertChurch(NEG(churchify(BinInt(big))), -big)
+        self.assertChurch(EQUALP(churchify(BinInt(12)))(churchify(12)))
+        self.assertChurch(EQUALP(churchify(BinInt(-12)))(churchify(12)), False)
+        self.assertChurch(EQUALP(churchify(BinInt(0)))(churchify(neg_zero)))
+        self.assertChurch(ADD(churchify(BinInt(1)))(TRUE), ChurchTypeError)
+        self.assertChurch(NEG(VOID), ChurchTypeError)
+
+    def test_caches(self):
+        clear_caches()
+        try:
+            set_cache_size(16)
+            self.assertIs(BARE_VALUEOF(churchify(300)), BARE_VALUEOF(churchify(300)))
+            self.assertIs(BARE_VALUEOF(churchify('hello')), BARE_VALUEOF(churchify('hello')))
+            # a char and an int with the same value share their numeral
+            self.assertIs(BARE_VALUEOF(churchify(Char('a'))), BARE_VALUEOF(churchify(97)))
+            self.assertGreater(cache_info()['encode']['hits'], 0)
+            self.assertLessEqual(cache_info()['encode']['size'], 16)
+
+            x = churchify('hello')
+            self.assertChurch(x, 'hello')
+            hits = cache_info()['decode']['hits']
+            self.assertChurch(x, 'hello')
+            self.assertEqual(cache_info()['decode']['hits'], hits + 1)
+            lst = churchify([1, 2])
+            self.assertEqual(list(dechurchify(lst)), [1, 2])
+            self.assertEqual(list(dechurchify(lst)), [1, 2])
+
+            set_cache_size(0)
+            self.assertEqual(cache_info()['encode']['size'], 0)
+            self.assertIsNot(BARE_VALUEOF(churchify(30)), BARE_VALUEOF(churchify(30)))
+        finally:
+            set_cache_size(1024)
+
+    def test_interning(self):
+        # the typed ops hand out shared constants
+        self.assertIs(EQUALP(churchify(3))(churchify(3)), TRUE)
+        self.assertIs(IS_LIST(churchify(3)), FALSE)
+        self.assertIs(ELT(VOID)(churchify(0)), TYPE_ERROR_RESULT)
+        self.assertIs(DIV(churchify(3))(churchify(0)), ZERO_DIVISION_ERROR_RESULT)
+
+        clear_caches()
+        self.assertIsNot(churchify([1, 2]), churchify([1, 2]))
+        with interning() as table:
+            self.assertIs(churchify(5), churchify(5))
+            self.assertIs(churchify([1, 'two']), churchify([1, 'two']))
+            self.assertIs(churchify({1: 'x'}), churchify({1: 'x'}))
+            # lists which end alike share their cells
+            self.assertIs(BARE_CONSTAIL(BARE_VALUEOF(churchify([0, 2, 3]))),
+                          BARE_CONSTAIL(BARE_VALUEOF(churchify([1, 2, 3]))))
+            self.assertIs(bare_stringify('a long string, longer than the cache takes' * 2),
+                          bare_stringify('a long string, longer than the cache takes' * 2))
+            self.assertGreater(table.info()['hits'], 0)
+            # every copy of a value is decoded once
+            self.assertChurch(churchify(300), 300)
+            hits = cache_info()['decode']['hits']
+            self.assertChurch(churchify(300), 300)
+            self.assertEqual(cache_info()['decode']['hits'], hits + 1)
+            with interning(False):
+                self.assertIsNot(churchify(5), churchify(5))
+            self.assertTrue(cache_info()['intern']['enabled'])
+        self.assertFalse(cache_info()['intern']['enabled'])
+        self.assertIsNot(churchify([1, 2]), churchify([1, 2]))
+        self.assertGreater(cache_info()['intern']['size'], 0)
+        clear_caches()
+        self.assertEqual(cache_info()['intern']['size'], 0)
+
+    def test_iter_dechurchify(self):
+        it = iter_dechurchify(churchify([1, 'ab', [2]]))
+        self.assertEqual(next(it), 1)
+        self.assertEqual(list(it), ['ab', [2]])
+        self.assertEqual(list(iter_dechurchify(churchify('hello'))), list('hello'))
+        self.assertEqual(list(iter_dechurchify(churchify([]))), [])
+        self.assertRaises(TypeError, list, iter_dechurchify(churchify(3)))
+        # decoding stops where the caller does
+        seen = []
+        for x in iter_dechurchify(churchify(list(range(5)))):
+            seen.append(x)
+            if x == 2:
+                break
+        self.assertEqual(seen, [0, 1, 2])
+        self.assertEqual(dechurchify(churchify([None] * 5000)), [None] * 5000)
+        self.assertEqual(dechurchify(churchify('x' * 5000)), 'x' * 5000)
+
+    def test_ra_lists(self):
+        self.assertEqual(bare_ralistify(BARE_RA_NIL), [])
+        ra = BARE_RA_NIL
+        for n in range(12, 0, -1):
+            ra = BARE_RA_PREPEND(bare_numeral(n))(ra)
+        self.assertEqual([bare_numerify(x) for x in bare_ralistify(ra)], list(range(1, 13)))
+        self.assertEqual(bare_binify(BARE_RA_LEN(ra)), 12)
+        self.assertBareNum(BARE_RA_HEAD(BARE_RA_TAIL(ra)), 2)
+        for i in range(12):
+            val, err = bare_unpairify(BARE_RA_ELT(ra)(bare_binary(i)))
+            self.assertBareNum(val, i + 1)
+            self.assertBareNum(err, 0)
+        self.assertBareNum(BARE_RESULT_ERRVAL(BARE_RA_ELT(ra)(bare_binary(12))), 2)
+
+        items = list(range(40))
+        tlst = churchify(RAList(items))
+        self.assertChurch(tlst, items)
+        self.assertChurch(IS_RA_LIST(tlst))
+        self.assertChurch(LEN(tlst), 40)
+        self.assertChurch(HEAD(tlst), 0)
+        self.assertChurch(TAIL(tlst), items[1:])
+        self.assertChurch(PREPEND(churchify(-1))(tlst), [-1] + items)
+        self.assertChurch(IS_EMPTY(tlst), False)
+        self.assertChurch(IS_EMPTY(churchify(RAList([]))))
+        self.assertChurch(HEAD(churchify(RAList([]))), ChurchIndexError)
+        for i in (0, 1, 17, 39):
+            self.assertChurch(ELT(tlst)(churchify(i)), i)
+            self.assertChurch(ELT(tlst)(churchify(BinInt(i))), i)
+        self.assertChurch(ELT(tlst)(churchify(40)), ChurchIndexError)
+        self.assertChurch(ELT(tlst)(churchify(BinInt(-1))), ChurchIndexError)
+        self.assertChurch(ELT(tlst)(TRUE), ChurchTypeError)
+        self.assertEqual(list(iter_dechurchify(tlst)), items)
+
+        tstr = churchify(RAList('random access'))
+        self.assertChurch(tstr, 'random access')
+        self.assertChurch(STRLEN(tstr), 13)
+        self.assertChurch(STRCHR(tstr)(churchify(7)), 'a')
+        self.assertChurch(STRCHR(tstr)(churchify(13)), ChurchIndexError)
+        self.assertChurch(HEAD(tstr), ChurchTypeError)
+
+        big = churchify(RAList([None] * 9999 + [True]))
+        self.assertChurch(ELT(big)(churchify(BinInt(9999))))
+
+    def test_ropes(self):
+        rope = BARE_ROPE_CAT(BARE_ROPE_LEAF(bare_churchify([1, 2])))(BARE_ROPE_NIL)
+        rope = BARE_ROPE_APPEND(rope)(bare_numeral(3))
+        self.assertEqual([bare_numerify(x) for x in bare_ropify(rope)], [1, 2, 3])
+        self.assertEqual([bare_numerify(x) for x in bare_listify(BARE_ROPE_FLATTEN(rope))], [1, 2, 3])
+        self.assertBareNum(BARE_ROPE_LEN(rope), 3)
+
+        tlst = ROPE(churchify([0]))
+        self.assertChurch(IS_ROPE(tlst))
+        for i in range(1, 60):
+            tlst = APPEND(tlst)(churchify(i))
+        self.assertChurch(tlst, list(range(60)))
+        self.assertChurch(LEN(tlst), 60)
+        self.assertChurch(ELT(tlst)(churchify(42)), 42)
+        self.assertChurch(ELT(tlst)(churchify(60)), ChurchIndexError)
+        self.assertChurch(CONCAT(churchify([-1]))(tlst), list(range(-1, 60)))
+        self.assertChurch(IS_LIST(FLATTEN(tlst)))
+        self.assertChurch(FLATTEN(tlst), list(range(60)))
+        self.assertEqual(list(iter_dechurchify(tlst))[:3], [0, 1, 2])
+
+        tstr = churchify(Rope('rope'))
+        self.assertChurch(IS_ROPE_STRING(tstr))
+        tstr = STRCAT(STRCAT(churchify('a '))(tstr))(churchify(' string'))
+        self.assertChurch(tstr, 'a rope string')
+        self.assertChurch(STRLEN(tstr), 13)
+        self.assertChurch(STRCHR(tstr)(churchify(2)), 'r')
+        self.assertChurch(FLATTEN(tstr), 'a rope string')
+        self.assertChurch(STRCAT(churchify('ab'))(churchify('cd')), 'abcd')
+        self.assertChurch(IS_STRING(STRCAT(churchify('ab'))(churchify('cd'))))
+        self.assertChurch(STRCAT(tstr)(churchify([1])), ChurchTypeError)
+        self.assertChurch(CONCAT(tlst)(tstr), ChurchTypeError)
+        self.assertChurch(ROPE(VOID), ChurchTypeError)
+
+    def assertBalanced(self, m):
+        # the height of bare map m, checking that it is an AVL tree
+        node = m(lambda _: None)(lambda h: lambda l: lambda k: lambda v: lambda r: (h, l, r))
+        if node is None:
+            return 0
+        h, l, r = node
+        hl, hr = self.assertBalanced(l), self.assertBalanced(r)
+        self.assertLessEqual(abs(hl - hr), 1)
+        self.assertBareNum(h, max(hl, hr) + 1)
+        return max(hl, hr) + 1
+
+    def test_maps(self):
+        d = {3: 'three', -2: 'minus two', 0: None, 'b': [1], 'a': True}
+        tmap = churchify(d)
+        self.assertChurch(IS_MAP(tmap))
+        self.assertChurch(tmap, d)
+        self.assertChurch(MAP_LEN(tmap), 5)
+        self.assertEqual([dechurchify(k) for k, v in bare_mapify(BARE_VALUEOF(tmap))],
+                         [-2, 0, 3, 'a', 'b'])
+        self.assertChurch(MAP_GET(tmap)(churchify(3)), 'three')
+        self.assertChurch(MAP_GET(tmap)(churchify(-2)), 'minus two')
+        self.assertChurch(MAP_GET(tmap)(churchify(neg_zero)), None)
+        self.assertChurch(MAP_GET(tmap)(churchify('b')), [1])
+        self.assertChurch(MAP_GET(tmap)(churchify(2)), ChurchIndexError)
+        self.assertChurch(MAP_GET(tmap)(churchify('ab')), ChurchIndexError)
+        self.assertChurch(MAP_GET(tmap)(churchify(BinInt(3))), ChurchTypeError)
+        self.assertChurch(MAP_GET(churchify([3]))(churchify(3)), ChurchTypeError)
+        self.assertChurch(MAP_PUT(tmap)(churchify(3))(churchify(4)), dict(list(d.items()) + [(3, 4)]))
+        self.assertChurch(MAP_DEL(tmap)(churchify('a')), dict((k, v) for k, v in d.items() if k != 'a'))
+        self.assertChurch(MAP_DEL(tmap)(churchify(7)), d)
+        self.assertChurch(MAP_PUT(tmap)(VOID)(VOID), ChurchTypeError)
+        self.assertChurch(MAP_LEN(VOID), ChurchTypeError)
+        self.assertChurch(churchify({}), {})
+        self.assertRaises(TypeError, churchify, {(1, 2): 3})
+
+        # entries put in and taken out in order keep the tree balanced
+        tmap = EMPTY_MAP
+        expected = {}
+        for i in range(40):
+            tmap = MAP_PUT(tmap)(churchify(i))(churchify(-i))
+            expected[i] = -i
+            self.assertBalanced(BARE_VALUEOF(tmap))
+        self.assertChurch(tmap, expected)
+        for i in range(0, 40, 3):
+            tmap = MAP_DEL(tmap)(churchify(i))
+            del expected[i]
+            self.assertBalanced(BARE_VALUEOF(tmap))
+        self.assertChurch(tmap, expected)
+        self.assertChurch(MAP_LEN(tmap), len(expected))
+        self.assertBalanced(BARE_VALUEOF(churchify(dict((i, i) for i in range(100)))))
+
+        words = ['pear', 'apple', 'fig', 'app', 'banana', '', 'figs']
+        tmap = EMPTY_MAP
+        for i, word in enumerate(words):
+            tmap = MAP_PUT(tmap)(churchify(word))(churchify(i))
+        self.assertEqual([dechurchify(k) for k, v in bare_mapify(BARE_VALUEOF(tmap))], sorted(words))
+
+    def test_bare_division(self):
+        for n in range(20):
+            for d in range(1, 7):
+                q, r = bare_unpairify(BARE_DIVMOD(bare_numeral(n))(bare_numeral(d)))
+                self.assertEqual((bare_numerify(q), bare_numerify(r)), divmod(n, d))
+            self.assertBareNum(BARE_ISQRT(bare_numeral(n)), int(n ** 0.5))
+        self.assertBareNum(BARE_DIV(bare_numeral(150))(bare_numeral(7)), 21)
+        self.assertBareNum(BARE_MOD(bare_numeral(150))(bare_numeral(7)), 3)
+        for b in range(4):
+            for e in range(4):
+                self.assertBareNum(BARE_EXP(bare_numeral(b))(bare_numeral(e)), b ** e)
+        for n, d in [(0, 5), (100, 7), (2 ** 40 + 3, 12345), (12345, 2 ** 40)]:
+            q, r = bare_unpairify(BARE_BIN_DIVMOD(bare_binary(n))(bare_binary(d)))
+            self.assertEqual((bare_binify(q), bare_binify(r)), divmod(n, d))
+        self.assertEqual(bare_binify(BARE_BIN_EXP(bare_binary(3))(bare_binary(40))), 3 ** 40)
+
+    def test_div_mod(self):
+        # python's floor division, for every combination of signs and of
+        # unary and binary operands
+        for a in (7, -7, 6, -6, 0, neg_zero):
+            for b in (3, -3, 1, -1):
+                n = 0 if a is neg_zero else a
+                for x, y in ((a, b), (BinInt(n), b), (a, BinInt(b))):
+                    self.assertChurch(DIV(churchify(x))(churchify(y)), n // b, (x, y))
+                    self.assertChurch(MOD(churchify(x))(churchify(y)), n % b, (x, y))
+            for zero in (0, neg_zero, BinInt(0)):
+                self.assertChurch(DIV(churchify(a))(churchify(zero)), ChurchZeroDivisionError)
+                self.assertChurch(MOD(churchify(a))(churchify(zero)), ChurchZeroDivisionError)
+        self.assertChurch(IS_RESULTPAIR(DIV(churchify(7))(churchify(2))))
+        self.assertChurch(DIV(churchify(BinInt(10 ** 20)))(churchify(BinInt(-7 ** 10))), 10 ** 20 // -7 ** 10)
+        self.assertChurch(DIV(churchify('7'))(churchify(2)), ChurchTypeError)
+        self.assertChurch(MOD(churchify(7))(VOID), ChurchTypeError)
+
+    def test_pow(self):
+        for a in (3, -3, 0, 1, -1):
+            for e in (0, 1, 2, 3):
+                for x, y in ((a, e), (BinInt(a), e), (a, BinInt(e))):
+                    self.assertChurch(POW(churchify(x))(churchify(y)), a ** e, (x, y))
+        self.assertChurch(POW(churchify(5))(churchify(neg_zero)), 1)
+        self.assertChurch(POW(churchify(BinInt(3)))(churchify(BinInt(50))), 3 ** 50)
+        self.assertChurch(POW(churchify(2))(churchify(-1)), ChurchTypeError)
+        self.assertChurch(POW(churchify(2))(churchify(BinInt(-1))), ChurchTypeError)
+        self.assertChurch(POW(VOID)(churchify(2)), ChurchTypeError)
+        self.assertChurch(ISQRT(churchify(99)), 9)
+        self.assertChurch(ISQRT(churchify(100)), 10)
+        self.assertChurch(ISQRT(churchify(-4)), ChurchTypeError)
+
+    def test_lazy_lists(self):
+        read = []
+        def numbers():
+            n = 0
+            while True:
+                read.append(n)
+                yield n
+                n += 1
+        # only what is looked at is read
+        tlst = churchify(LazyList(numbers()))
+        self.assertChurch(IS_LIST(tlst))
+        self.assertChurch(HEAD(tlst), 0)
+        self.assertEqual(read, [0])
+        self.assertChurch(ELT(tlst)(churchify(4)), 4)
+        self.assertEqual(read, [0, 1, 2, 3, 4])
+        # and once only
+        self.assertChurch(ELT(tlst)(churchify(2)), 2)
+        self.assertEqual(read, [0, 1, 2, 3, 4])
+
+        converted = []
+        def eltify(x):
+            converted.append(x)
+            return bare_numeral(x)
+        lst = lazy_bare_list([5, 6, 7], eltify)
+        self.assertBareNum(BARE_CONSHEAD(lst), 5)
+        self.assertEqual(converted, [5])
+        self.assertEqual([bare_numerify(x) for x in bare_listify(lst)], [5, 6, 7])
+
+        self.assertChurch(churchify(LazyList([1, 'two', [3]])), [1, 'two', [3]])
+        self.assertChurch(churchify(LazyList(x for x in range(4))), [0, 1, 2, 3])
+        self.assertChurch(LEN(churchify(LazyList(range(50)))), 50)
+        self.assertChurch(churchify(LazyList([])), [])
+        tstr = churchify(LazyList('lazy'))
+        self.assertChurch(IS_STRING(tstr))
+        self.assertChurch(STRCAT(tstr)(churchify('!')), 'lazy!')
+        self.assertChurch(STRCHR(tstr)(churchify(3)), 'y')
+
+    def test_bytes(self):
+        tbytes = churchify(b'bytes')
+        self.assertChurch(IS_BYTES(tbytes))
+        self.assertChurch(tbytes, b'bytes')
+        self.assertChurch(LEN(tbytes), 5)
+        self.assertChurch(HEAD(tbytes), ord('b'))
+        self.assertChurch(TAIL(tbytes), b'ytes')
+        self.assertChurch(ELT(tbytes)(churchify(4)), ord('s'))
+        self.assertChurch(ELT(tbytes)(churchify(5)), ChurchIndexError)
+        self.assertChurch(IS_EMPTY(churchify(b'')))
+        self.assertChurch(HEAD(churchify(b'')), ChurchIndexError)
+        self.assertEqual(list(iter_dechurchify(tbytes)), list(b'bytes'))
+        self.assertChurch(STRLEN(tbytes), ChurchTypeError)
+
+        # views: nothing is copied, so a buffer changed before it is read
+        # shows the change
+        buf = bytearray(b'abc')
+        tbytes = churchify(memoryview(buf))
+        buf[0] = ord('x')
+        self.assertChurch(HEAD(tbytes), ord('x'))
+        self.assertChurch(churchify(memoryview(b'0123456789')[2:5]), b'234')
+        big = churchify(bytes(1000000))
+        self.assertChurch(ELT(big)(churchify(2)), 0)
+        self.assertChurch(TAIL(TAIL(churchify(bytearray(b'abcd')))), b'cd')
+
+    def test_lockstep_comparisons(self):
+        # the lockstep comparisons agree with the ones by subtraction
+        pairs = [(a, b) for a in range(7) for b in range(7)] + [(150, 149), (149, 150), (150, 150)]
+        for name in ('EQUALP', 'LEQ', 'GEQ', 'LT', 'GT'):
+            fast, slow = globals()['BARE_' + name], getattr(church, '_SUB_' + name)
+            for a, b in pairs:
+                n1, n2 = bare_numeral(a), bare_numeral(b)
+                self.assertIs(bare_boolify(fast(n1)(n2)), bare_boolify(slow(n1)(n2)), (name, a, b))
+        for a, b in pairs:
+            ge, diff = bare_unpairify(BARE_NUM_DIFF(bare_numeral(a))(bare_numeral(b)))
+            self.assertEqual((bare_boolify(ge), bare_numerify(diff)), (a >= b, abs(a - b)))
+            self.assertChurch(ADD(churchify(a))(churchify(-b)), a - b)
+            self.assertChurch(ADD(churchify(-a))(churchify(b)), b - a)
@@ -0,0 +1,69 @@
+import unittest
+import test_church
+import using_church
+import compiler
+import terms
+from using_church import bare_numerify
+
+PROGRAM = terms.load()
+BINDINGS = compiler.compile_program(PROGRAM)
+SOURCE = compiler.emit(BINDINGS)
+
+
+class TestChurchCompiled(test_church.TestChurch):
+    # the whole of test_church.py, against the compiled definitions
+
+    def setUp(self):
+        self._backend = terms.backend(compiler.namespace(SOURCE), [test_church, using_church])
+        self._backend.__enter__()
+
+    def tearDown(self):
+        self._backend.__exit__(None, None, None)
+
+
+class TestCompiler(unittest.TestCase):
+    def steps(self, source, program):
+        machine = terms.Machine()
+        machine.evaluate(terms.parse_expr(source, program))
+        return machine.steps
+
+    def test_substitution(self):
+        # (lambda x: lambda y: x)(y) must not capture y
+        term = terms.parse_expr('lambda y: (lambda x: lambda y: x)(y)', PROGRAM)
+        reduced = compiler.Compiler(PROGRAM).simplify(term)
+        self.assertEqual(compiler._source(reduced, ()), 'lambda y: lambda y_1: y')
+
+    def test_inlines_helpers(self):
+        add = SOURCE.split('\nADD = ')[1].split('\n')[0]
+        for helper in ('BARE_IF', 'BARE_AND', 'BARE_VALUEOF', 'BARE_ADD'):
+            self.assertNotIn(helper + '(', add)
+        # computed values stay shared bindings
+        self.assertIn('MK_POS_INT(', add)
+
+    def test_fewer_steps(self):
+        # the emitted source is itself in church.py's dialect
+        compiled = terms.parse(SOURCE)
+        for expr in ('ADD(MK_POS_INT(BARE_TEN))(MK_NEG_INT(BARE_TWO))',
+                     'MULT(MK_POS_INT(BARE_TEN))(MK_NEG_INT(BARE_TWO))',
+                     'EQUALP(MK_POS_INT(BARE_TEN))(MK_POS_INT(BARE_TEN))'):
+            self.assertLess(self.steps(expr, compiled), self.steps(expr, PROGRAM), expr)
+
+    def test_dead_bindings(self):
+        bindings = compiler.compile_program(PROGRAM, ['ADD'])
+        self.assertIn('ADD', bindings)
+        self.assertIn('MK_POS_INT', bindings)
+        self.assertNotIn('STRCAT', bindings)
+        self.assertNotIn('BARE_IF', bindings)
+        self.assertLess(len(bindings), len(BINDINGS))
+
+    def test_nest(self):
+        bindings = compiler.compile_program(PROGRAM, ['BARE_MULT', 'BARE_TEN'])
+        body = terms.parse_expr('BARE_MULT(BARE_TEN)(BARE_TEN)', PROGRAM)
+        expr = compiler.nest(bindings, body)
+        self.assertFalse(compiler.refs(expr))
+        self.assertEqual(bare_numerify(terms.evaluate(expr)), 100)
+
+    def test_terminates_on_recursion(self):
+        bindings = compiler.compile_program(PROGRAM, ['BARE_LEN'])
+        self.assertIn('Y', bindings)
+        self.assertLessEqual(compiler.depth(bindings['BARE_LEN']), compiler.MAX_DEPTH)
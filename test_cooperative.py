@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+import terms
+import using_church
+import cooperative
+from using_church import churchify, dechurchify, bare_numerify
+
+PROGRAM = terms.load()
+NS = PROGRAM.namespace()
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def term_churchify(obj):
+    with terms.backend(NS, [using_church]):
+        using_church.clear_caches()
+        try:
+            return churchify(obj)
+        finally:
+            using_church.clear_caches()
+
+
+class TestCooperative(unittest.TestCase):
+    def test_evaluate(self):
+        term = terms.parse_expr(
+            'BARE_EQUALP(BARE_MULT(BARE_TEN)(BARE_TEN))(BARE_ADD(BARE_TEN)(BARE_MULT(BARE_NINE)(BARE_TEN)))',
+            PROGRAM)
+        machine = terms.Machine()
+        b = run(cooperative.evaluate_async(term, machine, every=50))
+        # slicing costs no extra applications
+        whole = terms.Machine()
+        whole.evaluate(term)
+        self.assertGreater(whole.steps, 500)
+        self.assertEqual(machine.steps, whole.steps)
+        self.assertIs(using_church.bare_boolify(b), True)
+
+    def test_typed_ops(self):
+        a, b = term_churchify(12), term_churchify(-5)
+        result = run(cooperative.apply_async(NS['ADD'], a, b, every=10))
+        self.assertEqual(dechurchify(result), 7)
+        result = run(cooperative.apply_async(NS['EQUALP'], a, a, every=10))
+        self.assertIs(dechurchify(result), True)
+
+    def test_dechurchify(self):
+        for value in (0, 42, -17, [], [1, [2, -3], 'ab'], 'hello', None, True, 'x'):
+            tval = term_churchify(value)
+            self.assertEqual(run(cooperative.dechurchify_async(tval, every=10)), value)
+
+    def test_interleaves(self):
+        # two long evaluations and a ticker share the loop
+        term = terms.parse_expr('BARE_MULT(BARE_TEN)(BARE_MULT(BARE_TEN)(BARE_TEN))', PROGRAM)
+        ticks = []
+        done = []
+
+        async def ticker():
+            while len(done) < 2:
+                ticks.append(len(done))
+                await asyncio.sleep(0)
+
+        async def evaluation():
+            n = await cooperative.numerify_async(
+                await cooperative.evaluate_async(term, every=100), every=100)
+            done.append(n)
+
+        async def main():
+            await asyncio.gather(ticker(), evaluation(), evaluation())
+
+        run(main())
+        self.assertEqual(done, [1000, 1000])
+        self.assertGreater(ticks.count(0), 10)
+
+    def test_cancel(self):
+        loop = terms.parse_expr('Y(lambda f: lambda x: f(x))(BARE_VOID)', PROGRAM)
+
+        async def main():
+            task = asyncio.ensure_future(cooperative.evaluate_async(loop, every=100))
+            for _ in range(5):
+                await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return True
+
+        self.assertIs(run(main()), True)
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import terms
+import using_church
+import image
+from using_church import churchify, dechurchify, bare_numerify
+
+PROGRAM = terms.load()
+NS = PROGRAM.namespace()
+
+
+def term_churchify(obj):
+    with terms.backend(NS, [using_church]):
+        using_church.clear_caches()
+        try:
+            return churchify(obj)
+        finally:
+            using_church.clear_caches()
+
+
+class TestImage(unittest.TestCase):
+    VALUES = [0, 1234, -56, 'hello, world', [1, [2, 'three'], None, True], using_church.BinInt(99)]
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.image')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        roots = dict(('v%d' % i, term_churchify(v)) for i, v in enumerate(self.VALUES))
+        roots['succ'] = terms.parse_expr('lambda n: BARE_SUCC(n)', PROGRAM)
+        image.save(self.path, roots, PROGRAM)
+        # loaded into another program, and built only when asked for
+        program = terms.load()
+        with image.load(self.path, program) as img:
+            self.assertEqual(sorted(img.names()), sorted(roots))
+            self.assertEqual(img._built, {})
+            for i, v in enumerate(self.VALUES):
+                self.assertEqual(dechurchify(img['v%d' % i]), getattr(v, 'n', v))
+            succ = terms.evaluate(terms.App(img['succ'], program.ref('BARE_TWO')))
+            self.assertEqual(bare_numerify(succ), 3)
+            # the program's own definitions load as themselves
+            self.assertIn(program['BARE_TRUE'], img._built.values())
+
+    def test_sharing(self):
+        big = term_churchify(list(range(30)))
+        one = len(image.dumps({'a': big}, PROGRAM))
+        two = len(image.dumps({'a': big, 'b': big}, PROGRAM))
+        self.assertLess(two - one, 40)
+        # equal values built apart are stored once too
+        again = term_churchify(list(range(30)))
+        self.assertLess(len(image.dumps({'a': big, 'b': again}, PROGRAM)) - one, 40)
+
+    def test_deep_values(self):
+        n = PROGRAM['BARE_ZERO']
+        for _ in range(20000):
+            n = PROGRAM['BARE_SUCC'](n)
+        image.save(self.path, {'n': n}, PROGRAM)
+        with image.load(self.path, PROGRAM) as img:
+            self.assertEqual(bare_numerify(img['n']), 20000)
+
+    def test_errors(self):
+        self.assertRaises(image.ImageError, image.dumps, {'f': lambda x: x}, PROGRAM)
+        self.assertRaises(image.ImageError, image.loads, b'NOPE' + b'\0' * 16, PROGRAM)
+        data = image.dumps({'a': term_churchify(5)}, PROGRAM)
+        self.assertRaises(image.ImageError, image.loads, data[:-3], PROGRAM)
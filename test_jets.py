@@ -0,0 +1,96 @@
+import unittest
+import church
+import test_church
+import jets
+from church import *
+from using_church import *
+
+
+class TestChurchWithJets(test_church.TestChurch):
+    # the whole of test_church.py, with the jets installed in check mode so
+    # that every jet hit is compared against the pure definition
+
+    def setUp(self):
+        jets.install(check=True)
+
+    def tearDown(self):
+        jets.uninstall()
+
+
+class TestJets(unittest.TestCase):
+    def setUp(self):
+        jets.install(check=True)
+        jets.reset_stats()
+
+    def tearDown(self):
+        jets.uninstall()
+
+    def test_tagged_values_are_church_values(self):
+        self.assertEqual(bare_numerify(jets.nat(7)), 7)
+        lst = jets.seq([BARE_ONE, BARE_TWO])
+        self.assertEqual([bare_numerify(x) for x in bare_listify(lst)], [1, 2])
+        self.assertEqual(bare_numerify(BARE_CONSHEAD(BARE_CONSTAIL(lst))), 2)
+
+    def test_hits(self):
+        self.assertEqual(bare_numerify(church.BARE_SUB(jets.nat(100))(jets.nat(1))), 99)
+        self.assertEqual(bare_numerify(church.BARE_MULT(BARE_TEN)(jets.nat(30))), 300)
+        self.assertIs(bare_boolify(church.BARE_EQUALP(jets.nat(10))(BARE_TEN)), True)
+        self.assertEqual(bare_numerify(church.BARE_LEN(jets.seq([BARE_ONE] * 50))), 50)
+        stats = jets.stats()
+        self.assertEqual(stats['BARE_SUB'][1], 0)
+        self.assertEqual(stats['BARE_LEN'], (1, 0))
+
+    def test_large_values(self):
+        # far beyond what the pure definitions can do before hitting the
+        # recursion limit, so check mode is off
+        jets.install()
+        self.assertEqual(bare_numerify(church.BARE_SUB(jets.nat(10 ** 6))(jets.nat(1))), 10 ** 6 - 1)
+        self.assertEqual(bare_numerify(church.BARE_MULT(jets.nat(3000))(jets.nat(3000))), 9 * 10 ** 6)
+        self.assertEqual(bare_numerify(church.BARE_LEN(jets.seq([BARE_ONE] * 10 ** 5))), 10 ** 5)
+        self.assertEqual(dechurchify(EQUALP(churchify(5000))(churchify(5000))), True)
+
+    def test_fallback(self):
+        lst = BARE_PREPEND(BARE_ONE)(BARE_NIL)
+        self.assertEqual(bare_numerify(church.BARE_LEN(lst)), 1)
+        self.assertEqual(jets.stats()['BARE_LEN'][1], 1)
+        three = BARE_SUCC(BARE_TWO)
+        self.assertEqual(bare_numerify(church.BARE_ADD(three)(jets.nat(2))), 5)
+        self.assertEqual(jets.stats()['BARE_ADD'], (0, 1))
+
+    def test_churchify_is_tagged(self):
+        self.assertIsInstance(BARE_VALUEOF(churchify(12)), jets.Nat)
+        self.assertEqual(dechurchify(ADD(churchify(400))(churchify(-399))), 1)
+        self.assertGreater(jets.stats()['BARE_NUM_DIFF'][0], 0)
+
+    def test_check_mode_catches_mismatches(self):
+        saved = jets.registry['BARE_ADD']
+        jets.jet('BARE_ADD', 2, saved.decode)(lambda a, b: jets.Nat(42))
+        try:
+            jets.install(check=True)
+            self.assertRaises(jets.JetMismatch, church.BARE_ADD(jets.nat(1)), jets.nat(1))
+        finally:
+            jets.registry['BARE_ADD'] = saved
+            jets.install(check=True)
+
+    def test_tagged_numerals_without_jets(self):
+        jets.uninstall()
+        n = BARE_VALUEOF(churchify(10 ** 6))
+        self.assertIsInstance(n, Nat)
+        self.assertEqual(bare_numerify(n), 10 ** 6)
+        self.assertEqual(dechurchify(churchify(-12)), -12)
+        # they are numerals to the pure definitions
+        self.assertEqual(bare_numerify(church.BARE_ADD(Nat(3))(BARE_FOUR)), 7)
+        self.assertIs(bare_boolify(church.BARE_EQUALP(Nat(10))(BARE_TEN)), True)
+        self.assertEqual(dechurchify(MULT(churchify(30))(churchify(-30))), -900)
+
+    def test_arithmetic_keeps_tags(self):
+        self.assertIsInstance(BARE_VALUEOF(churchify(5)), Nat)
+        for tval in (ADD(churchify(10 ** 6))(churchify(2)), MULT(churchify(10 ** 4))(churchify(10 ** 4)),
+                     SUB(churchify(10 ** 6))(churchify(-1))):
+            self.assertIsInstance(BARE_VALUEOF(tval), Nat)
+        self.assertEqual(dechurchify(MULT(churchify(10 ** 6))(churchify(10 ** 6))), 10 ** 12)
+
+    def test_uninstall(self):
+        jets.uninstall()
+        self.assertFalse(jets.is_installed())
+        self.assertIs(church.BARE_ADD, jets._PURE['BARE_ADD'])
@@ -0,0 +1,99 @@
+import unittest
+import church
+import using_church
+import test_church
+import profiler
+from using_church import churchify, dechurchify
+
+
+class TestChurchProfiled(test_church.TestChurch):
+    # the whole of test_church.py, on a profiled term machine
+
+    def setUp(self):
+        self._profiling = profiler.profiling([church, using_church, test_church])
+        self.profile = self._profiling.__enter__()
+
+    def tearDown(self):
+        self._profiling.__exit__(None, None, None)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_counts_calls_of_definitions(self):
+        with profiler.profiling() as profile:
+            self.assertEqual(dechurchify(church.ADD(churchify(3))(churchify(-5))), -2)
+            self.assertEqual(dechurchify(church.ADD(churchify(2))(churchify(2))), 4)
+        stats = profile.stats()
+        calls, steps, seconds = stats['ADD']
+        self.assertEqual(calls, 2)
+        self.assertGreater(steps, 0)
+        self.assertGreaterEqual(seconds, 0)
+        # ADD's steps include those of everything it calls
+        self.assertEqual(stats['BARE_NUM_DIFF'][0], 1)
+        self.assertLess(stats['BARE_NUM_DIFF'][1], steps)
+        self.assertNotIn('MULT', stats)
+        # definitions which aren't lambdas are counted as the lambda they are
+        self.assertNotIn('MK_POS_INT', profile.counters)
+        self.assertIn('BARE_MAKE_TYPEDVAR_MAKER', stats)
+
+    def test_recursion_is_charged_once(self):
+        # each BARE_SUCC numeral calls the one it was built from
+        with profiler.profiling() as profile:
+            n = using_church.bare_numeral(50)
+            profile.reset()
+            self.assertEqual(using_church.bare_numerify(n), 50)
+        calls, steps, seconds = profile.stats()['BARE_SUCC']
+        self.assertEqual(calls, 50)
+        self.assertLess(steps, 50 * 10)
+
+    def test_report(self):
+        with profiler.profiling() as profile:
+            church.EQUALP(churchify(4))(churchify(4))
+        report = profile.report(limit=3)
+        lines = report.splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith('name'))
+        self.assertIn('EQUALP', report)
+        profile.reset()
+        self.assertEqual(profile.stats(), {})
+
+    def test_unprofiled_afterwards(self):
+        with profiler.profiling() as profile:
+            pass
+        self.assertIsNot(church.ADD, profile.program['ADD'])
+        self.assertEqual(dechurchify(church.ADD(churchify(1))(churchify(1))), 2)
+        self.assertEqual(profile.stats(), {})
+
+
+class TestTrace(unittest.TestCase):
+    def test_trace(self):
+        with profiler.tracing(interval=10, min_steps=50) as trace:
+            self.assertEqual(dechurchify(church.STRCHR(churchify('abc'))(churchify(2))), 'c')
+        # the stacks are sampled, outermost name first
+        stacks = [line.rsplit(' ', 1) for line in trace.collapsed().splitlines()]
+        self.assertTrue(stacks)
+        for stack, samples in stacks:
+            self.assertGreater(int(samples), 0)
+        self.assertTrue(any(stack.startswith('STRCHR;') for stack, _ in stacks))
+        self.assertEqual(sum(int(n) for _, n in stacks), sum(trace.samples.values()))
+        # and only calls of at least min_steps are events
+        events = trace.chrome()['traceEvents']
+        self.assertIn('STRCHR', [e['name'] for e in events])
+        for e in events:
+            self.assertEqual(e['ph'], 'X')
+            self.assertGreaterEqual(e['args']['steps'], 50)
+            self.assertGreaterEqual(e['dur'], 0)
+        self.assertEqual(trace.names, [])
+        self.assertEqual(trace.stats()['STRCHR'][0], 1)
+
+    def test_events_are_bounded(self):
+        with profiler.tracing(min_steps=0, max_events=5) as trace:
+            church.ADD(churchify(3))(churchify(4))
+        self.assertEqual(len(trace.chrome()['traceEvents']), 5)
+
+    def test_exceptions_unwind(self):
+        def explode(_):
+            raise ValueError
+        with profiler.tracing() as trace:
+            self.assertRaises(ValueError, church.BARE_IF(church.BARE_TRUE)(explode), explode)
+            self.assertEqual(trace.names, [])
+            self.assertEqual(trace.counters['BARE_TRUE'].active, 0)
@@ -0,0 +1,178 @@
+import unittest
+import church
+import using_church
+import test_church
+import terms
+from using_church import bare_numerify, bare_boolify
+
+PROGRAM = terms.load()
+LAZY_PROGRAM = terms.load(machine=terms.Machine(lazy=True))
+
+
+class TestChurchOnTerms(test_church.TestChurch):
+    # the whole of test_church.py, with every church.py name rebound to its
+    # value on the term backend
+
+    def setUp(self):
+        self._backend = terms.backend(PROGRAM.namespace(), [test_church, using_church])
+        self._backend.__enter__()
+
+    def tearDown(self):
+        self._backend.__exit__(None, None, None)
+
+
+class TestChurchOnLazyTerms(TestChurchOnTerms):
+    # and again, call-by-need
+
+    def setUp(self):
+        self._backend = terms.backend(LAZY_PROGRAM.namespace(), [test_church, using_church])
+        self._backend.__enter__()
+
+
+class TestTerms(unittest.TestCase):
+    def test_loads_every_definition(self):
+        names = [name for name in vars(church) if name.isupper() or name.startswith('_')
+                 and not name.startswith('__')]
+        for name in names:
+            self.assertIn(name, PROGRAM)
+        self.assertEqual(PROGRAM.names()[0], 'BARE_VOID')
+
+    def test_definitions_are_shared(self):
+        one = PROGRAM.terms['BARE_ONE']
+        two = PROGRAM.terms['BARE_TWO']
+        self.assertIs(one.fn, two.fn)
+        self.assertIs(two.arg, PROGRAM.ref('BARE_ONE'))
+        self.assertIs(PROGRAM['BARE_TWO'], PROGRAM['BARE_TWO'])
+
+    def test_parse_expr(self):
+        term = terms.parse_expr('BARE_ADD(BARE_TEN)(BARE_TWO)', PROGRAM)
+        self.assertEqual(bare_numerify(terms.evaluate(term)), 12)
+        term = terms.parse_expr('(lambda x: lambda x: x)(BARE_TRUE)(BARE_FALSE)', PROGRAM)
+        self.assertIs(bare_boolify(terms.evaluate(term)), False)
+
+    def test_syntax_errors(self):
+        self.assertRaises(SyntaxError, terms.parse_expr, 'NOT_DEFINED', PROGRAM)
+        self.assertRaises(SyntaxError, terms.parse_expr, 'BARE_ADD(BARE_ONE, BARE_TWO)', PROGRAM)
+        self.assertRaises(SyntaxError, terms.parse_expr, 'lambda a, b: a', PROGRAM)
+        self.assertRaises(SyntaxError, terms.parse, 'X = 1')
+        self.assertRaises(SyntaxError, terms.parse, 'def f(): pass')
+
+    def test_numerals_are_not_tagged(self):
+        # the machine's numerals are its own closures
+        with terms.backend(PROGRAM.namespace(), [using_church]):
+            n = using_church.bare_numeral(5)
+        self.assertIsInstance(n, terms.Closure)
+        self.assertEqual(bare_numerify(n), 5)
+
+    def test_counts_steps(self):
+        machine = terms.Machine()
+        machine.evaluate(terms.parse_expr('BARE_IF(BARE_TRUE)(BARE_VOID)(BARE_VOID)', PROGRAM))
+        self.assertGreater(machine.steps, 0)
+
+    def test_deep_numerals(self):
+        # the machine keeps its continuation on the heap, so applying a numeral
+        # far deeper than python's recursion limit is fine
+        succ = PROGRAM['BARE_SUCC']
+        n = PROGRAM['BARE_ZERO']
+        for _ in range(20000):
+            n = succ(n)
+        self.assertEqual(bare_numerify(n), 20000)
+
+    def test_type_checks_are_constant_time(self):
+        # a type check costs a small, bounded number of applications whatever
+        # the types involved
+        for test in ('BARE_IS_VOID', 'BARE_IS_STRING', 'BARE_IS_BIN_INT'):
+            for maker in ('MK_VOID', 'MK_STRING', 'MK_RA_STRING'):
+                machine = terms.Machine()
+                machine.evaluate(terms.parse_expr('%s(%s(BARE_VOID))' % (test, maker), PROGRAM))
+                self.assertLess(machine.steps, 150)
+
+    def test_lockstep_comparisons_are_cheaper(self):
+        steps = []
+        for name in ('BARE_EQUALP', '_SUB_EQUALP'):
+            machine = terms.Machine()
+            machine.evaluate(terms.parse_expr(
+                '%s(BARE_MULT(BARE_TEN)(BARE_TEN))(BARE_MULT(BARE_TEN)(BARE_TEN))' % name, PROGRAM))
+            steps.append(machine.steps)
+        self.assertLess(steps[0] * 5, steps[1])
+
+    def test_typed_ops_dispatch_once(self):
+        import bench
+        for name, operands, branchy, shared in bench.bench_reductions():
+            self.assertLessEqual(shared, branchy, (name, operands))
+
+    def test_lazy_arguments(self):
+        # an argument which is never used is never evaluated, and one used
+        # twice is evaluated once
+        def explode(_):
+            raise AssertionError('evaluated')
+        unused = terms.App(terms.parse_expr('lambda x: BARE_TRUE', PROGRAM),
+                           terms.App(terms.Const(explode), terms.Const(None)))
+        self.assertRaises(AssertionError, terms.evaluate, unused)
+        machine = terms.Machine(lazy=True)
+        self.assertIs(bare_boolify(machine.evaluate(unused)), True)
+        self.assertEqual((machine.thunks, machine.forced), (1, 0))
+
+        calls = []
+        def count(x):
+            calls.append(x)
+            return x
+        twice = terms.App(terms.parse_expr('lambda x: BARE_AND(x)(x)', PROGRAM),
+                          terms.App(terms.Const(count), PROGRAM.ref('BARE_TRUE')))
+        machine = terms.Machine(lazy=True)
+        self.assertIs(bare_boolify(machine.evaluate(twice)), True)
+        self.assertEqual(len(calls), 1)
+        self.assertGreater(machine.shared, 0)
+
+    def test_limits(self):
+        machine = terms.Machine()
+        loop = terms.parse_expr('Y(lambda f: lambda x: f(x))(BARE_VOID)', PROGRAM)
+        with machine.limit(steps=5000):
+            with self.assertRaises(using_church.ChurchResourceError) as caught:
+                machine.evaluate(loop)
+        self.assertEqual(caught.exception.resource, 'steps')
+        self.assertLess(machine.steps, 5000 + 10)
+        self.assertIsInstance(caught.exception, using_church.ChurchError)
+
+        with machine.limit(seconds=0.05):
+            with self.assertRaises(using_church.ChurchResourceError) as caught:
+                machine.evaluate(loop)
+        self.assertEqual(caught.exception.resource, 'seconds')
+
+        deep = terms.parse_expr('Y(lambda f: lambda x: BARE_SUCC(f(x)))(BARE_VOID)', PROGRAM)
+        with machine.limit(depth=1000, steps=10 ** 7):
+            with self.assertRaises(using_church.ChurchResourceError) as caught:
+                machine.evaluate(deep)
+        self.assertEqual(caught.exception.resource, 'depth')
+
+        # within its limits an evaluation goes as usual, and the limits end
+        # with the block
+        term = terms.parse_expr('BARE_MULT(BARE_TEN)(BARE_TEN)', PROGRAM)
+        with machine.limit(steps=10 ** 5, depth=100, seconds=10):
+            self.assertEqual(bare_numerify(machine.evaluate(term)), 100)
+        self.assertIsNone(machine._limits)
+
+    def test_limits_apply_to_callbacks(self):
+        # steps taken by closures python calls back count too
+        machine = terms.Machine()
+        program = terms.load(machine=machine)
+        n = program['BARE_MULT'](program['BARE_TEN'])(program['BARE_TEN'])
+        with machine.limit(steps=50):
+            self.assertRaises(using_church.ChurchResourceError, bare_numerify, n)
+
+    def test_wire_form(self):
+        source = '(lambda x: lambda y: BARE_IF(x)(lambda _: y)(lambda _: BARE_ZERO))(BARE_TRUE)(BARE_TEN)'
+        term = terms.parse_expr(source, PROGRAM)
+        wire = terms.to_wire(term)
+        self.assertTrue(all(isinstance(op, tuple) for op in wire))
+        again = terms.from_wire(wire, PROGRAM)
+        self.assertEqual(repr(again), repr(term))
+        self.assertEqual(bare_numerify(terms.evaluate(again)), 10)
+        # deep terms go through without recursion
+        deep = PROGRAM.ref('BARE_ZERO')
+        for _ in range(5000):
+            deep = terms.App(PROGRAM.ref('BARE_SUCC'), deep)
+        self.assertEqual(bare_numerify(terms.evaluate(terms.from_wire(terms.to_wire(deep), PROGRAM))), 5000)
+        self.assertRaises(ValueError, terms.to_wire, terms.Const(None))
+        self.assertRaises(ValueError, terms.from_wire, [('ref', 'NOT_DEFINED')], PROGRAM)
+        self.assertRaises(ValueError, terms.from_wire, [('ref', 'BARE_ONE')] * 2, PROGRAM)
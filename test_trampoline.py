@@ -0,0 +1,45 @@
+import unittest
+from church import *
+from using_church import bare_churchify, bare_listify
+import trampoline
+from trampoline import run, T_LEN, T_APPEND, T_CONCAT, T_SUCC, TY, numeral, numerify, boolify, listify
+
+BIG = 10 ** 6
+
+
+class TestTrampoline(unittest.TestCase):
+    def test_small_values(self):
+        self.assertEqual(numerify(numeral(0)), 0)
+        self.assertEqual(numerify(T_SUCC(BARE_TEN)), 11)
+        lst = bare_churchify([1, 2, 3])
+        self.assertEqual(numerify(T_LEN(lst)), 3)
+        self.assertEqual(len(listify(T_APPEND(lst)(BARE_NIL))), 4)
+        self.assertEqual(len(listify(T_CONCAT(lst)(lst))), 6)
+        self.assertEqual(listify(T_CONCAT(BARE_NIL)(BARE_NIL)), [])
+
+    def test_pure_arithmetic_on_trampolined_numerals(self):
+        a, b = numeral(2000), numeral(1500)
+        self.assertEqual(numerify(BARE_ADD(a)(b)), 3500)
+        self.assertEqual(numerify(BARE_MULT(a)(numeral(3))), 6000)
+        self.assertIs(boolify(BARE_IS_ZERO(a)), False)
+        self.assertIs(boolify(BARE_IS_ZERO(BARE_MULT(a)(BARE_ZERO))), True)
+
+    def test_tail_recursion(self):
+        last = TY(lambda LAST_r: lambda lst:
+                    lst(lambda _: BARE_VOID)
+                       (lambda head: lambda tail: tail(lambda _: head)
+                                                      (lambda _: lambda _: LAST_r(tail))))
+        lst = bare_churchify([None] * 10000 + [True])
+        self.assertIs(boolify(run(last(lst))), True)
+
+    def test_big_numerals(self):
+        self.assertEqual(numerify(numeral(BIG)), BIG)
+
+    def test_big_lists(self):
+        lst = bare_churchify([None] * BIG)
+        self.assertEqual(len(bare_listify(lst)), BIG)
+        self.assertEqual(numerify(T_LEN(lst)), BIG)
+        items = listify(T_APPEND(lst)(BARE_TRUE))
+        self.assertEqual(len(items), BIG + 1)
+        self.assertIs(items[-1], BARE_TRUE)
+        self.assertEqual(numerify(T_LEN(T_CONCAT(lst)(BARE_CONS(BARE_TRUE)(BARE_NIL)))), BIG + 1)
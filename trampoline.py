@@ -0,0 +1,118 @@
+# trampolined evaluation: stack-safe numerals and recursion
+#
+# a church numeral built with BARE_SUCC applies itself by nesting one python
+# call per unit of its value, and functions built with Y recurse once per list
+# element, so both fall over at python's recursion limit, around 1000.
+#
+# in trampolined mode the places where that nesting would happen hand back a
+# Call instead: an application which has not been carried out yet. run() then
+# carries such applications out in a loop, keeping what is left to do on a
+# list instead of on the python stack. T_SUCC and TY are the trampolining
+# variants of BARE_SUCC and Y, and everything built from them (T_LEN,
+# T_APPEND, T_CONCAT, or numerals made by numeral()) needs only bounded python
+# stack, however long the list or large the value.
+#
+# BARE_ADD, BARE_MULT and BARE_IS_ZERO work unchanged on trampolined
+# numerals, as long as their result is passed through run(), or decoded with
+# numerify(), boolify() or listify(). _PRED (and so BARE_SUB) does not: the
+# functions it composes call each other directly.
+
+from church import *
+
+
+class Call(object):
+    # a pending application of fn to arg. either may be pending itself, and
+    # applying a pending value only makes another pending application
+    __slots__ = ('fn', 'arg')
+
+    def __init__(self, fn, arg):
+        self.fn = fn
+        self.arg = arg
+
+    def __call__(self, arg):
+        return Call(self, arg)
+
+    def __repr__(self):
+        return '<Call %r(%r)>' % (self.fn, self.arg)
+
+
+# continuation frames for run(), pushed as (saved value, marker)
+_ARG = 0    # the function is done; evaluate the saved argument next
+_APPLY = 1  # the argument is done too; apply the saved function to it
+
+
+def run(value):
+    # carry out pending applications until a plain value is left
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    while True:
+        while value.__class__ is Call:
+            push(value.arg)
+            push(_ARG)
+            value = value.fn
+        if not stack:
+            return value
+        if pop() is _ARG:
+            arg = pop()
+            if arg.__class__ is Call:
+                push(value)
+                push(_APPLY)
+                value = arg
+            else:
+                value = value(arg)
+        else:
+            value = pop()(value)
+
+
+# the trampolining variant of Y: recursive calls are left pending
+TY = ((lambda f: lambda F: F(lambda x: Call(f(f)(F), x)))
+      (lambda f: lambda F: F(lambda x: Call(f(f)(F), x))))
+
+# the trampolining variant of BARE_SUCC: applying the numeral leaves both the
+# inner numeral's application and the outer f pending
+T_SUCC = lambda n: lambda f: lambda z: Call(f, Call(Call(n, f), z))
+
+T_LEN = TY(lambda LEN_r:
+             lambda cons:
+               cons(lambda _: BARE_ZERO)
+                   (lambda head: lambda tail: T_SUCC(LEN_r(tail))))
+
+T_APPEND = TY(lambda APPEND_r:
+                lambda lst: lambda newval:
+                  lst(lambda _: BARE_CONS(newval)(BARE_NIL))
+                     (lambda head: lambda tail: BARE_CONS(head)(APPEND_r(tail)(newval))))
+
+T_CONCAT = TY(lambda CONCAT_r:
+                lambda lst1: lambda lst2:
+                  lst1(lambda _: lst2)
+                      (lambda head: lambda tail: BARE_CONS(head)(CONCAT_r(tail)(lst2))))
+
+
+def numeral(n):
+    i = BARE_ZERO
+    for x in range(n):
+        i = T_SUCC(i)
+    return i
+
+
+def numerify(n):
+    return run(Call(Call(n, lambda x: x + 1), 0))
+
+
+def boolify(b):
+    return run(Call(Call(b, lambda _: True), lambda _: False))
+
+
+_empty = lambda _: None
+_pair = lambda h: lambda t: (h, t)
+
+
+def listify(lst):
+    # the elements of a bare list whose cells may still be pending
+    items = []
+    cell = run(Call(Call(lst, _empty), _pair))
+    while cell is not None:
+        items.append(run(cell[0]))
+        cell = run(Call(Call(cell[1], _empty), _pair))
+    return items
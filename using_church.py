@@ -1,5 +1,10 @@
 # helpers for encoding between python values and church-encoded values
 
+import contextlib
+import weakref
+from collections import OrderedDict
+from collections.abc import Sequence
+
 from church import *
 
 num_void_id = 1
@@ -12,23 +17,337 @@ num_resultpair_id = 7
 num_char_id = 8
 num_string_id = 9
 num_error_id = 10
+num_bin_int_id = 11
+num_ra_list_id = 12
+num_ra_string_id = 13
+num_rope_id = 14
+num_rope_string_id = 15
+num_map_id = 16
+num_bytes_id = 17
 
 
 neg_zero = object()
 
 
+# caches. encoding goes through an LRU-bounded intern table, so numerals,
+# chars and short strings which are churchified over and over are only built
+# once. decoding remembers results by the identity of the church value, held
+# weakly so that the cache never keeps a value alive.
+
+_missing = object()
+
+
+class LRUCache(object):
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data.pop(key, None)
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self._data) > max(maxsize, 0):
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._data), 'maxsize': self.maxsize}
+
+
+class WeakCache(object):
+    # results keyed by (kind of decoding, church value). values which can't be
+    # weakly referenced are simply not cached
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+
+    def get(self, kind, obj, default=None):
+        try:
+            value = self._data[kind][obj]
+        except (KeyError, TypeError):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, kind, obj, value):
+        try:
+            self._data.setdefault(kind, weakref.WeakKeyDictionary())[obj] = value
+        except TypeError:
+            pass
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return sum(len(d) for d in self._data.values())
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+
+# hash-consing. while interning is on, numerals, cons cells, map nodes and
+# typed values are looked up by their contents before new ones are built, so that equal
+# values churchified over and over are one object, lists which end alike
+# share their cells, and the decode cache (which goes by identity) hits for
+# every copy of a value. a cons cell or typed value is keyed by the ids of its
+# parts, which it keeps alive itself. the table is not bounded, and holds its
+# values until clear_caches().
+class InternTable(object):
+    def __init__(self):
+        self.enabled = False
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.enabled:
+            self._data[key] = value
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data),
+                'enabled': self.enabled}
+
+
+encode_cache = LRUCache(1024)
+decode_cache = WeakCache()
+intern_table = InternTable()
+
+# strings up to this long are interned by the encode cache
+max_cached_string = 64
+
+
+def set_cache_size(maxsize):
+    encode_cache.resize(maxsize)
+
+def set_interning(enabled):
+    intern_table.enabled = enabled
+
+@contextlib.contextmanager
+def interning(enabled=True):
+    previous = intern_table.enabled
+    intern_table.enabled = enabled
+    try:
+        yield intern_table
+    finally:
+        intern_table.enabled = previous
+
+def cache_info():
+    return {'encode': encode_cache.info(), 'decode': decode_cache.info(),
+            'intern': intern_table.info()}
+
+def clear_caches():
+    encode_cache.clear()
+    decode_cache.clear()
+    intern_table.clear()
+
+
+# tagged numerals: a church numeral which also carries its value as a python
+# int. applying it iterates f in a loop, so it never nests python frames.
+# churchify makes numerals this way, in constant time, for church.py's own
+# definitions (pure, or with jets installed, whose arithmetic keeps the tags
+# on its results); bare_numerify reads the value straight off. backends which
+# rebind BARE_SUCC here get numerals of their own making, as before.
+class Nat(object):
+    __slots__ = ('n', '__weakref__')
+
+    def __init__(self, n):
+        self.n = n
+
+    def __call__(self, f):
+        n = self.n
+
+        def iterate(z):
+            for _ in range(n):
+                z = f(z)
+            return z
+        return iterate
+
+    def __repr__(self):
+        return '<Nat %d>' % self.n
+
+
+_CHURCH_SUCC = BARE_SUCC
+
+def _tags_numerals():
+    # whether the BARE_SUCC seen here is church.py's, or a jet for it
+    return BARE_SUCC is _CHURCH_SUCC or getattr(BARE_SUCC, 'jet_of', None) is _CHURCH_SUCC
+
+
 def bare_numerify(n):
-    return n(lambda x: x+1)(0)
+    if n.__class__ is Nat:
+        return n.n
+    result = decode_cache.get('num', n, _missing)
+    if result is _missing:
+        result = n(lambda x: x+1)(0)
+        decode_cache.put('num', n, result)
+    return result
 
 def bare_boolify(b):
     return b(lambda _: True)(lambda _: False)
 
+_empty = lambda _: None
+_pair = lambda h: lambda t: (h, t)
+
+def iter_bare_list(lst):
+    # yields the elements one cell at a time, in a loop, so long lists don't
+    # recurse and the caller can stop early
+    cell = lst(_empty)(_pair)
+    while cell is not None:
+        yield cell[0]
+        cell = cell[1](_empty)(_pair)
+
 def bare_listify(lst):
-    return lst(lambda _: [])(lambda h: lambda t: [h] + bare_listify(t))
+    result = decode_cache.get('list', lst)
+    if result is None:
+        result = tuple(iter_bare_list(lst))
+        decode_cache.put('list', lst, result)
+    return list(result)
+
+_leaf = lambda x: (x, None, None)
+_node = lambda x: lambda t1: lambda t2: (x, t1, t2)
+
+def iter_bare_ralist(ra):
+    # the elements of a random-access list in order, walking each tree with
+    # an explicit stack
+    for weight, tree in (bare_unpairify(p) for p in iter_bare_list(ra)):
+        stack = [tree]
+        while stack:
+            x, t1, t2 = stack.pop()(_leaf)(_node)
+            yield x
+            if t1 is not None:
+                stack.append(t2)
+                stack.append(t1)
+
+def bare_ralistify(ra):
+    return list(iter_bare_ralist(ra))
+
+_rope_leaf = lambda lst: (lst, None)
+_rope_node = lambda left: lambda right: (left, right)
+
+def iter_bare_rope(rope):
+    # the elements of a rope in order, walking its nodes with an explicit
+    # stack, so that ropes built by many concatenations don't recurse
+    stack = [rope]
+    while stack:
+        left, right = stack.pop()(_rope_leaf)(_rope_node)
+        if right is None:
+            for x in iter_bare_list(left):
+                yield x
+        else:
+            stack.append(right)
+            stack.append(left)
+
+def bare_ropify(rope):
+    return list(iter_bare_rope(rope))
+
+_map_leaf = lambda _: None
+_map_node = lambda h: lambda l: lambda k: lambda v: lambda r: (l, k, v, r)
+
+def iter_bare_map(m):
+    # the (key, value) entries of a map in key order, walking its nodes with
+    # an explicit stack
+    stack = []
+    node = m(_map_leaf)(_map_node)
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node[0](_map_leaf)(_map_node)
+        l, k, v, r = stack.pop()
+        yield k, v
+        node = r(_map_leaf)(_map_node)
+
+def bare_mapify(m):
+    return list(iter_bare_map(m))
+
+def map_key_order(key):
+    # the order of keys in a map, as _KEY_CMP has it: ints by value, then
+    # strings
+    if isinstance(key, bool) or not isinstance(key, (int, str)):
+        raise TypeError('map keys must be ints or strings, not %r' % (key,))
+    return isinstance(key, str), key
+
+def bare_map_from_items(items):
+    # a map of the bare (key, value) items, which must be in key order. it is
+    # built balanced as it is, rather than by inserting one entry at a time
+    def build(lo, hi):
+        if lo == hi:
+            return BARE_MAP_NIL, 0
+        mid = (lo + hi) // 2
+        left, hl = build(lo, mid)
+        right, hr = build(mid + 1, hi)
+        h = max(hl, hr) + 1
+        k, v = items[mid]
+        height = bare_numeral(h)
+        key = ('map', BARE_MAP_NODE, id(height), id(left), id(k), id(v), id(right))
+        node = intern_table.get(key)
+        if node is None:
+            node = BARE_MAP_NODE(height)(left)(k)(v)(right)
+            intern_table.put(key, node)
+        return node, h
+    return build(0, len(items))[0]
 
 def bare_unpairify(pair):
     return pair(lambda head: lambda tail: (head, tail))
 
+def bare_binify(bits):
+    n = 0
+    for bit in reversed(bare_listify(bits)):
+        n = n * 2 + bare_boolify(bit)
+    return n
+
+def bare_binary(n):
+    bits = BARE_BIN_ZERO
+    if n:
+        for c in bin(n)[2:]:
+            bits = BARE_CONS(BARE_TRUE if c == '1' else BARE_FALSE)(bits)
+    return bits
+
 
 class Char(object):
     def __init__(self, c):
@@ -38,11 +357,156 @@ class Char(object):
         return '<Char %r>' % self.c
 
 
-def churchandtypify(obj, listrecurs):
+# ints wrapped in BinInt are churchified as binary integers rather than as
+# unary numerals, which makes big values affordable
+class BinInt(object):
+    def __init__(self, n):
+        self.n = n
+
+    def __repr__(self):
+        return '<BinInt %r>' % self.n
+
+
+# lists and strings wrapped in RAList are churchified as random-access lists,
+# where ELT and STRCHR take logarithmic time
+class RAList(object):
+    def __init__(self, items):
+        self.items = items
+
+    def __repr__(self):
+        return '<RAList %r>' % (self.items,)
+
+
+# lists and strings wrapped in Rope are churchified as single-leaf ropes,
+# which CONCAT, APPEND and STRCAT extend in constant time
+class Rope(object):
+    def __init__(self, items):
+        self.items = items
+
+    def __repr__(self):
+        return '<Rope %r>' % (self.items,)
+
+
+# lists and strings wrapped in LazyList are churchified as plain lists and
+# strings whose cells are only built, and whose elements only churchified,
+# when a computation first looks at them. items may be a sequence, or any
+# iterable, which is then read no further than the computation goes
+class LazyList(object):
+    def __init__(self, items):
+        self.items = items
+
+    def __repr__(self):
+        return '<LazyList %r>' % (self.items,)
+
+
+class _LazyCell(object):
+    # a cell of a bare list which is built on its first call, and from then
+    # on stands for it. what it builds is an ordinary BARE_CONS (of a head and
+    # another lazy cell) or BARE_NIL, and the call is passed on to that, so a
+    # lazy list looks like any other to both backends
+    __slots__ = ('_cons', '_nil', '_built', '__weakref__')
+
+    def __init__(self):
+        # the constructors of the backend the list was churchified for
+        self._cons = BARE_CONS
+        self._nil = BARE_NIL
+        self._built = None
+
+    def __call__(self, onempty):
+        if self._built is None:
+            self._built = self._build()
+        return self._built(onempty)
+
+
+class _SequenceCell(_LazyCell):
+    # the cell for items[index:], indexing items without copying them
+    __slots__ = ('items', 'index', '_eltify')
+
+    def __init__(self, items, index, eltify):
+        _LazyCell.__init__(self)
+        self.items = items
+        self.index = index
+        self._eltify = eltify
+
+    def _build(self):
+        if self.index >= len(self.items):
+            return self._nil
+        return self._cons(self._eltify(self.items[self.index])) \
+                         (_SequenceCell(self.items, self.index + 1, self._eltify))
+
+
+class _IteratorCell(_LazyCell):
+    # the cell for what is left of iterator
+    __slots__ = ('_iterator', '_eltify')
+
+    def __init__(self, iterator, eltify):
+        _LazyCell.__init__(self)
+        self._iterator = iterator
+        self._eltify = eltify
+
+    def _build(self):
+        iterator, self._iterator = self._iterator, None
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return self._nil
+        return self._cons(self._eltify(item))(_IteratorCell(iterator, self._eltify))
+
+
+def lazy_bare_list(items, eltify):
+    # a bare list of eltify(x) for x in items, built as it is walked
+    if isinstance(items, (Sequence, memoryview)):
+        return _SequenceCell(items, 0, eltify)
+    return _IteratorCell(iter(items), eltify)
+
+
+def _char_numeral(c):
+    return bare_numeral(ord(c))
+
+
+def bare_numeral(n):
+    key = ('num', n, BARE_SUCC)
+    i = encode_cache.get(key)
+    if i is None:
+        i = intern_table.get(key)
+        if i is None:
+            if _tags_numerals():
+                i = Nat(n)
+            else:
+                i = BARE_ZERO
+                for x in range(n):
+                    i = BARE_SUCC(i)
+            intern_table.put(key, i)
+        encode_cache.put(key, i)
+    return i
+
+
+def bare_cons(head, tail):
+    if not intern_table.enabled:
+        return BARE_PREPEND(head)(tail)
+    key = ('cons', BARE_PREPEND, id(head), id(tail))
+    cell = intern_table.get(key)
+    if cell is None:
+        cell = BARE_PREPEND(head)(tail)
+        intern_table.put(key, cell)
+    return cell
+
+
+def bare_stringify(s):
+    lst = BARE_NIL
+    for c in reversed(s):
+        lst = bare_cons(bare_numeral(ord(c)), lst)
+    return lst
+
+
+# lists and strings are built from the end in a loop, so they can be as long
+# as memory allows
+def churchandtypify(obj, eltify):
     if isinstance(obj, (list, tuple)):
-        if len(obj) == 0:
-            return num_list_id, BARE_NIL
-        return num_list_id, listrecurs(obj[0], obj[1:])
+        lst = BARE_NIL
+        for x in reversed(obj):
+            lst = bare_cons(eltify(x), lst)
+        return num_list_id, lst
     if isinstance(obj, bool):
         if obj:
             return num_bool_id, BARE_TRUE
@@ -53,10 +517,7 @@ def churchandtypify(obj, listrecurs):
             obj = -obj
         else:
             typnum = num_pos_int_id
-        i = BARE_ZERO
-        for x in range(obj):
-            i = BARE_SUCC(i)
-        return typnum, i
+        return typnum, bare_numeral(obj)
     # zeroes can end up typed as neg_int or pos_int. this lets us make sure
     # calculations work both ways
     if obj is neg_zero:
@@ -64,28 +525,72 @@ def churchandtypify(obj, listrecurs):
     if isinstance(obj, str):
         if len(obj) == 0:
             return num_string_id, BARE_NIL
-        return num_string_id, BARE_PREPEND(bare_churchify(Char(obj[0])))(bare_churchify(obj[1:]))
+        if len(obj) > max_cached_string:
+            return num_string_id, bare_stringify(obj)
+        # the constructors are part of the key, so that values built by
+        # another backend are never handed out
+        key = ('str', obj, BARE_PREPEND, BARE_SUCC)
+        s = encode_cache.get(key)
+        if s is None:
+            s = bare_stringify(obj)
+            encode_cache.put(key, s)
+        return num_string_id, s
     if isinstance(obj, Char):
-        i = BARE_ZERO
-        for x in range(ord(obj.c)):
-            i = BARE_SUCC(i)
-        return num_char_id, i
+        return num_char_id, bare_numeral(ord(obj.c))
+    # byte strings are views: their cells index the buffer as they are built,
+    # and nothing is copied up front
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return num_bytes_id, _SequenceCell(memoryview(obj).cast('B'), 0, bare_numeral)
+    if isinstance(obj, LazyList):
+        if isinstance(obj.items, str):
+            return num_string_id, lazy_bare_list(obj.items, _char_numeral)
+        return num_list_id, lazy_bare_list(obj.items, eltify)
+    if isinstance(obj, BinInt):
+        return num_bin_int_id, BARE_PAIR(BARE_TRUE if obj.n < 0 else BARE_FALSE)(bare_binary(abs(obj.n)))
+    if isinstance(obj, RAList):
+        if isinstance(obj.items, str):
+            typnum = num_ra_string_id
+            elts = [bare_numeral(ord(c)) for c in obj.items]
+        else:
+            typnum = num_ra_list_id
+            elts = [eltify(x) for x in obj.items]
+        ra = BARE_RA_NIL
+        for x in reversed(elts):
+            ra = BARE_RA_PREPEND(x)(ra)
+        return typnum, ra
+    if isinstance(obj, Rope):
+        typnum, lst = churchandtypify(obj.items, eltify)
+        if typnum == num_string_id:
+            return num_rope_string_id, BARE_ROPE_LEAF(lst)
+        return num_rope_id, BARE_ROPE_LEAF(lst)
+    if isinstance(obj, dict):
+        keys = sorted(obj, key=map_key_order)
+        return num_map_id, bare_map_from_items([(eltify(k), eltify(obj[k])) for k in keys])
     if obj is None:
         return num_void_id, VOID
     raise NotImplemented
 
-def bare_churchify_recurs(first, rest):
-    return BARE_PREPEND(bare_churchify(first))(bare_churchify(rest))
-
-def churchify_recurs(first, rest):
-    return BARE_VALUEOF(PREPEND(churchify(first))(churchify(rest)))
-
 def bare_churchify(obj):
-    return churchandtypify(obj, bare_churchify_recurs)[1]
+    return churchandtypify(obj, bare_churchify)[1]
+
+def typed_maker(typnum):
+    key = ('maker', typnum, BARE_MAKE_TYPEDVAR_MAKER)
+    maker = encode_cache.get(key)
+    if maker is None:
+        maker = BARE_MAKE_TYPEDVAR_MAKER(bare_churchify(typnum))
+        encode_cache.put(key, maker)
+    return maker
 
 def churchify(obj):
-    typnum, churchval = churchandtypify(obj, churchify_recurs)
-    return BARE_MAKE_TYPEDVAR_MAKER(bare_churchify(typnum))(churchval)
+    typnum, churchval = churchandtypify(obj, churchify)
+    if not intern_table.enabled:
+        return typed_maker(typnum)(churchval)
+    key = ('typed', typnum, id(churchval), BARE_MAKE_TYPEDVAR_MAKER)
+    tval = intern_table.get(key)
+    if tval is None:
+        tval = typed_maker(typnum)(churchval)
+        intern_table.put(key, tval)
+    return tval
 
 def extract_type_and_val(tval):
     return bare_numerify(BARE_TYPEOF(tval)), BARE_VALUEOF(tval)
@@ -99,12 +604,37 @@ class ChurchTypeError(ChurchError):
 class ChurchIndexError(ChurchError):
     pass
 
+class ChurchZeroDivisionError(ChurchError):
+    pass
+
+class ChurchResourceError(ChurchError):
+    # an evaluation ran out of one of the resources it was limited to:
+    # 'steps', 'depth' or 'seconds'
+    def __init__(self, resource, message):
+        ChurchError.__init__(self, resource, message)
+        self.resource = resource
+
+    def __str__(self):
+        return '%s: %s' % self.args
+
 errors = {
     1: ChurchTypeError,
     2: ChurchIndexError,
+    3: ChurchZeroDivisionError,
 }
 
+# kinds of results which are safe to share between callers
+_immutable = (type(None), bool, int, str, type)
+
 def dechurchify(tval):
+    result = decode_cache.get('typed', tval, _missing)
+    if result is _missing:
+        result = _dechurchify(tval)
+        if isinstance(result, _immutable):
+            decode_cache.put('typed', tval, result)
+    return result
+
+def _dechurchify(tval):
     t, val = extract_type_and_val(tval)
     if t == num_void_id:
         return None
@@ -115,9 +645,9 @@ def dechurchify(tval):
     elif t == num_neg_int_id:
         return -bare_numerify(val)
     elif t == num_list_id:
-        return map(dechurchify, bare_listify(val))
+        return [dechurchify(x) for x in bare_listify(val)]
     elif t == num_pair_id:
-        return map(dechurchify, bare_unpairify(val))
+        return [dechurchify(x) for x in bare_unpairify(val)]
     elif t == num_resultpair_id:
         resultval, errnum = bare_unpairify(val)
         errnum = bare_numerify(errnum)
@@ -127,6 +657,47 @@ def dechurchify(tval):
     elif t == num_char_id:
         return chr(bare_numerify(val))
     elif t == num_string_id:
-        return ''.join([chr(bare_numerify(c)) for c in bare_listify(val)])
+        return ''.join([chr(bare_numerify(c)) for c in iter_bare_list(val)])
     elif t == num_error_id:
         return errors[bare_numerify(val)]
+    elif t == num_bin_int_id:
+        neg, bits = bare_unpairify(val)
+        n = bare_binify(bits)
+        return -n if bare_boolify(neg) else n
+    elif t == num_ra_list_id:
+        return [dechurchify(x) for x in iter_bare_ralist(val)]
+    elif t == num_ra_string_id:
+        return ''.join([chr(bare_numerify(c)) for c in iter_bare_ralist(val)])
+    elif t == num_rope_id:
+        return [dechurchify(x) for x in iter_bare_rope(val)]
+    elif t == num_rope_string_id:
+        return ''.join([chr(bare_numerify(c)) for c in iter_bare_rope(val)])
+    elif t == num_map_id:
+        return dict((dechurchify(k), dechurchify(v)) for k, v in iter_bare_map(val))
+    elif t == num_bytes_id:
+        if isinstance(val, _SequenceCell):
+            # still a view of the buffer it came from
+            return val.items[val.index:].tobytes()
+        return bytes(bare_numerify(c) for c in iter_bare_list(val))
+
+
+def iter_dechurchify(tval):
+    # the elements of a typed list, or the characters of a typed string,
+    # decoded one at a time as they're asked for
+    t, val = extract_type_and_val(tval)
+    if t in (num_list_id, num_string_id, num_bytes_id):
+        elts = iter_bare_list(val)
+    elif t in (num_ra_list_id, num_ra_string_id):
+        elts = iter_bare_ralist(val)
+    elif t in (num_rope_id, num_rope_string_id):
+        elts = iter_bare_rope(val)
+    else:
+        raise TypeError('can only iterate over a church list or string')
+    if t in (num_list_id, num_ra_list_id, num_rope_id):
+        decode = dechurchify
+    elif t == num_bytes_id:
+        decode = bare_numerify
+    else:
+        decode = lambda c: chr(bare_numerify(c))
+    for x in elts:
+        yield decode(x)